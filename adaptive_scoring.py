@@ -0,0 +1,138 @@
+import os
+import re
+from dataclasses import dataclass
+from dotenv import load_dotenv
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
+
+from scoring_engine import ScoreOutcome
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Answer attachment and missing-section questions from the text itself, without an AI call.
+# Off by default: a pre-checked score replaces the model's assessment of that question
+PRECHECK_ENABLED = os.getenv("EVAL_PRECHECK", "").lower() in {"1", "true", "ja"}
+
+# Stop asking once the report's overall assessment can no longer change
+EARLY_STOP_ENABLED = os.getenv("EVAL_EARLY_STOP", "").lower() in {"1", "true", "ja"}
+
+# Comment on questions left unscored by an early stop (they count as 0 in the report)
+EARLY_STOP_COMMENT = "Ikke vurdert: totalvurderingen kunne ikke lenger endres (tidlig stopp)."
+
+@dataclass(frozen=True)
+class PrecheckRule:
+    """A question that keywords can decide.
+
+    `mention` is anything that shows the application touches the subject; no
+    match anywhere gives 0, so it is kept broad. For attachment questions,
+    `listed` is the attachment itself, and an attachment line naming it
+    ("Vedlegg 3: Årsregnskap 2023") without a negation or deferral gives full
+    score, so it is kept narrow. Anything in between is left to the model.
+    """
+    question: Pattern
+    mention: Pattern
+    subject: str
+    listed: Optional[Pattern] = None
+
+def _rule(question: str, mention: str, subject: str, listed: Optional[str] = None) -> PrecheckRule:
+    return PrecheckRule(
+        re.compile(question, re.IGNORECASE),
+        re.compile(mention, re.IGNORECASE),
+        subject,
+        re.compile(listed, re.IGNORECASE) if listed is not None else None,
+    )
+
+PRECHECK_RULES: List[PrecheckRule] = [
+    # "Krav fra IN" (Oppstart 2 and 3) and "Vedlegg" (Oppstart 1)
+    _rule(r"siste års regnskap", r"regnskap|resultat\s*og\s*balanse|balanse", "regnskap",
+          listed=r"årsregnskap|\bregnskap\s+(for\s+)?(20\d\d|siste år|fjor)|resultatregnskap\s+og\s+balanse|resultat\s+og\s+balanse\s+(for\s+)?20\d\d"),
+    _rule(r"perioderegnska[bp]", r"perioderegnska[bp]|periode\s*regnskap|delårsregnskap|kvartalsregnskap|saldobalanse|hittil i år", "perioderegnskap",
+          listed=r"perioderegnska[bp]|delårsregnskap|kvartalsregnskap"),
+    _rule(r"driftsbudsjett", r"budsjett", "driftsbudsjett",
+          listed=r"driftsbudsjett|budsjett\s+for\s+drift"),
+    _rule(r"budsjetter/lønnsomhetsberegninger", r"budsjett|lønnsomhet|kalkyle|kontantstrøm|cash\s*flow", "budsjetter eller lønnsomhetsberegninger",
+          listed=r"\w*budsjett|lønnsomhetsberegning|lønnsomhetsanalyse|lønnsomhetskalkyle"),
+    _rule(r"finansiell modell eller likviditetsbudsjett", r"likviditet|finansiell modell|budsjett|kontantstrøm|cash\s*flow", "finansiell modell eller likviditetsbudsjett",
+          listed=r"likviditetsbudsjett|likviditetsprognose|finansiell modell|kontantstrømbudsjett|cash\s*flow[- ]?(budsjett|prognose|modell)"),
+    _rule(r"^selskapsrepresentasjon$|^selska[sp]+presentasjon", r"selskapspresentasjon|selskapsrepresentasjon|pitch|om selskapet|om oss", "selskapspresentasjon",
+          listed=r"selskapspresentasjon|selskapsrepresentasjon|pitch\s*deck|investorpresentasjon"),
+    _rule(r"^prosjektpresentasjon$", r"prosjektpresentasjon|prosjektbeskrivelse|prosjektplan", "prosjektpresentasjon",
+          listed=r"prosjektpresentasjon"),
+    _rule(r"organisasjonskart", r"organisasjonskart|\bCV\b|curriculum|nøkkelperson", "organisasjonskart eller CV-er",
+          listed=r"organisasjonskart|\bCV(-er|er)?\b|curriculum vitae"),
+    _rule(r"letter of intent", r"letter of intent|\bLOI\b|intensjons|kundeavtale|avtale med|pilotkunde|forhåndsbestilling", "kundeavtaler eller LOI",
+          listed=r"letter of intent|\bLOI\b|intensjonsavtale|intensjonserklæring|kundeavtale"),
+    _rule(r"termsheet", r"term\s*sheet|intensjonsbrev|investor", "termsheet eller investor",
+          listed=r"term\s*sheet"),
+    _rule(r"forretningsmodell \(hvis ikke", r"forretningsmodell|business\s*model|canvas|inntektsmodell", "forretningsmodell",
+          listed=r"forretningsmodell|business\s*model\s*canvas"),
+    _rule(r"^konkurrentanalyse", r"konkurr|competitor", "konkurrentanalyse",
+          listed=r"konkurrentanalyse|konkurranseanalyse|competitor analysis"),
+    # Themes whose absence decides a descriptive question
+    _rule(r"konkurrenter og konkurransebilde", r"konkurr|competitor", "konkurrenter"),
+    _rule(r"klimarisiko", r"klima", "klimarisiko"),
+    _rule(r"miljøgevinsten", r"miljø|klima|utslipp|bærekraft", "miljøgevinst"),
+    _rule(r"FoU-utfordringer", r"FoU|forskning|utvikling|R&D", "FoU"),
+    _rule(r"kildehenvisninger", r"kilde|https?://|www\.|\[\d+\]|statistikk|SSB", "kildehenvisninger"),
+]
+
+# A line that lists or refers to attachments
+ATTACHMENT_LINE = re.compile(r"\bvedleg|\bvedlagt|\bbilag", re.IGNORECASE)
+# An attachment line saying something is missing or comes later does not list it
+ATTACHMENT_NEGATION = re.compile(r"\bikke\b|\bmangler\b|\bmanglende\b|ettersend|\bsenere\b|\bvil bli\b", re.IGNORECASE)
+
+def precheck_rule(question: str) -> Optional[PrecheckRule]:
+    """The pre-check rule for a question, if there is one."""
+    return next((rule for rule in PRECHECK_RULES if rule.question.search(question)), None)
+
+def precheck_answers(jobs: Sequence[Tuple[str, str]], application_text: str, max_score: int) -> Dict[int, Tuple[int, str]]:
+    """(score, comment) for the (category, question) jobs the application text decides, keyed by job index."""
+    attachment_lines = [
+        line.strip() for line in application_text.splitlines()
+        if ATTACHMENT_LINE.search(line) and not ATTACHMENT_NEGATION.search(line)
+    ]
+    answers = {}
+    for index, (_, question) in enumerate(jobs):
+        rule = precheck_rule(question)
+        if rule is None:
+            continue
+        if rule.listed is not None:
+            listed = next((line for line in attachment_lines if rule.listed.search(line)), None)
+            if listed is not None:
+                answers[index] = (max_score, f"Automatisk forhåndssjekk: {rule.subject} er oppført som vedlegg (\"{listed[:80]}\").")
+                continue
+        if not rule.mention.search(application_text):
+            answers[index] = (0, f"Automatisk forhåndssjekk: fant ingen omtale av {rule.subject} i søknaden.")
+    return answers
+
+def priority_order(jobs: Sequence[Tuple[str, str]]) -> List[int]:
+    """Job indexes with the questions that move the total score most first.
+
+    The total is the mean of the category means, so a question weighs
+    1 / (categories × questions in its category); ties keep rubric order.
+    """
+    sizes: Dict[str, int] = {}
+    for category, _ in jobs:
+        sizes[category] = sizes.get(category, 0) + 1
+    return sorted(range(len(jobs)), key=lambda index: sizes[jobs[index][0]])
+
+def score_bounds(jobs: Sequence[Tuple[str, str]], outcomes: Sequence[Optional[ScoreOutcome]], max_score: int) -> Tuple[float, float]:
+    """Lowest and highest total score still possible, computed like the report's total.
+
+    Unscored questions (None) may still get 0 to `max_score`; failed ones count as 0.
+    """
+    ranges: Dict[str, List[Tuple[int, int]]] = {}
+    for (category, _), outcome in zip(jobs, outcomes):
+        if outcome is None:
+            ranges.setdefault(category, []).append((0, max_score))
+        else:
+            score = 0 if isinstance(outcome, Exception) else outcome[0]
+            ranges.setdefault(category, []).append((score, score))
+    lows = [round(sum(low for low, _ in scores) / len(scores), 2) for scores in ranges.values()]
+    highs = [round(sum(high for _, high in scores) / len(scores), 2) for scores in ranges.values()]
+    return sum(lows) / len(lows), sum(highs) / len(highs)
+
+def outcome_decided(jobs: Sequence[Tuple[str, str]], outcomes: Sequence[Optional[ScoreOutcome]], max_score: int, thresholds: Sequence[float]) -> bool:
+    """Whether every possible total falls in the same assessment band (between the same `thresholds`)."""
+    low, high = score_bounds(jobs, outcomes, max_score)
+    return sum(low < threshold for threshold in thresholds) == sum(high < threshold for threshold in thresholds)
@@ -1,18 +1,80 @@
-from fastapi import FastAPI, File, UploadFile, Form
-from fastapi.responses import FileResponse, HTMLResponse
-import shutil
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
+import asyncio
+import json
 import os
-from evaluate_application import main as eval_main, create_excel_report, read_application_text, evaluate_application, EVALUATION_QUESTIONS, EVALUATION_QUESTIONS_OPPSTART_1
-import pandas as pd
+from contextlib import asynccontextmanager
+from evaluate_application import create_excel_report, read_application_text, evaluate_application
 import re
+import time
+from jobs import Job, JobManager
+from llm_client import close_backend, resolve_backend
+import metrics
+from rubrics import get_rubric
+from tracing import tracing
+from upload_store import UPLOAD_DIR, UPLOAD_MAX_MB, StoredUpload, UploadTooLarge, receive_upload, release_upload, too_large_message
 
-app = FastAPI()
-
-UPLOAD_DIR = "uploads"
 RESULT_DIR = "results"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(RESULT_DIR, exist_ok=True)
 
+XLSX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# How often an event stream looks for new job events, and how long it may stay
+# silent before a keep-alive comment is sent (so proxies do not close it)
+SSE_POLL_SECONDS = 0.2
+SSE_KEEPALIVE_SECONDS = 15
+
+# Evaluations run in the background on a bounded worker pool (EVAL_JOB_WORKERS)
+job_manager = JobManager()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    job_manager.shutdown()
+    close_backend()
+
+app = FastAPI(lifespan=lifespan)
+
+# Room for the multipart framing and form fields around the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Refuse uploads whose declared size is over UPLOAD_MAX_MB before the body is read.
+
+    Bodies without (or with a wrong) Content-Length are still stopped by
+    receive_upload while the file is read.
+    """
+    max_bytes = int(UPLOAD_MAX_MB * 1024 * 1024)
+    length = request.headers.get("content-length", "")
+    if request.method == "POST" and length.isdigit() and int(length) > max_bytes + MULTIPART_OVERHEAD_BYTES:
+        return JSONResponse({"detail": too_large_message(max_bytes)}, status_code=413)
+    return await call_next(request)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Time every request and count those in flight (see /metrics)."""
+    metrics.HTTP_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.HTTP_IN_FLIGHT.dec()
+        # The route template ("/jobs/{job_id}"), so job ids do not become label values
+        route = getattr(request.scope.get("route"), "path", "ukjent")
+        metrics.HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, method=request.method, route=route, status=status)
+
+@app.get("/metrics")
+def prometheus_metrics():
+    """Latency histograms, token and error counters and in-flight gauges in the Prometheus text format."""
+    if not metrics.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrikker er slått av (METRICS_DISABLED)")
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/", response_class=HTMLResponse)
 def index():
     return """
@@ -31,6 +93,13 @@ def index():
       .dropzone { border: 2px dashed #366092; border-radius: 8px; background: #f0f4fa; color: #366092; text-align: center; padding: 32px 10px; margin-bottom: 18px; transition: border 0.2s, background 0.2s; cursor: pointer; }
       .dropzone.dragover { border-color: #1F4E79; background: #e3eaf5; }
       .file-info { margin: 8px 0 18px 0; color: #1F4E79; font-size: 0.98em; }
+      .status { margin-top: 16px; color: #1F4E79; text-align: center; min-height: 1.2em; }
+      .results { margin-top: 12px; font-size: 0.9em; }
+      .results h3 { color: #1F4E79; font-size: 1em; margin: 14px 0 4px 0; }
+      .results ul { list-style: none; padding: 0; margin: 0; }
+      .results li { padding: 3px 0; border-bottom: 1px solid #e3eaf5; cursor: help; }
+      .results li .score { display: inline-block; min-width: 2.6em; font-weight: 600; color: #1F4E79; }
+      .results li.failed .score { color: #b00020; }
     </style>
     </head>
     <body>
@@ -51,6 +120,8 @@ def index():
         </select>
         <button type='submit'>Evaluer og last ned rapport</button>
       </form>
+      <div class='status' id='status'></div>
+      <div class='results' id='results'></div>
     </div>
     <script>
     const dropzone = document.getElementById('dropzone');
@@ -81,16 +152,85 @@ def index():
         fileInfo.textContent = '';
       }
     }
-    // Nedlasting av fil etter submit
+    const statusEl = document.getElementById('status');
+    const resultsEl = document.getElementById('results');
+    // Sett inn elementet i rekkefølge etter data-index (rekkefølgen i kriteriesettet)
+    function insertByIndex(parent, el) {
+      const next = [...parent.children].find(child => Number(child.dataset.index) > Number(el.dataset.index));
+      parent.insertBefore(el, next || null);
+    }
+    function categoryList(ev) {
+      let section = [...resultsEl.children].find(el => el.dataset.category === ev.category);
+      if (!section) {
+        section = document.createElement('div');
+        section.dataset.category = ev.category;
+        section.dataset.index = ev.index;
+        section.appendChild(document.createElement('h3')).textContent = ev.category;
+        section.appendChild(document.createElement('ul'));
+        insertByIndex(resultsEl, section);
+      }
+      return section.querySelector('ul');
+    }
+    // Vis hvert ferdige spørsmål med én gang, så kategoriene kan leses før rapporten er klar
+    function showResult(ev) {
+      const li = document.createElement('li');
+      li.dataset.index = ev.index;
+      li.title = ev.event === 'finished' ? ev.comment : ev.event === 'skipped' ? 'Ikke vurdert: totalvurderingen kunne ikke lenger endres' : ev.error;
+      const score = li.appendChild(document.createElement('span'));
+      score.className = 'score';
+      if (ev.event === 'finished') {
+        score.textContent = `${ev.score}/${ev.max_score}`;
+      } else if (ev.event === 'skipped') {
+        score.textContent = '–';
+      } else {
+        li.className = 'failed';
+        score.textContent = 'Feil';
+      }
+      li.appendChild(document.createTextNode(ev.question));
+      insertByIndex(categoryList(ev), li);
+    }
+    // Følg jobben som Server-Sent Events til den er ferdig eller feilet
+    function followJob(job_id) {
+      return new Promise((resolve, reject) => {
+        const source = new EventSource('/jobs/' + job_id + '/events');
+        const progress = ev => { statusEl.textContent = `Vurderer spørsmål ${ev.done}/${ev.total}...`; };
+        source.addEventListener('job_started', () => { statusEl.textContent = 'Leser søknaden...'; });
+        source.addEventListener('started', e => progress(JSON.parse(e.data)));
+        for (const name of ['finished', 'failed', 'skipped']) {
+          source.addEventListener(name, e => {
+            const ev = JSON.parse(e.data);
+            showResult(ev);
+            progress(ev);
+          });
+        }
+        source.addEventListener('job_done', e => { source.close(); resolve(JSON.parse(e.data)); });
+        source.addEventListener('job_failed', e => {
+          source.close();
+          reject(new Error(JSON.parse(e.data).error || 'Noe gikk galt under evalueringen.'));
+        });
+        source.onerror = () => {
+          // Nettleseren kobler til på nytt selv; gi bare opp når strømmen er stengt for godt
+          if (source.readyState === EventSource.CLOSED) reject(new Error('Mistet kontakten med evalueringsjobben.'));
+        };
+      });
+    }
+    // Legg jobben i kø, vis resultatene etter hvert og last ned filen når den er klar
     document.getElementById('evalForm').onsubmit = async function(e) {
       e.preventDefault();
       const formData = new FormData(this);
       const btn = this.querySelector('button');
       btn.disabled = true; btn.textContent = 'Vurderer...';
+      resultsEl.replaceChildren();
       try {
         const response = await fetch('/evaluate/', { method: 'POST', body: formData });
-        if (!response.ok) throw new Error('Noe gikk galt under evalueringen.');
-        const blob = await response.blob();
+        if (!response.ok) throw new Error('Noe gikk galt under opplastingen.');
+        const { job_id } = await response.json();
+        statusEl.textContent = 'I kø...';
+        const job = await followJob(job_id);
+        statusEl.textContent = 'Ferdig! Laster ned rapport...';
+        const result = await fetch(job.result_url);
+        if (!result.ok) throw new Error('Kunne ikke laste ned rapporten.');
+        const blob = await result.blob();
         const url = window.URL.createObjectURL(blob);
         const a = document.createElement('a');
         a.href = url;
@@ -98,7 +238,9 @@ def index():
         document.body.appendChild(a);
         a.click();
         a.remove();
+        statusEl.textContent = 'Ferdig!';
       } catch (err) {
+        statusEl.textContent = '';
         alert(err.message);
       } finally {
         btn.disabled = false; btn.textContent = 'Evaluer og last ned rapport';
@@ -110,33 +252,122 @@ def index():
     """
 
 @app.post("/evaluate/")
-def evaluate(file: UploadFile = File(...), oppstartstype: str = Form(...)):
-    # Lagre PDF midlertidig
-    pdf_path = os.path.join(UPLOAD_DIR, file.filename)
-    with open(pdf_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-
-    # Les søknadstekst
-    application_text, selected_pdf = read_application_text(pdf_path)
-    pdf_base_name = re.sub(r'[^\w\-_]', '', file.filename.replace('.pdf', '').replace(' ', '_'))
+async def evaluate(file: UploadFile = File(...), oppstartstype: str = Form(...), backend: str = Form(None)):
+    """Queue an evaluation and return its job id right away.
+
+    The optional `backend` field (openai, local or fake) overrides EVAL_BACKEND for
+    this request, e.g. for load tests against the fake backend.
+    """
+    try:
+        backend = resolve_backend(backend)
+        get_rubric(oppstartstype)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Les filen én gang: hashes og størrelsessjekkes underveis, små filer blir i minnet
+    try:
+        upload = await receive_upload(file)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    job = job_manager.submit(
+        upload.filename,
+        oppstartstype,
+        lambda job: run_evaluation(job, upload, oppstartstype, backend),
+        # Also runs for a job cancelled in the queue at shutdown
+        cleanup=lambda: release_upload(upload),
+    )
+    return {"job_id": job.id, "status_url": f"/jobs/{job.id}"}
+
+def run_evaluation(job: Job, upload: StoredUpload, oppstartstype: str, backend: str = None) -> None:
+    """Evaluate one uploaded PDF and write the Excel report (runs on the job worker pool).
+
+    The job is traced on its own, so the report's "Ytelse" sheet only has this job's stages.
+    The upload is released by the job's cleanup.
+    """
+    with tracing():
+        _run_evaluation(job, upload, oppstartstype, backend)
+
+def _run_evaluation(job: Job, upload: StoredUpload, oppstartstype: str, backend: str = None) -> None:
+    from results_store import append_evaluation
+
+    # Les søknadstekst, fra minnet eller fra den mellomlagrede filen; hashen fra opplastingen er nøkkelen i tekstlageret
+    application_text, _ = read_application_text(upload.path or upload.filename, data=upload.data, sha256=upload.sha256)
+    selected_pdf = upload.filename
+    pdf_base_name = re.sub(r'[^\w\-_]', '', selected_pdf.replace('.pdf', '').replace(' ', '_'))
     
     if oppstartstype == "NIC":
         excel_filename = f"nic_evaluering_resultat_{pdf_base_name}.xlsx"
-        excel_path = os.path.join(RESULT_DIR, excel_filename)
+        excel_path = os.path.join(RESULT_DIR, f"{job.id}_{excel_filename}")
         from evaluate_nic_application import evaluate_nic_application, create_nic_excel_report
-        results_df = evaluate_nic_application(application_text, selected_pdf)
+        results_df = evaluate_nic_application(application_text, selected_pdf, progress_callback=job.update_progress, backend=backend, event_callback=job.add_event)
         create_nic_excel_report(results_df, selected_pdf, excel_path)
-        return FileResponse(excel_path, media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', filename=excel_filename)
-    
-    # Velg riktige spørsmål
-    if oppstartstype == "Oppstart 1":
-        evaluation_questions = EVALUATION_QUESTIONS_OPPSTART_1
+        append_evaluation(results_df, oppstartstype, selected_pdf, upload.sha256)
     else:
-        evaluation_questions = EVALUATION_QUESTIONS
-
-    excel_filename = f"evaluering_resultat_{pdf_base_name}.xlsx"
-    excel_path = os.path.join(RESULT_DIR, excel_filename)
-    # Evaluer søknad
-    results_df = evaluate_application(application_text, selected_pdf, evaluation_questions)
-    create_excel_report(results_df, selected_pdf, excel_path, oppstartstype)
-    return FileResponse(excel_path, media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', filename=excel_filename) 
\ No newline at end of file
+        # Velg riktige spørsmål
+        evaluation_questions = get_rubric(oppstartstype).questions
+
+        excel_filename = f"evaluering_resultat_{pdf_base_name}.xlsx"
+        excel_path = os.path.join(RESULT_DIR, f"{job.id}_{excel_filename}")
+        # Evaluer søknad
+        results_df = evaluate_application(application_text, selected_pdf, evaluation_questions, progress_callback=job.update_progress, backend=backend, event_callback=job.add_event)
+        create_excel_report(results_df, selected_pdf, excel_path, oppstartstype)
+        append_evaluation(results_df, oppstartstype, selected_pdf, upload.sha256)
+
+    job.result_path = excel_path
+    job.result_filename = excel_filename
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    """Status and progress (questions done out of total) for a queued evaluation."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ukjent jobb-id")
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """Server-Sent Events stream of a job's progress.
+
+    One event per question started, finished (score, comment, seconds), failed
+    (error, seconds) or skipped (early stop), framed by job_started and job_done/job_failed; see
+    scoring_engine.emit_event. A reconnecting browser resumes after `Last-Event-ID`.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ukjent jobb-id")
+    try:
+        last_id = int(request.headers.get("last-event-id", "0"))
+    except ValueError:
+        last_id = 0
+
+    async def stream():
+        nonlocal last_id
+        idle = 0.0
+        while True:
+            events = job.events_since(last_id)
+            for event in events:
+                last_id = event["id"]
+                yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+                if event["event"] in ("job_done", "job_failed"):
+                    return
+            if await request.is_disconnected():
+                return
+            idle = 0.0 if events else idle + SSE_POLL_SECONDS
+            if idle >= SSE_KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                idle = 0.0
+            await asyncio.sleep(SSE_POLL_SECONDS)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    """Download the finished Excel report."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ukjent jobb-id")
+    if job.status == "failed":
+        raise HTTPException(status_code=409, detail=f"Evalueringen feilet: {job.error}")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail="Evalueringen er ikke ferdig ennå")
+    return FileResponse(job.result_path, media_type=XLSX_MEDIA_TYPE, filename=job.result_filename)
@@ -0,0 +1,222 @@
+"""Evaluate a whole directory (or manifest) of application PDFs without interaction.
+
+Each finished PDF is appended to a JSONL journal in the output directory, so a
+crash or Ctrl+C can be resumed by running the same command again: PDFs already
+evaluated with the same rubric (matched by file content, not name) are skipped.
+
+    python batch_evaluate.py soknader/ --rubric oppstart2 --output-dir resultater/
+    python batch_evaluate.py manifest.txt --rubric nic --output-dir resultater/ --jobs 4 --max-in-flight 16
+    python batch_evaluate.py soknader/ --rubric oppstart2 --output-dir tørrkjøring/ --backend fake
+    python batch_evaluate.py soknader/ --rubric nic --output-dir resultater/ --comparison sammenligning.xlsx
+    python batch_evaluate.py soknader/ --rubric oppstart2 --output-dir resultater/ --profile --trace tidslinje.json
+
+A manifest is a text file with one PDF path per line (relative to the manifest,
+blank lines and lines starting with # are ignored).
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from typing import Dict, List, Optional
+
+from evaluate_application import create_excel_report, evaluate_application, read_application_text
+from evaluate_nic_application import create_nic_excel_report, evaluate_nic_application
+from llm_client import BACKENDS
+from llm_usage import set_max_in_flight, usage_totals
+from rubrics import RUBRICS
+from text_store import file_sha256
+from tracing import add_profiling_arguments, profiling, tracing
+
+JOURNAL_FILENAME = "journal.jsonl"
+
+def list_pdfs(source: str) -> List[str]:
+    """PDF paths from a directory (non-recursive, sorted) or a manifest file."""
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, "*.pdf")) + glob.glob(os.path.join(source, "*.PDF")))
+    if not os.path.isfile(source):
+        raise Exception(f"❌ FEIL: Fant verken mappe eller manifest '{source}'.")
+    base_dir = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                paths.append(line if os.path.isabs(line) else os.path.join(base_dir, line))
+    return paths
+
+class Journal:
+    """Append-only JSONL record of finished PDFs; every line is flushed and fsynced."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def completed(self) -> Dict[str, dict]:
+        """Latest successful entry per (rubric, content hash); tolerates a torn last line."""
+        entries: Dict[str, dict] = {}
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("status") == "done":
+                    entries[journal_key(entry["rubric"], entry["sha256"])] = entry
+        return entries
+
+    def append(self, entry: dict) -> None:
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+def journal_key(rubric: str, pdf_sha256: str) -> str:
+    return f"{rubric}:{pdf_sha256}"
+
+def evaluate_pdf(pdf_path: str, rubric: str, output_dir: str, pdf_sha256: str, backend: Optional[str] = None) -> dict:
+    """Evaluate one PDF, write its Excel report and return the journal entry."""
+    from results_store import append_evaluation
+
+    oppstartstype = RUBRICS[rubric].label
+    # The hash from run_batch keys the text store, so the file is not hashed a second time
+    application_text, _ = read_application_text(pdf_path, sha256=pdf_sha256)
+    if len(application_text.strip()) < 100:
+        raise Exception(f"❌ FEIL: Kun {len(application_text.strip())} tegn funnet i PDF-en. Er den skannet uten tekst?")
+
+    pdf_base_name = re.sub(r'[^\w\-_]', '', os.path.basename(pdf_path).replace('.pdf', '').replace(' ', '_'))
+    if rubric == "nic":
+        excel_path = os.path.join(output_dir, f"nic_evaluering_resultat_{pdf_base_name}_{pdf_sha256[:8]}.xlsx")
+        results_df = evaluate_nic_application(application_text, pdf_path, backend=backend)
+        create_nic_excel_report(results_df, pdf_path, excel_path)
+    else:
+        questions = RUBRICS[rubric].questions
+        excel_path = os.path.join(output_dir, f"evaluering_resultat_{pdf_base_name}_{pdf_sha256[:8]}.xlsx")
+        results_df = evaluate_application(application_text, pdf_path, questions, backend=backend)
+        create_excel_report(results_df, pdf_path, excel_path, oppstartstype)
+
+    append_evaluation(results_df, oppstartstype, pdf_path, pdf_sha256)
+
+    return {
+        "report": excel_path,
+        "questions": len(results_df),
+        "question_errors": len(results_df.attrs.get("errors", [])),
+    }
+
+def run_batch(pdf_paths: List[str], rubric: str, output_dir: str, jobs: int, backend: Optional[str] = None) -> Dict[str, int]:
+    """Evaluate the PDFs `jobs` at a time, skipping those already in the journal."""
+    os.makedirs(output_dir, exist_ok=True)
+    journal = Journal(os.path.join(output_dir, JOURNAL_FILENAME))
+    completed = journal.completed()
+
+    pending = []
+    for pdf_path in pdf_paths:
+        pdf_sha256 = file_sha256(pdf_path)
+        done = completed.get(journal_key(rubric, pdf_sha256))
+        if done is not None and os.path.exists(done["report"]):
+            continue
+        pending.append((pdf_path, pdf_sha256))
+    skipped = len(pdf_paths) - len(pending)
+    if skipped:
+        print(f"♻️  {skipped} PDF-er er allerede evaluert (fra {journal.path}) og hoppes over")
+    print(f"🚀 Evaluerer {len(pending)} PDF-er, {jobs} om gangen...")
+
+    counts = {"done": 0, "failed": 0, "skipped": skipped}
+
+    def work(pdf_path: str, pdf_sha256: str) -> dict:
+        start = time.perf_counter()
+        entry = {"file": pdf_path, "sha256": pdf_sha256, "rubric": rubric}
+        try:
+            # One trace per PDF for its report's "Ytelse" sheet; spans also reach the run's trace
+            with tracing():
+                entry.update(evaluate_pdf(pdf_path, rubric, output_dir, pdf_sha256, backend))
+            entry["status"] = "done"
+        except Exception as e:
+            entry.update(status="failed", error=str(e))
+        entry["seconds"] = round(time.perf_counter() - start, 2)
+        journal.append(entry)
+        return entry
+
+    executor = ThreadPoolExecutor(max_workers=max(1, jobs))
+    futures = [executor.submit(copy_context().run, work, pdf_path, pdf_sha256) for pdf_path, pdf_sha256 in pending]
+    try:
+        for future in as_completed(futures):
+            entry = future.result()
+            counts[entry["status"]] += 1
+            finished = counts["done"] + counts["failed"]
+            if entry["status"] == "done":
+                print(f"✅ [{finished}/{len(pending)}] {os.path.basename(entry['file'])} → {entry['report']} ({entry['seconds']}s)")
+            else:
+                print(f"❌ [{finished}/{len(pending)}] {os.path.basename(entry['file'])}: {entry['error']}")
+    except KeyboardInterrupt:
+        running = sum(1 for future in futures if future.running())
+        print(f"\n🛑 Avbrutt. {running} PDF-er som er i gang fullføres og journalføres; "
+              f"kjør samme kommando igjen for å fortsette.")
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    return counts
+
+def write_comparison(output_dir: str, rubric: str, excel_filename: str) -> int:
+    """Compare every PDF in the journal evaluated with `rubric` in one workbook; returns how many.
+
+    The results are read back from the per-PDF reports one at a time, so PDFs
+    evaluated in earlier (resumed) runs are included too.
+    """
+    from comparison_report import create_comparison_report, read_report_results
+
+    journal = Journal(os.path.join(output_dir, JOURNAL_FILENAME))
+    entries = sorted(
+        (entry for entry in journal.completed().values() if entry["rubric"] == rubric and os.path.exists(entry["report"])),
+        key=lambda entry: entry["file"],
+    )
+    applications = ((os.path.basename(entry["file"]), read_report_results(entry["report"])) for entry in entries)
+    return create_comparison_report(applications, excel_filename, RUBRICS[rubric].label)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="Directory of PDFs or a manifest file with one PDF path per line")
+    parser.add_argument("--rubric", choices=sorted(RUBRICS), required=True)
+    parser.add_argument("--output-dir", required=True, help="Where reports and the journal are written")
+    parser.add_argument("--jobs", type=int, default=2, help="PDFs evaluated at the same time")
+    parser.add_argument("--max-in-flight", type=int, default=16, help="Global cap on simultaneous LLM requests (0 = no cap)")
+    parser.add_argument("--backend", choices=BACKENDS, help="Model backend (default EVAL_BACKEND); fake needs no API key or network")
+    parser.add_argument("--comparison", metavar="XLSX", help="Also write one workbook ranking and comparing all evaluated PDFs (placed in --output-dir unless a path is given)")
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+
+    set_max_in_flight(args.max_in_flight)
+    pdf_paths = list_pdfs(args.source)
+    if not pdf_paths:
+        print(f"❌ Ingen PDF-filer funnet i {args.source}")
+        return
+
+    usage_before = usage_totals()
+    start = time.perf_counter()
+    with profiling(args.profile, args.trace):
+        counts = run_batch(pdf_paths, args.rubric, args.output_dir, args.jobs, args.backend)
+    elapsed = time.perf_counter() - start
+    usage = {name: value - usage_before[name] for name, value in usage_totals().items()}
+
+    processed = counts["done"] + counts["failed"]
+    per_minute = processed / elapsed * 60 if elapsed > 0 else 0.0
+    print("\n📊 Oppsummering")
+    print(f"   PDF-er: {counts['done']} fullført, {counts['failed']} feilet, {counts['skipped']} hoppet over")
+    print(f"   Tid: {elapsed:.1f}s ({per_minute:.1f} PDF-er per minutt)")
+    print(f"   API-kall: {usage['requests']} ({usage['failures']} feilet), "
+          f"tokens: {usage['prompt_tokens']:,} inn / {usage['completion_tokens']:,} ut")
+
+    if args.comparison:
+        comparison_path = args.comparison if os.path.dirname(args.comparison) else os.path.join(args.output_dir, args.comparison)
+        compared = write_comparison(args.output_dir, args.rubric, comparison_path)
+        print(f"📈 Sammenligning av {compared} søknader lagret i {comparison_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dotenv import load_dotenv
+from typing import Callable, Dict, List, Optional, Tuple
+
+from error_policy import question_deadline
+from scoring_engine import DEFAULT_MAX_CONCURRENCY, EventCallback, ProgressCallback, ScoreOutcome, emit_event, emit_outcome
+from llm_usage import metered_calls
+from score_cache import lookup_score, store_score
+from tracing import traced
+
+# Load environment variables from .env file
+load_dotenv()
+
+# "question" = one call per question (old behaviour), "category" = one call per
+# category, "rubric" = the whole rubric in a single call
+SCORING_MODES = ("question", "category", "rubric")
+DEFAULT_SCORING_MODE = os.getenv("EVAL_SCORING_MODE", "question")
+
+# How many times questions with missing/malformed answers are re-asked in batch
+# before falling back to one call per question
+DEFAULT_MAX_REASKS = 2
+
+BatchItem = Tuple[str, str]  # (category, question)
+
+def format_batch_questions(items: List[BatchItem]) -> str:
+    """Number the questions as `[nr] (kategori) spørsmål`, one per line, starting at 1."""
+    return "\n".join(f"[{nr}] ({category}) {question}" for nr, (category, question) in enumerate(items, 1))
+
+def batch_max_tokens(question_count: int) -> int:
+    """Completion budget for a batched answer: same room per question as the single-question prompt."""
+    return min(4096, 100 + 150 * question_count)
+
+@traced("parse")
+def parse_batch_response(response_text: str, question_count: int, max_score: int) -> Dict[int, Tuple[int, str]]:
+    """Parse a JSON batch answer and return the valid answers keyed by 1-based question number.
+
+    Answers that are missing, out of range or malformed are left out so the
+    caller can re-ask only those questions.
+    """
+    text = (response_text or "").strip()
+    # Models sometimes wrap JSON in a ```json fence despite instructions
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1).strip()
+    try:
+        payload = json.loads(text)
+    except json.JSONDecodeError:
+        return {}
+
+    answers = payload.get("svar") if isinstance(payload, dict) else payload
+    if not isinstance(answers, list):
+        return {}
+
+    parsed = {}
+    for answer in answers:
+        if not isinstance(answer, dict):
+            continue
+        nr, score, comment = answer.get("nr"), answer.get("score"), answer.get("kommentar")
+        if isinstance(score, str) and score.strip().isdigit():
+            score = int(score.strip())
+        if isinstance(nr, bool) or not isinstance(nr, int) or not 1 <= nr <= question_count:
+            continue
+        if isinstance(score, bool) or not isinstance(score, int) or not 0 <= score <= max_score:
+            continue
+        if not isinstance(comment, str) or not comment.strip():
+            continue
+        parsed.setdefault(nr, (score, comment.strip()))
+    return parsed
+
+def group_batch_items(jobs: List[BatchItem], indexes: List[int], scoring_mode: str) -> List[List[int]]:
+    """Split job indexes into batches: one per category, or a single batch for the whole rubric."""
+    if not indexes:
+        return []
+    if scoring_mode == "rubric":
+        return [list(indexes)]
+    groups: Dict[str, List[int]] = {}
+    for index in indexes:
+        groups.setdefault(jobs[index][0], []).append(index)
+    return list(groups.values())
+
+def score_questions_batched(
+    jobs: List[BatchItem],
+    batch_fn: Callable[[List[BatchItem]], str],
+    question_fn: Callable[[str, str], Tuple[int, str]],
+    scoring_mode: str = "category",
+    max_score: int = 3,
+    max_in_flight: int = DEFAULT_MAX_CONCURRENCY,
+    max_reasks: int = DEFAULT_MAX_REASKS,
+    cache_key_fn: Optional[Callable[[str, str], str]] = None,
+    progress_callback: Optional[ProgressCallback] = None,
+    event_callback: Optional[EventCallback] = None,
+    answered: Optional[Dict[int, Tuple[int, str]]] = None,
+) -> List[ScoreOutcome]:
+    """Score jobs with one completion per batch, re-asking only missing or invalid answers.
+
+    `batch_fn` receives a list of (category, question) and returns the raw model
+    answer; `question_fn` is the per-question fallback used for anything still
+    unanswered after `max_reasks` re-asks. With `cache_key_fn` cached answers are
+    reused and only cache misses are sent; `answered` holds outcomes already
+    known by job index, which are reported but not asked. Outcomes are returned in job order.
+    `progress_callback(done, total)` is called whenever answers come in, and
+    `event_callback` gets question events (see scoring_engine.emit_event); a
+    batched answer's `seconds` is the time of the call that produced it.
+    """
+    if scoring_mode not in SCORING_MODES or scoring_mode == "question":
+        raise ValueError(f"Ugyldig batch-modus: '{scoring_mode}'. Velg 'category' eller 'rubric'.")
+
+    outcomes: List[Optional[ScoreOutcome]] = [(answered or {}).get(index) for index in range(len(jobs))]
+    if cache_key_fn is not None:
+        for index, (category, question) in enumerate(jobs):
+            if outcomes[index] is None:
+                outcomes[index] = lookup_score(cache_key_fn(category, question))
+    uncached = [index for index, outcome in enumerate(outcomes) if outcome is None]
+    groups = group_batch_items(jobs, uncached, scoring_mode)
+    print(f"\n📦 Evaluerer {len(uncached)} av {len(jobs)} spørsmål i {len(groups)} samlede kall ({scoring_mode})...")
+
+    progress_lock = threading.Lock()
+    progress = {"done": 0}
+
+    def report_progress(indexes: List[int], seconds: float, tokens: Optional[Dict[str, int]] = None) -> None:
+        """Count `indexes` (whose outcomes are set) as done and emit their events."""
+        with progress_lock:
+            for index in indexes:
+                progress["done"] += 1
+                emit_outcome(event_callback, outcomes[index], index, *jobs[index], progress["done"], len(jobs), max_score, seconds, tokens)
+            done = progress["done"]
+        if progress_callback is not None and indexes:
+            progress_callback(done, len(jobs))
+
+    report_progress([index for index, outcome in enumerate(outcomes) if outcome is not None], 0.0)
+
+    def run_group(indexes: List[int]) -> None:
+        pending = list(indexes)
+        for index in pending:
+            emit_event(event_callback, "started", index, *jobs[index], progress["done"], len(jobs))
+        for attempt in range(1 + max_reasks):
+            if not pending:
+                return
+            items = [jobs[i] for i in pending]
+            start = time.perf_counter()
+            with metered_calls() as meter:
+                try:
+                    parsed = parse_batch_response(batch_fn(items), len(items), max_score)
+                except Exception as e:
+                    print(f"  ❌ Samlet kall feilet ({len(items)} spørsmål): {e}")
+                    parsed = {}
+            for nr, outcome in parsed.items():
+                outcomes[pending[nr - 1]] = outcome
+                if cache_key_fn is not None:
+                    store_score(cache_key_fn(*jobs[pending[nr - 1]]), *outcome)
+            # The call's tokens are shared evenly by the questions it asked
+            share = {name: meter[name] // len(items) for name in ("prompt_tokens", "completion_tokens")}
+            report_progress([pending[nr - 1] for nr in sorted(parsed)], time.perf_counter() - start, share)
+            missing = [index for nr, index in enumerate(pending, 1) if nr not in parsed]
+            if missing and attempt < max_reasks:
+                print(f"  🔁 {len(missing)} av {len(items)} svar mangler eller er ugyldige – spør på nytt")
+            pending = missing
+
+        for index in pending:
+            category, question = jobs[index]
+            print(f"  ↩️  Faller tilbake til enkeltspørsmål: {question[:50]}...")
+            start = time.perf_counter()
+            with metered_calls() as meter, question_deadline():
+                try:
+                    outcomes[index] = question_fn(category, question)
+                except Exception as e:
+                    outcomes[index] = e
+            report_progress([index], time.perf_counter() - start, meter)
+
+    if not groups:
+        return outcomes
+
+    workers = max(1, min(max_in_flight, len(groups)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-scoring") as executor:
+        # Each group runs in its own copy of this context so it records into the current trace and meter
+        for _ in executor.map(lambda context, group: context.run(run_group, group), [copy_context() for _ in groups], groups):
+            pass
+
+    answered = sum(1 for outcome in outcomes if not isinstance(outcome, Exception))
+    print(f"  ✅ {answered}/{len(jobs)} spørsmål besvart")
+    return outcomes
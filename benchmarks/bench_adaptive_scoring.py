@@ -0,0 +1,98 @@
+"""Benchmark: AI calls saved by the pre-check and early stop, per application quality.
+
+Scores `--applications` simulated applications per quality level with a scripted
+scorer (each question's score is drawn around the level, no network) twice:
+  * full      – every question asked, in rubric order,
+  * adaptive  – pre-checked questions answered locally, the rest in priority
+                order with the early stop of adaptive_scoring,
+and reports the calls each needed and whether the overall assessment (the
+band in the Excel report) always came out the same. Weak applications omit
+attachments and sections, strong ones list them.
+
+    python benchmarks/bench_adaptive_scoring.py --applications 30 --rubric oppstart2
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+LEVELS = (0.3, 1.0, 1.8, 2.6)  # mean score per question
+
+STRONG_TEXT = """Søknaden beskriver problemet, konkurrenter og klimarisiko, med kilder fra SSB.
+Vedlegg 1: Årsregnskap 2023
+Vedlegg 2: Perioderegnskap per mars
+Vedlegg 3: Driftsbudsjett og likviditetsbudsjett 2025-2027
+Vedlegg 4: Selskapspresentasjon
+Vedlegg 5: Prosjektpresentasjon
+Vedlegg 6: Organisasjonskart og CV
+Vedlegg 7: Letter of Intent fra pilotkunde
+Vedlegg 8: Termsheet fra investor
+"""
+WEAK_TEXT = "Vi har en god idé og et stort marked. Teamet er motivert.\n"
+
+
+def band(results, thresholds):
+    """The report's assessment band for (category, score) results."""
+    categories = {}
+    for category, score in results:
+        categories.setdefault(category, []).append(score)
+    total = sum(round(sum(s) / len(s), 2) for s in categories.values()) / len(categories)
+    return sum(total < threshold for threshold in thresholds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, default=30)
+    parser.add_argument("--rubric", default="oppstart2", choices=["oppstart1", "oppstart2"])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated seconds per AI call")
+    args = parser.parse_args()
+
+    import contextlib
+    import io
+    from adaptive_scoring import outcome_decided, precheck_answers, priority_order
+    from evaluate_application import ASSESSMENT_THRESHOLDS, EVALUATION_QUESTIONS, EVALUATION_QUESTIONS_OPPSTART_1
+    from scoring_engine import rubric_jobs, score_questions_concurrently
+
+    jobs = rubric_jobs(EVALUATION_QUESTIONS_OPPSTART_1 if args.rubric == "oppstart1" else EVALUATION_QUESTIONS)
+    print(f"Rubrikk {args.rubric}: {len(jobs)} spørsmål, {args.applications} søknader per nivå")
+    print(f"{'nivå':>5} {'kall (full)':>12} {'kall (adaptiv)':>15} {'spart':>7} {'forhåndssjekk':>14} {'samme vurdering':>16}")
+    for level in LEVELS:
+        text = STRONG_TEXT if level >= 1.8 else WEAK_TEXT
+        full_calls = adaptive_calls = prechecked_total = same = 0
+        for application in range(args.applications):
+            rng = random.Random(application * 1000 + int(level * 10))
+            truth = [min(3, max(0, round(rng.gauss(level, 0.8)))) for _ in jobs]
+            prechecked = precheck_answers(jobs, text, 3)
+            # The scripted model agrees with the pre-check where it has an answer
+            for index, (score, _) in prechecked.items():
+                truth[index] = score
+            lookup = {job: truth[index] for index, job in enumerate(jobs)}
+            calls = []
+
+            def score_fn(category, question):
+                calls.append(question)
+                time.sleep(args.latency * rng.uniform(0.5, 1.5))
+                return lookup[(category, question)], "simulert"
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                outcomes = score_questions_concurrently(
+                    jobs, score_fn, max_in_flight=args.concurrency, answered=prechecked, order=priority_order(jobs),
+                    stop_when=lambda o: outcome_decided(jobs, o, 3, ASSESSMENT_THRESHOLDS))
+            adaptive = [(category, 0 if outcome is None else outcome[0]) for (category, _), outcome in zip(jobs, outcomes)]
+            full = [(category, score) for (category, _), score in zip(jobs, truth)]
+            full_calls += len(jobs)
+            adaptive_calls += len(calls)
+            prechecked_total += len(prechecked)
+            same += band(adaptive, ASSESSMENT_THRESHOLDS) == band(full, ASSESSMENT_THRESHOLDS)
+        n = args.applications
+        print(f"{level:>5.1f} {full_calls / n:>12.1f} {adaptive_calls / n:>15.1f} {1 - adaptive_calls / full_calls:>6.0%} "
+              f"{prechecked_total / n:>14.1f} {same:>11}/{n}")
+
+
+if __name__ == "__main__":
+    main()
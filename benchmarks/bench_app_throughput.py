@@ -0,0 +1,104 @@
+"""Benchmark: end-to-end throughput of the web app's /evaluate/ endpoint, fully offline.
+
+Starts app.py under uvicorn with the in-process fake model backend
+(EVAL_BACKEND=fake), uploads `--requests` synthetic application PDFs at once
+and follows each job until its Excel report can be downloaded. The fake
+backend's latency distribution and error rates are set from the command line
+and seeded, so runs are reproducible and need neither network nor API key.
+
+    python benchmarks/bench_app_throughput.py --requests 12 --pages 20 --latency-ms 800 --error-rate 0.01
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx  # noqa: E402
+
+from synthetic_pdf import generate_pdf  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=12, help="Evaluations uploaded at the same time")
+    parser.add_argument("--pages", type=int, default=20, help="Pages per synthetic PDF")
+    parser.add_argument("--rubric", default="Oppstart 2", choices=["Oppstart 1", "Oppstart 2", "Oppstart 3", "NIC"])
+    parser.add_argument("--workers", type=int, default=4, help="EVAL_JOB_WORKERS for the app")
+    parser.add_argument("--latency-ms", type=float, default=800, help="Median fake completion latency (ms)")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Spread of the log-normal latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of completions failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of completions answered with 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8799)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_app_")
+    pdf_paths = [generate_pdf(os.path.join(workdir, f"soknad_{i}.pdf"), args.pages, seed=i) for i in range(args.requests)]
+    os.environ.update({
+        "EVAL_BACKEND": "fake",
+        "EVAL_FAKE_LATENCY_MS": str(args.latency_ms),
+        "EVAL_FAKE_LATENCY_SIGMA": str(args.sigma),
+        "EVAL_FAKE_ERROR_RATE": str(args.error_rate),
+        "EVAL_FAKE_RATE_LIMIT_RATE": str(args.rate_limit_rate),
+        "EVAL_FAKE_SEED": str(args.seed),
+        "EVAL_JOB_WORKERS": str(args.workers),
+        "SCORE_CACHE_DISABLED": "1",  # every run must reach the backend
+        "TEXT_STORE_DISABLED": "1",  # and extract every PDF
+    })
+    os.chdir(workdir)  # uploads/ and results/ are created in the working directory
+
+    import uvicorn
+    from app import app
+    from llm_client import get_backend
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    def run_job(pdf_path: str):
+        start = time.perf_counter()
+        with httpx.Client(base_url=base_url, timeout=60) as client, open(pdf_path, "rb") as pdf:
+            response = client.post("/evaluate/", files={"file": (os.path.basename(pdf_path), pdf, "application/pdf")},
+                                   data={"oppstartstype": args.rubric})
+            response.raise_for_status()
+            job_id = response.json()["job_id"]
+            while True:
+                job = client.get(f"/jobs/{job_id}").json()
+                if job["status"] in ("done", "failed"):
+                    break
+                time.sleep(0.1)
+            if job["status"] == "done":
+                client.get(job["result_url"]).raise_for_status()
+        return job["status"], time.perf_counter() - start
+
+    print(f"{args.requests} søknader à {args.pages} sider, rubrikk {args.rubric}, {args.workers} jobbarbeidere; "
+          f"fake-backend: median {args.latency_ms:.0f} ms (sigma {args.sigma}), "
+          f"{args.error_rate:.0%} feil, {args.rate_limit_rate:.0%} rate limit")
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=args.requests) as pool:
+        outcomes = list(pool.map(run_job, pdf_paths))
+    elapsed = time.perf_counter() - start
+    server.should_exit = True
+
+    latencies = sorted(seconds for _, seconds in outcomes)
+    transport = get_backend("fake").transport
+    print(f"{'ferdige':>8} {'feilet':>7} {'tid (s)':>8} {'per minutt':>11} {'p50 (s)':>8} {'p95 (s)':>8} {'kall':>6} {'429':>5} {'500':>5}")
+    print(f"{sum(1 for status, _ in outcomes if status == 'done'):>8} {sum(1 for status, _ in outcomes if status == 'failed'):>7} "
+          f"{elapsed:>8.2f} {len(outcomes) / elapsed * 60:>11.1f} {statistics.median(latencies):>8.2f} "
+          f"{latencies[int(0.95 * (len(latencies) - 1))]:>8.2f} {transport.requests:>6} {transport.rate_limited:>5} {transport.errors:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark: the multi-application comparison workbook (comparison_report.py).
+
+Feeds `--applications` synthetic results tables of `--questions` rows each to
+create_comparison_report from a generator, the way batch_evaluate.py reads
+them back one report at a time, and reports time and peak RSS per size. Each
+size runs in its own process; memory should stay flat as the count grows.
+
+    python benchmarks/bench_comparison_report.py --applications 100 1000 --questions 50 --rubric nic
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_excel_report import synthetic_results  # noqa: E402
+
+
+def render(rubric: str, applications: int, questions: int, path: str) -> dict:
+    """Write one comparison workbook in this process and measure it (run via --child)."""
+    from comparison_report import create_comparison_report
+
+    results = ((f"soknad_{i:05d}.pdf", synthetic_results(rubric, questions, seed=i)) for i in range(applications))
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    create_comparison_report(results, path, "NIC" if rubric == "nic" else "Oppstart 2")
+    seconds = time.perf_counter() - start
+    rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"seconds": seconds, "rss_before_mb": rss_before / 1024, "rss_peak_mb": rss_peak / 1024,
+            "size_mb": os.path.getsize(path) / 1024 / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--questions", type=int, default=50, help="Result rows per application")
+    parser.add_argument("--rubric", default="nic", choices=["oppstart", "nic"])
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(render(args.rubric, args.applications[0], args.questions, args.output)))
+        return
+
+    print(f"Rubrikk {args.rubric}, {args.questions} spørsmål per søknad")
+    print(f"{'søknader':>9} {'rader':>8} {'tid (s)':>8} {'søknader/s':>11} {'RSS før (MB)':>13} {'topp RSS (MB)':>14} {'økning (MB)':>12} {'fil (MB)':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for applications in args.applications:
+            path = os.path.join(tmp, f"sammenligning_{applications}.xlsx")
+            output = subprocess.check_output([sys.executable, os.path.abspath(__file__), "--child", "--rubric", args.rubric,
+                                              "--applications", str(applications), "--questions", str(args.questions),
+                                              "--output", path], cwd=ROOT)
+            m = json.loads(output.decode().strip().splitlines()[-1])
+            print(f"{applications:>9} {applications * args.questions:>8} {m['seconds']:>8.2f} {applications / m['seconds']:>11.1f} "
+                  f"{m['rss_before_mb']:>13.0f} {m['rss_peak_mb']:>14.0f} {m['rss_peak_mb'] - m['rss_before_mb']:>12.0f} {m['size_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
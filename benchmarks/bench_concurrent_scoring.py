@@ -0,0 +1,75 @@
+"""Benchmark: sequential vs. concurrent per-question scoring.
+
+Starts the local fake completion server with injected latency, points the
+evaluators at it and compares wall-clock time of the old sequential loop
+(max_concurrency=1) with the bounded-concurrency engine.
+
+    python benchmarks/bench_concurrent_scoring.py --latency 0.3 --concurrency 4 8 16
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_openai_server import start_fake_server  # noqa: E402
+
+SAMPLE_TEXT = (
+    "Selskapet utvikler en ny løsning for sporing av fiskehelse i oppdrettsanlegg. "
+    "Prosjektet skal validere teknologien sammen med tre pilotkunder. "
+) * 200
+
+
+def run_once(rubric: str, max_concurrency: int) -> float:
+    import evaluate_application as ea
+    import evaluate_nic_application as nic
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if rubric == "nic":
+            df = nic.evaluate_nic_application(SAMPLE_TEXT, "benchmark.pdf", max_concurrency=max_concurrency)
+        else:
+            questions = ea.EVALUATION_QUESTIONS_OPPSTART_1 if rubric == "oppstart1" else ea.EVALUATION_QUESTIONS
+            df = ea.evaluate_application(SAMPLE_TEXT, "benchmark.pdf", questions, max_concurrency=max_concurrency)
+    elapsed = time.perf_counter() - start
+    failed = int(df["Kommentar"].str.startswith("Feil ved evaluering").sum())
+    if failed:
+        raise RuntimeError(f"{failed} spørsmål feilet mot testserveren – sjekk openai-versjonen")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rubric", choices=["oppstart1", "oppstart2", "nic"], default="oppstart2")
+    parser.add_argument("--latency", type=float, default=0.3, help="Injected latency per completion (s)")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 8, 16])
+    args = parser.parse_args()
+
+    server, _ = start_fake_server(latency=args.latency, jitter=args.jitter)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["SCORE_CACHE_DISABLED"] = "1"  # every run must reach the server
+
+    print(f"Fake server: {server.base_url} (latens {args.latency}s ± {args.jitter}s), rubrikk: {args.rubric}")
+    baseline = run_once(args.rubric, 1)
+    questions = server.requests
+    print(f"{'samtidighet':>12} {'tid (s)':>10} {'speedup':>9} {'maks i luften':>14}")
+    print(f"{1:>12} {baseline:>10.2f} {1.0:>8.2f}x {server.max_in_flight:>14}")
+
+    for concurrency in args.concurrency:
+        server.reset_counters()
+        elapsed = run_once(args.rubric, concurrency)
+        print(f"{concurrency:>12} {elapsed:>10.2f} {baseline / elapsed:>8.2f}x {server.max_in_flight:>14}")
+
+    print(f"\n{questions} spørsmål per kjøring")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Benchmark: Excel report writing, old cell-by-cell functions vs. report_writer.
+
+Renders synthetic result tables of `--rows` rows with
+  * legacy      – the previous create_excel_report / create_nic_excel_report,
+  * normal      – the report_writer versions in a normal workbook,
+  * write-only  – the report_writer versions in streaming write-only mode,
+each in its own process so the peak RSS (ru_maxrss) belongs to that run alone,
+and checks that all three files hold the same values, formatting, merges,
+column widths and row heights.
+
+    python benchmarks/bench_excel_report.py --rows 1000 100000 --rubric oppstart
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+IMPLEMENTATIONS = ("legacy", "normal", "write-only")
+
+
+def synthetic_results(rubric: str, rows: int, seed: int = None):
+    """A results DataFrame shaped like the evaluators' output, with `rows` rows."""
+    import pandas as pd
+
+    rng = random.Random(rows if seed is None else seed)
+    if rubric == "nic":
+        from evaluate_nic_application import NIC_EVALUATION_CRITERIA as criteria
+        max_score = 4
+    else:
+        from evaluate_application import EVALUATION_QUESTIONS as criteria
+        max_score = 3
+    categories = list(criteria)
+    records = []
+    for i in range(rows):
+        category = categories[i * len(categories) // rows]  # grouped by category, like the evaluators
+        record = {
+            "Kategori": category,
+            "Spørsmål": f"Spørsmål {i + 1}: hvordan beskriver søknaden {category.lower()}?",
+            "Score": rng.randint(0, max_score),
+            "Kommentar": " ".join(rng.choice(["Søknaden", "beskriver", "markedet", "godt", "men", "mangler", "tall", "for", "risiko."]) for _ in range(40)),
+        }
+        if rubric == "nic":
+            record = {"Kategori": category, "Vekt (%)": criteria[category]["weight"], **{k: v for k, v in record.items() if k != "Kategori"}}
+        records.append(record)
+    return pd.DataFrame(records)
+
+
+def render(implementation: str, rubric: str, rows: int, path: str) -> dict:
+    """Write one report in this process and measure it (run via --child)."""
+    results_df = synthetic_results(rubric, rows)
+    if implementation == "legacy":
+        from legacy_excel_report import create_excel_report, create_nic_excel_report
+        kwargs = {}
+    else:
+        from evaluate_application import create_excel_report
+        from evaluate_nic_application import create_nic_excel_report
+        kwargs = {"write_only": implementation == "write-only"}
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if rubric == "nic":
+        create_nic_excel_report(results_df, "soknad.pdf", path, **kwargs)
+    else:
+        create_excel_report(results_df, "soknad.pdf", path, "Oppstart 2", **kwargs)
+    seconds = time.perf_counter() - start
+    rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"seconds": seconds, "rss_before_mb": rss_before / 1024, "rss_peak_mb": rss_peak / 1024}
+
+
+def run_child(implementation: str, rubric: str, rows: int, path: str) -> dict:
+    output = subprocess.check_output([sys.executable, os.path.abspath(__file__), "--child", implementation,
+                                      "--rubric", rubric, "--rows", str(rows), "--output", path], cwd=ROOT)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def sheet_fingerprint(path: str):
+    """Everything visible in a report: cell values and formatting, merges, widths and heights."""
+    from openpyxl import load_workbook
+
+    ws = load_workbook(path).active
+    cells = {}
+    for row in ws.iter_rows():
+        for cell in row:
+            if cell.value is None and not cell.has_style:
+                continue
+            cells[cell.coordinate] = (cell.value, repr(cell.font), repr(cell.fill), repr(cell.border), repr(cell.alignment))
+    return {
+        "title": ws.title,
+        "cells": cells,
+        "merged": sorted(str(r) for r in ws.merged_cells.ranges),
+        "widths": {k: d.width for k, d in ws.column_dimensions.items() if d.width},
+        "heights": {k: d.height for k, d in ws.row_dimensions.items() if d.height},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--rubric", default="oppstart", choices=["oppstart", "nic"])
+    parser.add_argument("--skip-compare", action="store_true", help="Do not check that the files are identical")
+    parser.add_argument("--child", choices=IMPLEMENTATIONS, help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(render(args.child, args.rubric, args.rows[0], args.output)))
+        return
+
+    print(f"Rubrikk {args.rubric}")
+    print(f"{'rader':>8} {'variant':>11} {'tid (s)':>8} {'speedup':>8} {'RSS før (MB)':>13} {'topp RSS (MB)':>14} {'økning (MB)':>12} {'lik':>4}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            paths = {name: os.path.join(tmp, f"{name}_{rows}.xlsx") for name in IMPLEMENTATIONS}
+            measured = {name: run_child(name, args.rubric, rows, paths[name]) for name in IMPLEMENTATIONS}
+            reference = None if args.skip_compare else sheet_fingerprint(paths["legacy"])
+            for name in IMPLEMENTATIONS:
+                m = measured[name]
+                same = "-" if args.skip_compare else ("ja" if name == "legacy" or sheet_fingerprint(paths[name]) == reference else "NEI")
+                print(f"{rows:>8} {name:>11} {m['seconds']:>8.2f} {measured['legacy']['seconds'] / m['seconds']:>7.2f}x "
+                      f"{m['rss_before_mb']:>13.0f} {m['rss_peak_mb']:>14.0f} {m['rss_peak_mb'] - m['rss_before_mb']:>12.0f} {same:>4}")
+
+
+if __name__ == "__main__":
+    main()
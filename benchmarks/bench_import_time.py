@@ -0,0 +1,75 @@
+"""Benchmark: import time of the entry points, with a regression threshold.
+
+Imports each entry point `--runs` times in a fresh interpreter under
+`python -X importtime` and reports
+  * median   – median cumulative import time of the module (ms),
+  * tregest  – the slowest modules it pulled in (cumulative ms, last run),
+  * tunge    – heavy dependencies that were loaded although only first use
+               should load them (pandas, openpyxl, PyPDF2, openai, httpx, pyarrow).
+Exits with status 1 when an entry point is slower than `--max-ms` or loads a
+heavy dependency, so it can guard against regressions in CI.
+
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --runs 9 --max-ms app=900 --max-ms batch_evaluate=250
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry point -> default limit (ms); the app includes FastAPI itself (~0.5 s)
+DEFAULT_LIMITS = {"app": 1000.0, "batch_evaluate": 300.0, "evaluate_application": 300.0}
+HEAVY_MODULES = ("pandas", "openpyxl", "PyPDF2", "openai", "httpx", "pyarrow")
+
+
+def import_once(module: str) -> Tuple[float, List[Tuple[float, str]], List[str]]:
+    """Cumulative ms for importing `module`, its slowest imports and the heavy modules it loaded."""
+    check = f"import sys, {module}; print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", check], cwd=ROOT, capture_output=True, text=True, check=True)
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        timings.append((int(cumulative) / 1000, name))
+    total = next(ms for ms, name in timings if name == module)
+    slowest = sorted((timing for timing in timings if timing[1] != module), reverse=True)[:5]
+    heavy = [name for name in result.stdout.strip().split(",") if name]
+    return total, slowest, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modules", nargs="+", default=list(DEFAULT_LIMITS))
+    parser.add_argument("--max-ms", action="append", default=[], metavar="MODUL=MS", help="Limit per entry point, e.g. app=900")
+    args = parser.parse_args()
+
+    limits: Dict[str, float] = dict(DEFAULT_LIMITS)
+    for entry in args.max_ms:
+        module, _, ms = entry.partition("=")
+        limits[module] = float(ms)
+
+    failed = []
+    print(f"{'modul':>22} {'median (ms)':>12} {'grense':>8} {'tunge':>10}  tregest")
+    for module in args.modules:
+        runs = [import_once(module) for _ in range(args.runs)]
+        median = statistics.median(total for total, _, _ in runs)
+        _, slowest, heavy = runs[-1]
+        limit = limits.get(module)
+        print(f"{module:>22} {median:>12.0f} {limit or 0:>8.0f} {','.join(heavy) or '-':>10}  "
+              + ", ".join(f"{name} {ms:.0f}" for ms, name in slowest))
+        if heavy or (limit is not None and median > limit):
+            failed.append(module)
+
+    if failed:
+        sys.exit(f"❌ FEIL: Importtiden har gått tilbake for {', '.join(failed)}")
+    print("✅ Alle innganger importeres innenfor grensen")
+
+
+if __name__ == "__main__":
+    main()
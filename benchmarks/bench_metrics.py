@@ -0,0 +1,77 @@
+"""Benchmark: cost of the /metrics instrumentation.
+
+Times the updates the evaluators make per question, single-threaded and from
+`--threads` threads at once (they share one lock per metric):
+  * counter    – Counter.inc with two labels (tokens, requests),
+  * histogram  – Histogram.observe with two labels (question latency),
+  * question   – everything one scored question records: a latency
+                 observation, three token counters and one request counter,
+and renders the exposition for `--categories` categories, as a scrape would.
+With METRICS_DISABLED=1 the same updates return at once, for comparison.
+
+    python benchmarks/bench_metrics.py --updates 200000 --threads 8
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def per_update_ns(update, updates: int, threads: int) -> float:
+    """Wall-clock nanoseconds per update with `threads` threads sharing `updates` calls."""
+    share = updates // threads
+
+    def work():
+        for i in range(share):
+            update(i)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - start) / (share * threads) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=200000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--categories", type=int, default=20)
+    args = parser.parse_args()
+
+    import metrics
+
+    counter = metrics.Counter("bench_tokens_total", "Benchmark counter.", ["model", "kind"])
+    histogram = metrics.Histogram("bench_question_seconds", "Benchmark histogram.", ["rubric", "category"])
+    categories = [f"Kategori {number}" for number in range(args.categories)]
+
+    def question(i):
+        histogram.observe(0.8, rubric="oppstart2", category=categories[i % len(categories)])
+        counter.inc(3000, model="gpt-4o", kind="prompt")
+        counter.inc(0, model="gpt-4o", kind="cached")
+        counter.inc(40, model="gpt-4o", kind="completion")
+        counter.inc(model="gpt-4o", kind="request")
+
+    variants = [
+        ("counter", lambda i: counter.inc(model="gpt-4o", kind="prompt")),
+        ("histogram", lambda i: histogram.observe(0.8, rubric="oppstart2", category=categories[i % len(categories)])),
+        ("question", question),
+    ]
+    print(f"Metrikker {'på' if metrics.METRICS_ENABLED else 'av'}, {args.updates} oppdateringer")
+    print(f"{'oppdatering':>12} {'1 tråd (ns)':>12} {f'{args.threads} tråder (ns)':>16}")
+    for name, update in variants:
+        print(f"{name:>12} {per_update_ns(update, args.updates, 1):>12.0f} {per_update_ns(update, args.updates, args.threads):>16.0f}")
+
+    start = time.perf_counter()
+    text = metrics.render()
+    print(f"Eksponering: {len(text.splitlines())} linjer på {(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmark: PDF text extraction, old string-building loop vs. pdf_extraction.
+
+Generates synthetic multi-hundred-page PDFs and times
+  * legacy      – the previous `text += page_text + "\\n"` loop,
+  * sequential  – pdf_extraction with a single process,
+  * parallel    – pdf_extraction with a process pool,
+checking that all three produce identical text.
+
+    python benchmarks/bench_pdf_extraction.py --pages 100 300 600 --workers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import PyPDF2  # noqa: E402
+
+from pdf_extraction import extract_pdf_text  # noqa: E402
+from synthetic_pdf import generate_pdf  # noqa: E402
+
+
+def legacy_extract(filename: str) -> str:
+    """The extraction loop read_application_text used before pdf_extraction."""
+    text = ""
+    with open(filename, "rb") as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page in pdf_reader.pages:
+            page_text = page.extract_text()
+            text += page_text + "\n"
+    return text
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 300, 600])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"{'sider':>6} {'legacy (s)':>11} {'sekvensiell (s)':>16} {'parallell (s)':>14} {'speedup':>8} {'tregeste side (s)':>18}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for pages in args.pages:
+            path = generate_pdf(os.path.join(tmp, f"soknad_{pages}.pdf"), pages)
+            legacy_s, legacy_text = timed(legacy_extract, path)
+            seq_s, seq = timed(extract_pdf_text, path, workers=1, progress=False, use_store=False)
+            par_s, par = timed(extract_pdf_text, path, workers=args.workers, parallel_min_pages=1, progress=False, use_store=False)
+            if not legacy_text == seq.text == par.text:
+                raise RuntimeError(f"Ulik tekst for {pages} sider")
+            print(f"{pages:>6} {legacy_s:>11.2f} {seq_s:>16.2f} {par_s:>14.2f} {legacy_s / par_s:>7.2f}x "
+                  f"{max(par.page_seconds):>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark: how soon results show up in the /jobs/{id}/events stream compared to the report.
+
+Starts app.py under uvicorn with the fake model backend, uploads one synthetic
+PDF and follows its Server-Sent Events stream. Reports when the first question
+and the first complete category were scored, when the Excel report was ready,
+and the per-call latency carried by the events.
+
+    python benchmarks/bench_progress_events.py --pages 20 --latency-ms 800 --scoring-mode question
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx  # noqa: E402
+
+from synthetic_pdf import generate_pdf  # noqa: E402
+
+
+def read_events(response):
+    """Parse an SSE response into event dicts (the JSON `data:` lines)."""
+    for line in response.iter_lines():
+        if line.startswith("data: "):
+            yield json.loads(line[len("data: "):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--rubric", default="Oppstart 2", choices=["Oppstart 1", "Oppstart 2", "Oppstart 3", "NIC"])
+    parser.add_argument("--scoring-mode", default="question", choices=["question", "category", "rubric"])
+    parser.add_argument("--latency-ms", type=float, default=800, help="Median fake completion latency (ms)")
+    parser.add_argument("--port", type=int, default=8798)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_events_")
+    pdf_path = generate_pdf(os.path.join(workdir, "soknad.pdf"), args.pages)
+    os.environ.update({
+        "EVAL_BACKEND": "fake",
+        "EVAL_FAKE_LATENCY_MS": str(args.latency_ms),
+        "EVAL_SCORING_MODE": args.scoring_mode,
+        "SCORE_CACHE_DISABLED": "1",
+        "TEXT_STORE_DISABLED": "1",
+    })
+    os.chdir(workdir)
+
+    import uvicorn
+    from app import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    scored_at = defaultdict(list)  # category -> seconds after upload at which each question was scored
+    latencies, kinds = [], Counter()
+    with contextlib.redirect_stdout(io.StringIO()), httpx.Client(base_url=f"http://127.0.0.1:{args.port}", timeout=120) as client:
+        start = time.perf_counter()
+        with open(pdf_path, "rb") as pdf:
+            job_id = client.post("/evaluate/", files={"file": ("soknad.pdf", pdf, "application/pdf")},
+                                 data={"oppstartstype": args.rubric}).json()["job_id"]
+        with client.stream("GET", f"/jobs/{job_id}/events") as response:
+            for event in read_events(response):
+                kinds[event["event"]] += 1
+                now = time.perf_counter() - start
+                if event["event"] in ("finished", "failed"):
+                    latencies.append(event["seconds"])
+                    scored_at[event["category"]].append(now)
+                elif event["event"] in ("job_done", "job_failed"):
+                    report_ready = now
+    server.should_exit = True
+    first_scored = min(min(times) for times in scored_at.values())
+    first_category = min(max(times) for times in scored_at.values())
+
+    print(f"{args.rubric}, {args.pages} sider, modus {args.scoring_mode}, fake-latens median {args.latency_ms:.0f} ms")
+    print(f"  hendelser: {dict(kinds)}")
+    print(f"  første score etter {first_scored:.2f}s, første hele kategori etter {first_category:.2f}s, "
+          f"rapport klar etter {report_ready:.2f}s")
+    if latencies:
+        latencies.sort()
+        print(f"  latens per kall fra hendelsene: p50 {statistics.median(latencies):.2f}s, "
+              f"p95 {latencies[int(0.95 * (len(latencies) - 1))]:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
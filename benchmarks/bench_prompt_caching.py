@@ -0,0 +1,93 @@
+"""Benchmark: provider-side prompt caching, question-first vs. stable-first prompts.
+
+Runs every question of the rubric against the fake completion server with its
+prompt-cache imitation switched on, once with the old layout (question before
+the application text) and once through prompts.scoring_messages (system prompt
+and application text first, question last). Uncached prompt tokens cost
+`--token-latency` seconds per 1000, so the cached share shows up in latency.
+
+    python benchmarks/bench_prompt_caching.py --pages 20 --token-latency 0.05
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_openai_server import start_fake_server  # noqa: E402
+
+PAGE_TEXT = (
+    "Selskapet utvikler en ny løsning for sporing av fiskehelse i oppdrettsanlegg. "
+    "Prosjektet skal validere teknologien sammen med tre pilotkunder i Nordland og Troms. "
+) * 25
+
+
+def legacy_score(backend, question: str, application_text: str) -> None:
+    """The prompt layout get_score_from_openai used before prompts.py: question first."""
+    prompt = f"""Basert på følgende søknad, gi en score fra 0-3 for dette spørsmålet: {question}
+
+    Søknad: {application_text}
+
+    Svar i følgende format:
+    Score: [0-3]
+    Kommentar: [kort kommentar]"""
+    backend.chat_completion(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": "Du er en ekspert på å evaluere søknader til Innovasjon Norge. Gi en score fra 0-3 og en kort kommentar."},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.3,
+        max_tokens=200,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20, help="Synthetic application length in pages")
+    parser.add_argument("--latency", type=float, default=0.1, help="Fixed latency per completion (s)")
+    parser.add_argument("--token-latency", type=float, default=0.05, help="Seconds per 1000 uncached prompt tokens")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    server, _ = start_fake_server(latency=args.latency, prompt_cache=True, token_latency=args.token_latency)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["SCORE_CACHE_DISABLED"] = "1"  # every run must reach the server
+    os.environ["EVAL_CONTEXT_MODE"] = "full"  # retrieval would vary the prefix per question
+
+    import evaluate_application as ea
+    from llm_client import get_backend
+
+    jobs = [(category, question) for category, questions in ea.EVALUATION_QUESTIONS.items() for question in questions]
+    print(f"{len(jobs)} spørsmål, {args.pages} sider (~{len(PAGE_TEXT) * args.pages // 4:,} tokens), "
+          f"{args.token_latency}s per 1000 ubufrede tokens, {args.concurrency} samtidige kall")
+    print(f"{'oppsett':>14} {'prompt-tokens':>14} {'fra cache':>10} {'snitt per kall (s)':>19} {'tid (s)':>8}")
+
+    runs = (
+        ("spørsmål først", lambda text, category, question: legacy_score(get_backend(), question, text)),
+        ("stabilt først", lambda text, category, question: ea.get_score_from_openai(question, text, category)),
+    )
+    for index, (label, score) in enumerate(runs):
+        # A fresh text per run so the second layout cannot reuse the first one's prefixes
+        application_text = f"Søknad {index}\n" + PAGE_TEXT * args.pages
+        server.reset_counters()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(lambda job: score(application_text, *job), jobs))
+        elapsed = time.perf_counter() - start
+        cached_share = server.cached_tokens / server.prompt_tokens if server.prompt_tokens else 0.0
+        print(f"{label:>14} {server.prompt_tokens:>14,} {cached_share:>10.0%} "
+              f"{elapsed * args.concurrency / server.requests:>19.2f} {elapsed:>8.2f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
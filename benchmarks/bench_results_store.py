@@ -0,0 +1,89 @@
+"""Benchmark: cross-application queries from the Parquet results store vs. re-parsing Excel.
+
+Stores `--applications` synthetic evaluations of `--questions` questions each,
+both in a temporary results store and as Excel reports, then times the mean
+score per category
+  * excel      – reading every report back with read_report_results,
+  * parquet    – a column scan of the store, one file per evaluation,
+  * compacted  – the same scan after compact() merged the files,
+plus slowest_questions on the compacted store.
+
+    python benchmarks/bench_results_store.py --applications 200 --questions 50 --rubric nic
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_excel_report import synthetic_results
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--rubric", default="nic", choices=["oppstart", "nic"])
+    args = parser.parse_args()
+
+    import pandas as pd
+    from comparison_report import read_report_results
+    from evaluate_application import create_excel_report
+    from evaluate_nic_application import create_nic_excel_report
+    import results_store
+
+    oppstartstype = "NIC" if args.rubric == "nic" else "Oppstart 2"
+    with tempfile.TemporaryDirectory() as tmp:
+        store = os.path.join(tmp, "results")
+        reports = []
+        rng = random.Random(0)
+        for i in range(args.applications):
+            results_df = synthetic_results(args.rubric, args.questions, seed=i)
+            results_df.attrs["run"] = {"model": "gpt-4o", "backend": "fake", "scoring_mode": "question", "prompt_version": "bench", "max_score": 4 if args.rubric == "nic" else 3}
+            results_df.attrs["question_stats"] = {
+                "seconds": [rng.lognormvariate(0, 0.5) for _ in range(args.questions)],
+                "prompt_tokens": [rng.randint(2000, 9000) for _ in range(args.questions)],
+                "completion_tokens": [rng.randint(50, 300) for _ in range(args.questions)],
+            }
+            results_store.append_evaluation(results_df, oppstartstype, f"soknad_{i}.pdf", path=store)
+            report = os.path.join(tmp, f"soknad_{i}.xlsx")
+            if args.rubric == "nic":
+                create_nic_excel_report(results_df, f"soknad_{i}.pdf", report)
+            else:
+                create_excel_report(results_df, f"soknad_{i}.pdf", report, oppstartstype)
+            reports.append(report)
+
+        def from_excel():
+            scores = pd.concat([read_report_results(report) for report in reports], ignore_index=True)
+            return scores.groupby("Kategori")["Score"].mean()
+
+        rows = args.applications * args.questions
+        print(f"{args.applications} søknader × {args.questions} spørsmål = {rows} rader, rubrikk {args.rubric}")
+        print(f"{'variant':>24} {'tid (s)':>8} {'speedup':>8}")
+        excel, excel_seconds = timed(from_excel)
+        print(f"{'excel':>24} {excel_seconds:>8.3f} {1:>7.2f}x")
+        parquet, seconds = timed(lambda: results_store.mean_score_by_category(path=store))
+        print(f"{'parquet':>24} {seconds:>8.3f} {excel_seconds / seconds:>7.2f}x")
+        merged, _ = timed(lambda: results_store.compact(store))
+        compacted, seconds = timed(lambda: results_store.mean_score_by_category(path=store))
+        print(f"{'compacted':>24} {seconds:>8.3f} {excel_seconds / seconds:>7.2f}x  ({merged} filer slått sammen)")
+        _, seconds = timed(lambda: results_store.slowest_questions(path=store))
+        print(f"{'slowest (compacted)':>24} {seconds:>8.3f}")
+
+        same = all(abs(excel[row.category] - row.mean_score) < 1e-9 for row in compacted.itertuples())
+        print(f"Samme snitt per kategori: {'ja' if same and len(compacted) == len(excel) else 'NEI'}")
+
+
+if __name__ == "__main__":
+    main()
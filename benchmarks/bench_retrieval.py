@@ -0,0 +1,95 @@
+"""Benchmark: whole application vs. retrieved passages as prompt context.
+
+Extracts a synthetic PDF, then runs the chosen rubric against the local fake
+completion server twice – once with EVAL_CONTEXT_MODE=full and once with
+retrieval – and reports prompt tokens, wall-clock time and the one-off cost
+of building the BM25 index.
+
+    python benchmarks/bench_retrieval.py --pages 300 --budget 6000 --top-k 12
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_openai_server import start_fake_server  # noqa: E402
+from synthetic_pdf import generate_pdf  # noqa: E402
+
+
+def run_rubric(rubric: str, application_text: str, scoring_mode: str, max_concurrency: int) -> float:
+    import evaluate_application as ea
+    import evaluate_nic_application as nic
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if rubric == "nic":
+            nic.evaluate_nic_application(application_text, "benchmark.pdf", max_concurrency=max_concurrency, scoring_mode=scoring_mode)
+        else:
+            questions = ea.EVALUATION_QUESTIONS_OPPSTART_1 if rubric == "oppstart1" else ea.EVALUATION_QUESTIONS
+            ea.evaluate_application(application_text, "benchmark.pdf", questions, max_concurrency=max_concurrency, scoring_mode=scoring_mode)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rubric", choices=["oppstart1", "oppstart2", "nic"], default="oppstart2")
+    parser.add_argument("--pages", type=int, default=300, help="Synthetic PDF length in pages")
+    parser.add_argument("--budget", type=int, default=6000, help="Token budget per question")
+    parser.add_argument("--top-k", type=int, default=12, help="Maximum passages per question")
+    parser.add_argument("--scoring-mode", choices=["question", "category", "rubric"], default="question")
+    parser.add_argument("--latency", type=float, default=0.05, help="Injected latency per completion (s)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    server, _ = start_fake_server(latency=args.latency)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["SCORE_CACHE_DISABLED"] = "1"  # every run must reach the server
+    os.environ["TEXT_STORE_DISABLED"] = "1"
+
+    import retrieval
+    from pdf_extraction import extract_pdf_text
+
+    retrieval.EVAL_CONTEXT_TOKEN_BUDGET = args.budget
+    retrieval.EVAL_CONTEXT_TOP_K = args.top_k
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = generate_pdf(os.path.join(tmp, "soknad.pdf"), args.pages)
+        extraction = extract_pdf_text(path, progress=False, use_store=False)
+    text = extraction.text
+
+    start = time.perf_counter()
+    index = retrieval.get_index(text)
+    build_s = time.perf_counter() - start
+    start = time.perf_counter()
+    index.top_chunks("Utløsende effekt av støtte fra Innovasjon Norge", args.top_k, args.budget)
+    query_ms = (time.perf_counter() - start) * 1000
+
+    print(f"Rubrikk: {args.rubric}, {args.pages} sider (~{retrieval.estimate_tokens(text):,} tokens), "
+          f"{len(index.chunks)} utdrag, budsjett {args.budget} tokens / topp {args.top_k}")
+    print(f"BM25-indeks bygget på {build_s:.2f}s, ett oppslag tar {query_ms:.1f} ms")
+    print(f"{'kontekst':>10} {'kall':>6} {'prompt-tokens':>14} {'tid (s)':>9}")
+
+    baseline_tokens = None
+    for mode in ("full", "retrieval"):
+        retrieval.EVAL_CONTEXT_MODE = mode
+        server.reset_counters()
+        elapsed = run_rubric(args.rubric, text, args.scoring_mode, args.concurrency)
+        if baseline_tokens is None:
+            baseline_tokens = server.prompt_tokens
+        saved = 1 - server.prompt_tokens / baseline_tokens if baseline_tokens else 0.0
+        print(f"{mode:>10} {server.requests:>6} {server.prompt_tokens:>14,} {elapsed:>9.2f}   "
+              f"({saved:.0%} færre prompt-tokens)")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
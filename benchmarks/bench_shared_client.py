@@ -0,0 +1,73 @@
+"""Benchmark: both evaluators running concurrently on the shared completion backend.
+
+Runs `--applications` Oppstart-evaluations and as many NIC-evaluations at the
+same time against the local fake completion server, once with keep-alive
+switched off (a new TCP connection per call) and once with the pooled
+llm_client backend. Reports calls, TCP connections opened and wall-clock time.
+
+    python benchmarks/bench_shared_client.py --applications 4 --latency 0.05
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_openai_server import start_fake_server  # noqa: E402
+
+SAMPLE_TEXT = (
+    "Selskapet utvikler en ny løsning for sporing av fiskehelse i oppdrettsanlegg. "
+    "Prosjektet skal validere teknologien sammen med tre pilotkunder. "
+) * 200
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, default=4, help="Evaluations per rubric, all run at once")
+    parser.add_argument("--latency", type=float, default=0.05, help="Injected latency per completion (s)")
+    parser.add_argument("--concurrency", type=int, default=8, help="max_concurrency per evaluation")
+    args = parser.parse_args()
+
+    server, _ = start_fake_server(latency=args.latency)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["SCORE_CACHE_DISABLED"] = "1"  # every run must reach the server
+
+    import evaluate_application as ea
+    import evaluate_nic_application as nic
+    import llm_client
+
+    def evaluate(index: int):
+        text = f"Søknad {index}\n" + SAMPLE_TEXT
+        if index % 2:
+            return nic.evaluate_nic_application(text, f"nic_{index}.pdf", max_concurrency=args.concurrency)
+        return ea.evaluate_application(text, f"in_{index}.pdf", ea.EVALUATION_QUESTIONS, max_concurrency=args.concurrency)
+
+    print(f"{args.applications} Oppstart- og {args.applications} NIC-evalueringer samtidig, latens {args.latency}s")
+    print(f"{'klient':>18} {'kall':>6} {'TCP-forbindelser':>17} {'feilet':>7} {'tid (s)':>8}")
+
+    keepalive = llm_client.EVAL_HTTP_KEEPALIVE_SECONDS
+    for label, keepalive_seconds in (("uten keep-alive", 0.0), ("delt pool", keepalive)):
+        llm_client.EVAL_HTTP_KEEPALIVE_SECONDS = keepalive_seconds
+        llm_client.configure_backend(base_url=server.base_url)
+        server.reset_counters()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=2 * args.applications) as pool:
+            frames = list(pool.map(evaluate, range(2 * args.applications)))
+        elapsed = time.perf_counter() - start
+        failed = sum(int(df["Kommentar"].str.startswith("Feil ved evaluering").sum()) for df in frames)
+        print(f"{label:>18} {server.requests:>6} {server.connections:>17} {failed:>7} {elapsed:>8.2f}")
+
+    llm_client.EVAL_HTTP_KEEPALIVE_SECONDS = keepalive
+    llm_client.close_backend()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Benchmark: retry traffic from malformed answers, line-prefix parsing vs. structured output.
+
+The fake completion server lets `--malformed-rate` of the answers drift from
+the requested format. Two ways of scoring the rubric are compared:
+  * prefix     – the old `Score:` / `Kommentar:` line scraping, where a bad
+                 answer means sending the whole prompt (with the application) again,
+  * structured – JSON schema output via structured_output, where a bad answer
+                 gets a short format-only repair request.
+Reports calls, prompt tokens spent on retries/repairs and unresolved questions.
+
+    python benchmarks/bench_structured_output.py --malformed-rate 0.1 --pages 20
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_openai_server import start_fake_server  # noqa: E402
+
+PAGE_TEXT = (
+    "Selskapet utvikler en ny løsning for sporing av fiskehelse i oppdrettsanlegg. "
+    "Prosjektet skal validere teknologien sammen med tre pilotkunder i Nordland og Troms. "
+) * 25
+
+MAX_ATTEMPTS = 3
+
+
+def prefix_score(backend, question: str, application_text: str) -> bool:
+    """Old layout and parsing; a reply without the expected prefixes is asked again in full."""
+    prompt = f"""Basert på følgende søknad, gi en score fra 0-3 for dette spørsmålet: {question}
+
+    Søknad: {application_text}
+
+    Svar i følgende format:
+    Score: [0-3]
+    Kommentar: [kort kommentar]"""
+    for _ in range(MAX_ATTEMPTS):
+        reply = backend.chat_completion(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": "Du er en ekspert på å evaluere søknader til Innovasjon Norge. Gi en score fra 0-3 og en kort kommentar."},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.3,
+            max_tokens=200,
+        ).parse().choices[0].message.content
+        lines = reply.split("\n")
+        if any(line.startswith("Score:") for line in lines) and any(line.startswith("Kommentar:") for line in lines):
+            return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20, help="Synthetic application length in pages")
+    parser.add_argument("--malformed-rate", type=float, default=0.1, help="Share of answers that drift from the format")
+    parser.add_argument("--latency", type=float, default=0.05, help="Injected latency per completion (s)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    server, _ = start_fake_server(latency=args.latency, malformed_rate=args.malformed_rate)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["SCORE_CACHE_DISABLED"] = "1"  # every run must reach the server
+    os.environ["EVAL_CONTEXT_MODE"] = "full"
+
+    import evaluate_application as ea
+    from error_policy import ScoringError
+    from llm_client import get_backend
+    from llm_usage import usage_totals
+
+    jobs = [(category, question) for category, questions in ea.EVALUATION_QUESTIONS.items() for question in questions]
+    application_text = PAGE_TEXT * args.pages
+    print(f"{len(jobs)} spørsmål, {args.pages} sider (~{len(application_text) // 4:,} tokens), "
+          f"{args.malformed_rate:.0%} av svarene har formatfeil")
+    print(f"{'parsing':>11} {'kall':>6} {'prompt-tokens':>14} {'ekstra tokens':>14} {'uløste':>7}")
+
+    def run(score, malformed_rate: float):
+        server.malformed_rate = malformed_rate
+        server.reset_counters()
+        with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            outcomes = list(pool.map(lambda job: score(*job), jobs))
+        return server.requests, server.prompt_tokens, sum(1 for ok in outcomes if not ok)
+
+    def structured(category, question):
+        try:
+            ea.get_score_from_openai(question, application_text, category)
+            return True
+        except ScoringError:
+            return False
+
+    for label, score in (("prefix", lambda c, q: prefix_score(get_backend(), q, application_text)), ("structured", structured)):
+        _, clean_tokens, _ = run(score, 0.0)  # same run without format drift, for the extra-token count
+        before = usage_totals()
+        calls, tokens, unresolved = run(score, args.malformed_rate)
+        print(f"{label:>11} {calls:>6} {tokens:>14,} {tokens - clean_tokens:>14,} {unresolved:>7}")
+        usage = {name: value - before[name] for name, value in usage_totals().items()}
+        if usage["parsed"]:
+            print(f"{'':>11} formatfeil i {usage['parse_failures']} av {usage['parsed']} svar "
+                  f"({usage['parse_failures'] / usage['parsed']:.1%}), {usage['repaired']} reparert")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark: handling an uploaded PDF before extraction, disk round trip vs. upload_store.
+
+For synthetic PDFs of `--pages` pages, times the work from the received upload
+to an open PDF reader with the document hash, `--repeat` times each:
+  * disk     – the old path: write the upload to uploads/, hash the file by
+               reading it back, open the reader on the file,
+  * memory   – receive_upload keeps the bytes (hashed while read) and the
+               reader opens them from memory,
+  * spill    – receive_upload with UPLOAD_MEMORY_MAX_MB set to 0, so the file
+               goes to a content-addressed file (the path for large uploads).
+Parsing the pages afterwards costs the same in all three.
+
+    python benchmarks/bench_upload.py --pages 5 50 300 --repeat 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_pdf import generate_pdf
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 50, 300])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from starlette.datastructures import UploadFile
+    from pdf_extraction import _open_reader
+    from text_store import file_sha256
+    from upload_store import receive_upload, release_upload
+
+    def spooled(data: bytes) -> UploadFile:
+        # Like Starlette's form parser: up to 1 MB in memory, then a temporary file
+        spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+        spool.write(data)
+        spool.seek(0)
+        return UploadFile(spool, filename="soknad.pdf")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        async def disk(data: bytes) -> None:
+            upload = spooled(data)
+            path = os.path.join(tmp, f"{os.urandom(8).hex()}_{upload.filename}")
+            with open(path, "wb") as buffer:
+                buffer.write(await upload.read())
+            file_sha256(path)
+            len(_open_reader(path).pages)
+            os.unlink(path)
+
+        async def memory(data: bytes, memory_max_bytes=None) -> None:
+            upload = await receive_upload(spooled(data), memory_max_bytes=memory_max_bytes, directory=tmp)
+            len(_open_reader(upload.path or upload.filename, upload.data).pages)
+            release_upload(upload)
+
+        variants = [("disk", disk), ("memory", memory), ("spill", lambda data: memory(data, 0))]
+        print(f"{'sider':>6} {'MB':>6} " + " ".join(f"{name + ' (ms)':>12}" for name, _ in variants) + f" {'speedup':>8}")
+        for pages in args.pages:
+            pdf = generate_pdf(os.path.join(tmp, f"bench_{pages}.pdf"), pages)
+            with open(pdf, "rb") as f:
+                data = f.read()
+            medians = []
+            for _, variant in variants:
+                seconds = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    asyncio.run(variant(data))
+                    seconds.append(time.perf_counter() - start)
+                medians.append(statistics.median(seconds) * 1000)
+            print(f"{pages:>6} {len(data) / 1e6:>6.2f} " + " ".join(f"{ms:>12.2f}" for ms in medians) + f" {medians[0] / medians[1]:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
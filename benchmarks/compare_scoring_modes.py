@@ -0,0 +1,76 @@
+"""Token/latency comparison: per-question vs. batched scoring.
+
+Runs the chosen rubric against the local fake completion server once per
+scoring mode and reports completion calls, prompt/completion tokens and
+wall-clock time. `--drop-rate` makes the server leave out some batched
+answers so the re-ask path is included in the numbers.
+
+    python benchmarks/compare_scoring_modes.py --pages 40 --drop-rate 0.1
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_openai_server import start_fake_server  # noqa: E402
+
+PAGE_TEXT = (
+    "Selskapet utvikler en ny løsning for sporing av fiskehelse i oppdrettsanlegg. "
+    "Prosjektet skal validere teknologien sammen med tre pilotkunder i Nordland og Troms. "
+) * 25
+
+
+def run_mode(rubric: str, scoring_mode: str, application_text: str, max_concurrency: int) -> float:
+    import evaluate_application as ea
+    import evaluate_nic_application as nic
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if rubric == "nic":
+            nic.evaluate_nic_application(application_text, "benchmark.pdf", max_concurrency=max_concurrency, scoring_mode=scoring_mode)
+        else:
+            questions = ea.EVALUATION_QUESTIONS_OPPSTART_1 if rubric == "oppstart1" else ea.EVALUATION_QUESTIONS
+            ea.evaluate_application(application_text, "benchmark.pdf", questions, max_concurrency=max_concurrency, scoring_mode=scoring_mode)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rubric", choices=["oppstart1", "oppstart2", "nic"], default="oppstart2")
+    parser.add_argument("--pages", type=int, default=40, help="Synthetic application length in pages")
+    parser.add_argument("--latency", type=float, default=0.3, help="Injected latency per completion (s)")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Share of batched answers the server leaves out")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    server, _ = start_fake_server(latency=args.latency, drop_rate=args.drop_rate)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["SCORE_CACHE_DISABLED"] = "1"  # every run must reach the server
+
+    application_text = PAGE_TEXT * args.pages
+    print(f"Rubrikk: {args.rubric}, {args.pages} sider (~{len(application_text) // 4:,} tokens), "
+          f"latens {args.latency}s, drop-rate {args.drop_rate}")
+    print(f"{'modus':>10} {'kall':>6} {'prompt-tokens':>14} {'svar-tokens':>12} {'tid (s)':>9}")
+
+    baseline_tokens = None
+    for mode in ("question", "category", "rubric"):
+        server.reset_counters()
+        elapsed = run_mode(args.rubric, mode, application_text, args.concurrency)
+        if baseline_tokens is None:
+            baseline_tokens = server.prompt_tokens
+        saved = 1 - server.prompt_tokens / baseline_tokens if baseline_tokens else 0.0
+        print(f"{mode:>10} {server.requests:>6} {server.prompt_tokens:>14,} {server.completion_tokens:>12,} "
+              f"{elapsed:>9.2f}   ({saved:.0%} færre prompt-tokens)")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Offline evaluation of routing policies on stored responses.
+
+Replays the shadow-mode log (EVAL_ROUTING_SHADOW=1 answers every question with
+two cheap samples and the large model, see routing.py) through each policy and
+reports, against the all-large-model baseline:
+  * eskalert  – share of questions sent on to the large model,
+  * latens    – mean seconds per question (cheap samples one after the other,
+                plus the large call when escalated),
+  * kostnad   – USD per application at the `--price` list prices,
+  * enighet   – share of questions with the same score as the baseline, and
+                within one point of it.
+No API calls are made. Without a log, `--synthetic N` replays N generated
+applications instead, to try the harness out.
+
+    EVAL_ROUTING_SHADOW=1 python batch_evaluate.py soknader/ --rubric oppstart2 --output-dir resultater/
+    python benchmarks/eval_routing_policies.py --log .cache/routing_log.jsonl --by-category
+    python benchmarks/eval_routing_policies.py --synthetic 40
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_POLICIES = ["cheap", "confidence", "agreement", "borderline", "confidence+agreement", "confidence+borderline"]
+# USD per million prompt/completion tokens
+DEFAULT_PRICES = {"gpt-4o": (2.50, 10.00), "gpt-4o-mini": (0.15, 0.60)}
+
+
+def synthetic_log(applications: int, seed: int = 0) -> List[dict]:
+    """Shadow records for generated applications: the cheap model errs more on mid-scale questions and knows it."""
+    from evaluate_application import EVALUATION_QUESTIONS
+    from scoring_engine import rubric_jobs
+
+    rng = random.Random(seed)
+    records = []
+    for application in range(applications):
+        quality = rng.uniform(0.3, 2.7)
+        for category, question in rubric_jobs(EVALUATION_QUESTIONS):
+            truth = min(3, max(0, round(rng.gauss(quality, 0.9))))
+            hard = 0 < truth < 3
+            cheap = []
+            for _ in range(2):
+                wrong = rng.random() < (0.35 if hard else 0.1)
+                score = min(3, max(0, truth + rng.choice([-1, 1]))) if wrong else truth
+                confidence = min(5, max(1, round(rng.gauss(2.8 if wrong else 4.2, 0.8))))
+                cheap.append({"score": score, "confidence": confidence, "seconds": rng.lognormvariate(-0.5, 0.3),
+                              "prompt_tokens": 3000, "completion_tokens": 45})
+            records.append({
+                "document": f"synthetic-{application}", "question": question, "category": category, "max_score": 3,
+                "cheap_model": "gpt-4o-mini", "large_model": "gpt-4o", "cheap": cheap,
+                "large": {"score": truth, "seconds": rng.lognormvariate(0.6, 0.3), "prompt_tokens": 2980, "completion_tokens": 40},
+            })
+    return records
+
+
+def cost(call: dict, model: str, prices: Dict[str, tuple]) -> float:
+    prompt_price, completion_price = prices.get(model, (0.0, 0.0))
+    return (call["prompt_tokens"] * prompt_price + call["completion_tokens"] * completion_price) / 1e6
+
+
+def replay(records: List[dict], policy_for, prices: Dict[str, tuple], min_confidence: int) -> Optional[dict]:
+    """Totals of replaying `records` with `policy_for(category)` deciding each question."""
+    from routing import escalation_reasons, sample_count
+
+    if not records:
+        return None
+    totals = {"questions": 0, "escalated": 0, "seconds": 0.0, "cost": 0.0, "same": 0, "close": 0}
+    for record in records:
+        policy = policy_for(record["category"])
+        samples = record["cheap"][:sample_count(policy)]
+        large = record["large"]
+        # A cheap reply that could not be parsed escalates the policies that would have asked for it
+        unparsable = record.get("cheap_unparsable", False) and len(samples) < sample_count(policy)
+        escalate = policy is None or unparsable or bool(escalation_reasons(policy, [(s["score"], s["confidence"]) for s in samples], record["max_score"], min_confidence))
+        score = large["score"] if escalate else samples[0]["score"]
+        totals["questions"] += 1
+        totals["escalated"] += escalate and policy is not None
+        totals["seconds"] += sum(s["seconds"] for s in samples) + (large["seconds"] if escalate else 0.0)
+        totals["cost"] += sum(cost(s, record["cheap_model"], prices) for s in samples) + (cost(large, record["large_model"], prices) if escalate else 0.0)
+        totals["same"] += score == large["score"]
+        totals["close"] += abs(score - large["score"]) <= 1
+    return totals
+
+
+def print_table(title: str, rows: List[tuple], documents: int) -> None:
+    print(title)
+    print(f"{'policy':>24} {'eskalert':>9} {'latens (s)':>11} {'kostnad/søknad':>15} {'spart':>7} {'lik score':>10} {'±1':>7}")
+    baseline = rows[0][1]
+    for name, totals in rows:
+        n = totals["questions"]
+        saved = 1 - totals["cost"] / baseline["cost"] if baseline["cost"] else 0.0
+        print(f"{name:>24} {totals['escalated'] / n:>8.0%} {totals['seconds'] / n:>11.2f} {totals['cost'] / documents:>14.4f}$ "
+              f"{saved:>6.0%} {totals['same'] / n:>9.1%} {totals['close'] / n:>6.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", help="Shadow-mode log (default EVAL_ROUTING_LOG)")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="Replay N generated applications instead of a log")
+    parser.add_argument("--policies", nargs="+", default=DEFAULT_POLICIES, help="Policies applied to every category")
+    parser.add_argument("--category-policies", default="", help='Also replay this per-category mix, e.g. "Krav fra IN=cheap;Kapning=confidence"')
+    parser.add_argument("--default-policy", default="confidence", help="Policy for categories not in --category-policies")
+    parser.add_argument("--min-confidence", type=int, help="Confidence below this escalates (default EVAL_ROUTING_MIN_CONFIDENCE)")
+    parser.add_argument("--price", action="append", default=[], metavar="MODELL=INN/UT", help="USD per million prompt/completion tokens, e.g. gpt-4o=2.5/10")
+    parser.add_argument("--by-category", action="store_true", help="One table per category")
+    args = parser.parse_args()
+
+    from routing import EVAL_ROUTING_LOG, EVAL_ROUTING_MIN_CONFIDENCE, parse_category_policies, parse_policy
+
+    prices = dict(DEFAULT_PRICES)
+    for entry in args.price:
+        model, _, pair = entry.partition("=")
+        prompt_price, _, completion_price = pair.partition("/")
+        prices[model] = (float(prompt_price), float(completion_price))
+    min_confidence = EVAL_ROUTING_MIN_CONFIDENCE if args.min_confidence is None else args.min_confidence
+
+    if args.synthetic:
+        records = synthetic_log(args.synthetic)
+        source = f"{args.synthetic} genererte søknader"
+    else:
+        path = args.log or EVAL_ROUTING_LOG
+        if not os.path.exists(path):
+            sys.exit(f"❌ FEIL: Fant ikke {path}. Kjør evalueringer med EVAL_ROUTING_SHADOW=1 først, eller bruk --synthetic.")
+        with open(path, encoding="utf-8") as log:
+            records = [json.loads(line) for line in log if line.strip()]
+        source = path
+    documents = len({record["document"] for record in records})
+
+    policies = [("large (baseline)", lambda category: None)]
+    policies += [(name, lambda category, policy=parse_policy(name): policy) for name in args.policies]
+    if args.category_policies:
+        mix, default = parse_category_policies(args.category_policies), parse_policy(args.default_policy)
+        policies.append(("per kategori", lambda category: mix.get(category, default)))
+
+    print(f"{len(records)} spørsmål fra {documents} søknader ({source}), sikkerhet under {min_confidence} eskalerer\n")
+    groups = {"Alle kategorier": records}
+    if args.by_category:
+        for record in records:
+            groups.setdefault(record["category"], []).append(record)
+    for title, group in groups.items():
+        group_documents = len({record["document"] for record in group})
+        print_table(title, [(name, replay(group, policy_for, prices, min_confidence)) for name, policy_for in policies], group_documents)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""Local fake of the OpenAI chat completions API for benchmarks.
+
+Answers every POST to `.../chat/completions` with a valid
+"Score: / Kommentar:" reply after an injected delay, so the evaluators can be
+timed without network access or API costs. Requests with
+`response_format={"type": "json_object"}` get a batched JSON answer with one
+element per `[nr]` question line in the prompt; `drop_rate` leaves out a share
+of those elements to exercise re-asking.
+
+With `rpm_limit`/`tpm_limit` the server enforces request and token budgets over
+a sliding `window` (seconds, 60 like the real API, shorter to compress time):
+requests over budget get 429 with `retry-after`, and every answer carries
+OpenAI-style `x-ratelimit-*` headers. A request counts its prompt tokens plus
+`max_tokens` against the token budget.
+
+With `prompt_cache` the server imitates provider-side prompt caching: once a
+request has finished, later requests sharing a prefix of at least 1024 tokens
+(in 128-token steps) report those tokens as `prompt_tokens_details.cached_tokens`,
+and `token_latency` (seconds per 1000 prompt tokens) is only charged for the
+uncached part.
+
+Structured-output requests (`response_format` of type `json_schema`) get a
+`{"score", "kommentar"}` object or, for the schema named "batch", the batched
+answer. `malformed_rate` makes that share of single answers drift from the
+requested format (prefix text, out-of-range score, markdown bold labels).
+
+Run standalone:
+    python benchmarks/fake_openai_server.py --port 8765 --latency 0.5
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+# Prompt caching granularity in characters (about four characters per token)
+CACHE_MIN_CHARS = 1024 * 4
+CACHE_STEP_CHARS = 128 * 4
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """Threaded HTTP server that keeps simple request/token counters."""
+
+    daemon_threads = True
+    request_queue_size = 128  # bursts of new connections must not be refused by the listen backlog
+
+    def __init__(self, address, latency: float = 0.5, jitter: float = 0.0, seed: int = 0, drop_rate: float = 0.0, rpm_limit: int = 0, tpm_limit: int = 0, window: float = 60.0, prompt_cache: bool = False, token_latency: float = 0.0, malformed_rate: float = 0.0):
+        super().__init__(address, FakeCompletionHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.rpm_limit = rpm_limit
+        self.tpm_limit = tpm_limit
+        self.window = window
+        self._admitted: deque = deque()  # (time, tokens) of requests inside the window
+        self.rate_limited = 0
+        self.prompt_cache = prompt_cache
+        self.malformed_rate = malformed_rate
+        self.token_latency = token_latency
+        self._cached_prefixes = set()
+        self.cached_tokens = 0
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self.connections = 0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def process_request(self, request, client_address):
+        with self.lock:
+            self.connections += 1  # one per accepted TCP connection, so keep-alive reuse shows up here
+        super().process_request(request, client_address)
+
+    def reset_counters(self) -> None:
+        with self.lock:
+            self.requests = 0
+            self.connections = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+            self.max_in_flight = 0
+            self.rate_limited = 0
+            self.cached_tokens = 0
+
+    def prefix_digests(self, prompt: str) -> List[Tuple[int, str]]:
+        """(length, hash) for every cacheable prefix of the prompt."""
+        if not self.prompt_cache or len(prompt) < CACHE_MIN_CHARS:
+            return []
+        digest = hashlib.sha1(prompt[:CACHE_MIN_CHARS].encode("utf-8"))
+        digests = [(CACHE_MIN_CHARS, digest.hexdigest())]
+        for end in range(CACHE_MIN_CHARS + CACHE_STEP_CHARS, len(prompt) + 1, CACHE_STEP_CHARS):
+            digest.update(prompt[end - CACHE_STEP_CHARS:end].encode("utf-8"))
+            digests.append((end, digest.hexdigest()))
+        return digests
+
+    def cached_chars(self, digests: List[Tuple[int, str]]) -> int:
+        with self.lock:
+            cached = 0
+            for length, digest in digests:
+                if digest not in self._cached_prefixes:
+                    break
+                cached = length
+            return cached
+
+    def remember_prefixes(self, digests: List[Tuple[int, str]]) -> None:
+        with self.lock:
+            self._cached_prefixes.update(digest for _, digest in digests)
+
+    def next_delay(self) -> float:
+        with self.lock:
+            return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def admit(self, tokens: int) -> Tuple[bool, Dict[str, str]]:
+        """Check the request against the rate limits; returns (admitted, rate-limit headers)."""
+        with self.lock:
+            now = time.monotonic()
+            while self._admitted and self._admitted[0][0] <= now - self.window:
+                self._admitted.popleft()
+            used_requests = len(self._admitted)
+            used_tokens = sum(t for _, t in self._admitted)
+            over = (self.rpm_limit and used_requests + 1 > self.rpm_limit) or (self.tpm_limit and used_tokens + tokens > self.tpm_limit)
+            if over:
+                self.rate_limited += 1
+                retry_after = self._admitted[0][0] + self.window - now if self._admitted else self.window
+                return False, {"retry-after": f"{max(retry_after, 0.001):.3f}"}
+            if self.rpm_limit or self.tpm_limit:
+                self._admitted.append((now, tokens))
+            headers = {}
+            reset = f"{(self._admitted[0][0] + self.window - now) if self._admitted else 0:.3f}s"
+            if self.rpm_limit:
+                headers.update({
+                    "x-ratelimit-limit-requests": str(self.rpm_limit),
+                    "x-ratelimit-remaining-requests": str(self.rpm_limit - used_requests - 1),
+                    "x-ratelimit-reset-requests": reset,
+                })
+            if self.tpm_limit:
+                headers.update({
+                    "x-ratelimit-limit-tokens": str(self.tpm_limit),
+                    "x-ratelimit-remaining-tokens": str(self.tpm_limit - used_tokens - tokens),
+                    "x-ratelimit-reset-tokens": reset,
+                })
+            return True, headers
+
+    def malformed(self) -> bool:
+        with self.lock:
+            return self.random.random() < self.malformed_rate
+
+    def keep_answer(self) -> bool:
+        with self.lock:
+            return self.random.random() >= self.drop_rate
+
+
+class FakeCompletionHandler(BaseHTTPRequestHandler):
+    server: FakeOpenAIServer
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body are separate writes; avoid delayed-ACK stalls on kept-alive connections
+
+    def log_message(self, format, *args):  # keep benchmark output clean
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        server = self.server
+        prompt = "".join(f"{m.get('role')}:{m.get('content') or ''}\n" for m in body.get("messages", []))
+        prompt_chars = sum(len(m.get("content") or "") for m in body.get("messages", []))
+        admitted, limit_headers = server.admit(prompt_chars // 4 + (body.get("max_tokens") or 0))
+        if not admitted:
+            self._send_json(429, {"error": {
+                "message": "Rate limit reached (fake server)",
+                "type": "requests",
+                "code": "rate_limit_exceeded",
+            }}, limit_headers)
+            return
+
+        with server.lock:
+            server._in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server._in_flight)
+        try:
+            digests = server.prefix_digests(prompt)
+            cached_tokens = min(server.cached_chars(digests), prompt_chars) // 4
+            time.sleep(server.next_delay() + server.token_latency * (prompt_chars // 4 - cached_tokens) / 1000)
+            response_format = body.get("response_format") or {}
+            schema_name = (response_format.get("json_schema") or {}).get("name")
+            if response_format.get("type") == "json_object" or schema_name == "batch":
+                content = self._batch_answer(body)
+            elif schema_name == "score":
+                content = self._score_answer()
+            elif server.malformed():
+                content = "**Score:** 2\n**Kommentar:** Syntetisk vurdering fra testserver."
+            else:
+                content = "Score: 2\nKommentar: Syntetisk vurdering fra testserver."
+            usage = {
+                "prompt_tokens": prompt_chars // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": prompt_chars // 4 + len(content) // 4,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            }
+            server.remember_prefixes(digests)
+            with server.lock:
+                server.requests += 1
+                server.prompt_tokens += usage["prompt_tokens"]
+                server.cached_tokens += cached_tokens
+                server.completion_tokens += usage["completion_tokens"]
+            self._send_json(200, {
+                "id": f"chatcmpl-fake-{server.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            }, limit_headers)
+        finally:
+            with server.lock:
+                server._in_flight -= 1
+
+    def _score_answer(self) -> str:
+        answer = {"score": 2, "kommentar": "Syntetisk vurdering: fra testserver."}
+        if self.server.malformed():
+            drift = self.server.random.choice(["prefix", "range", "labels"])
+            if drift == "prefix":
+                return "Her er vurderingen:\n" + json.dumps(answer, ensure_ascii=False).replace('"score": 2', '"score": "to"')
+            if drift == "range":
+                return json.dumps(dict(answer, score=7), ensure_ascii=False)
+            return "Score: 2\nKommentar: Syntetisk vurdering: fra testserver."
+        return json.dumps(answer, ensure_ascii=False)
+
+    def _batch_answer(self, body: dict) -> str:
+        prompt = body["messages"][-1].get("content") or ""
+        numbers = [int(nr) for nr in re.findall(r"^\s*\[(\d+)\]", prompt, re.MULTILINE)]
+        answers = [
+            {"nr": nr, "score": 2, "kommentar": "Syntetisk vurdering fra testserver."}
+            for nr in numbers
+            if self.server.keep_answer()
+        ]
+        return json.dumps({"svar": answers}, ensure_ascii=False)
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_fake_server(latency: float = 0.5, jitter: float = 0.0, port: int = 0, drop_rate: float = 0.0, rpm_limit: int = 0, tpm_limit: int = 0, window: float = 60.0, prompt_cache: bool = False, token_latency: float = 0.0, malformed_rate: float = 0.0) -> Tuple[FakeOpenAIServer, threading.Thread]:
+    """Start the fake server on a background thread and return it."""
+    server = FakeOpenAIServer(("127.0.0.1", port), latency=latency, jitter=jitter, drop_rate=drop_rate, rpm_limit=rpm_limit, tpm_limit=tpm_limit,
+                              window=window, prompt_cache=prompt_cache, token_latency=token_latency, malformed_rate=malformed_rate)
+    thread = threading.Thread(target=server.serve_forever, name="fake-openai", daemon=True)
+    thread.start()
+    return server, thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="Delay per request in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- jitter in seconds")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Share of batched answers left out")
+    parser.add_argument("--rpm", type=int, default=0, help="Requests allowed per window (0 = unlimited)")
+    parser.add_argument("--tpm", type=int, default=0, help="Tokens allowed per window (0 = unlimited)")
+    parser.add_argument("--window", type=float, default=60.0, help="Rate-limit window in seconds")
+    parser.add_argument("--prompt-cache", action="store_true", help="Imitate provider-side prompt caching")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Extra seconds per 1000 uncached prompt tokens")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of single answers that drift from the requested format")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(("127.0.0.1", args.port), latency=args.latency, jitter=args.jitter, drop_rate=args.drop_rate,
+                              rpm_limit=args.rpm, tpm_limit=args.tpm, window=args.window,
+                              prompt_cache=args.prompt_cache, token_latency=args.token_latency, malformed_rate=args.malformed_rate)
+    print(f"🧪 Fake OpenAI-server lytter på {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
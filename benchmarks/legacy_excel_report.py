@@ -0,0 +1,362 @@
+"""The Excel report writers as they were before report_writer.py, kept for bench_excel_report.py.
+
+Cell-by-cell formatting with a new style object per cell; used as the baseline
+for time, memory and output equality.
+"""
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+
+from evaluate_nic_application import NIC_EVALUATION_CRITERIA
+
+
+def create_excel_report(results_df: pd.DataFrame, pdf_filename: str, excel_filename: str, oppstartstype: str = "") -> None:
+    """Create a formatted Excel report with summary and detailed results."""
+    
+    # Create workbook and worksheet
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Søknadsevaluering"
+    
+    # Define styles
+    header_font = Font(bold=True, size=14, color="FFFFFF")
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    summary_font = Font(bold=True, size=12)
+    summary_fill = PatternFill(start_color="D9E2F3", end_color="D9E2F3", fill_type="solid")
+    category_font = Font(bold=True, size=11)
+    border = Border(left=Side(style='thin'), right=Side(style='thin'), 
+                   top=Side(style='thin'), bottom=Side(style='thin'))
+    center_alignment = Alignment(horizontal='center', vertical='center')
+    
+    # Calculate summary statistics
+    summary = results_df.groupby('Kategori')['Score'].mean().round(2)
+    total_score = summary.mean()
+    
+    # Determine overall assessment
+    if total_score >= 2.5:
+        assessment = "🎉 Utmerket søknad! Høy sannsynlighet for godkjenning."
+        assessment_color = "C6EFCE"  # Light green
+    elif total_score >= 2.0:
+        assessment = "👍 God søknad med potensial. Noen forbedringer kan styrke den."
+        assessment_color = "FFEB9C"  # Light yellow
+    elif total_score >= 1.5:
+        assessment = "⚠️ Søknaden trenger forbedringer i flere områder."
+        assessment_color = "FFEB9C"  # Light yellow
+    else:
+        assessment = "🔴 Søknaden har betydelige svakheter som bør adresseres."
+        assessment_color = "FFC7CE"  # Light red
+    
+    current_row = 1
+    
+    # Title
+    ws.merge_cells(f'A{current_row}:D{current_row}')
+    title_cell = ws[f'A{current_row}']
+    if oppstartstype:
+        title_cell.value = f"INNOVASJON NORGE - SØKNADSEVALUERING ({oppstartstype})"
+    else:
+        title_cell.value = "INNOVASJON NORGE - SØKNADSEVALUERING"
+    title_cell.font = Font(bold=True, size=16, color="FFFFFF")
+    title_cell.fill = PatternFill(start_color="1F4E79", end_color="1F4E79", fill_type="solid")
+    title_cell.alignment = center_alignment
+    current_row += 2
+    
+    # PDF filename
+    ws[f'A{current_row}'] = "Evaluert søknad:"
+    ws[f'A{current_row}'].font = summary_font
+    ws[f'B{current_row}'] = pdf_filename
+    ws.merge_cells(f'B{current_row}:D{current_row}')
+    current_row += 2
+    
+    # Overall score
+    ws[f'A{current_row}'] = "TOTAL GJENNOMSNITTSSCORE:"
+    ws[f'A{current_row}'].font = Font(bold=True, size=14)
+    ws[f'B{current_row}'] = f"{total_score:.2f}/3.0"
+    ws[f'B{current_row}'].font = Font(bold=True, size=14, color="FFFFFF")
+    ws[f'B{current_row}'].fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    ws[f'B{current_row}'].alignment = center_alignment
+    current_row += 1
+    
+    # Assessment
+    ws.merge_cells(f'A{current_row}:D{current_row}')
+    assessment_cell = ws[f'A{current_row}']
+    assessment_cell.value = assessment
+    assessment_cell.font = Font(bold=True, size=12)
+    assessment_cell.fill = PatternFill(start_color=assessment_color, end_color=assessment_color, fill_type="solid")
+    assessment_cell.alignment = center_alignment
+    current_row += 2
+    
+    # Category summary header
+    ws[f'A{current_row}'] = "SAMMENDRAG PER KATEGORI"
+    ws[f'A{current_row}'].font = header_font
+    ws[f'A{current_row}'].fill = header_fill
+    ws.merge_cells(f'A{current_row}:C{current_row}')
+    current_row += 1
+    
+    # Category summary
+    for kategori, score in summary.items():
+        emoji = "🟢" if score >= 2.5 else "🟡" if score >= 1.5 else "🔴"
+        ws[f'A{current_row}'] = f"{emoji} {kategori}"
+        ws[f'B{current_row}'] = f"{score}/3.0"
+        ws[f'C{current_row}'] = score  # Tallverdi for diagrammet
+        ws[f'B{current_row}'].alignment = center_alignment
+        # Color coding
+        if score >= 2.5:
+            fill_color = "C6EFCE"  # Green
+        elif score >= 1.5:
+            fill_color = "FFEB9C"  # Yellow
+        else:
+            fill_color = "FFC7CE"  # Red
+        ws[f'B{current_row}'].fill = PatternFill(start_color=fill_color, end_color=fill_color, fill_type="solid")
+        current_row += 1
+    
+    current_row += 2
+    
+    # Detailed results header
+    ws[f'A{current_row}'] = "DETALJERTE RESULTATER"
+    ws[f'A{current_row}'].font = header_font
+    ws[f'A{current_row}'].fill = header_fill
+    ws.merge_cells(f'A{current_row}:D{current_row}')
+    current_row += 1
+    
+    # Column headers for detailed results
+    headers = ['Kategori', 'Spørsmål', 'Score', 'Kommentar']
+    for col, header in enumerate(headers, 1):
+        cell = ws.cell(row=current_row, column=col, value=header)
+        cell.font = category_font
+        cell.fill = summary_fill
+        cell.alignment = center_alignment
+        cell.border = border
+    current_row += 1
+    
+    # Add detailed results
+    for _, row in results_df.iterrows():
+        ws.cell(row=current_row, column=1, value=row['Kategori']).border = border
+        ws.cell(row=current_row, column=2, value=row['Spørsmål']).border = border
+        
+        score_cell = ws.cell(row=current_row, column=3, value=f"{row['Score']}/3")
+        score_cell.border = border
+        score_cell.alignment = center_alignment
+        
+        # Color code scores
+        if row['Score'] >= 2.5:
+            score_cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+        elif row['Score'] >= 1.5:
+            score_cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
+        else:
+            score_cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+        
+        comment_cell = ws.cell(row=current_row, column=4, value=row['Kommentar'])
+        comment_cell.border = border
+        comment_cell.alignment = Alignment(wrap_text=True, vertical='top')
+        
+        current_row += 1
+    
+    # Adjust column widths
+    ws.column_dimensions['A'].width = 25
+    ws.column_dimensions['B'].width = 50
+    ws.column_dimensions['C'].width = 10
+    ws.column_dimensions['D'].width = 80
+    
+    # Set row heights for better readability
+    for row in range(1, current_row):
+        if row > len(summary) + 10:  # Detailed results section
+            ws.row_dimensions[row].height = 60
+    
+    # Save the workbook
+    wb.save(excel_filename)
+
+
+def create_nic_excel_report(results_df: pd.DataFrame, pdf_filename: str, excel_filename: str) -> None:
+    """Create a formatted Excel report for NIC cluster evaluation."""
+    
+    # Create workbook and worksheet
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "NIC Klyngeevaluering"
+    
+    # Define styles
+    header_font = Font(bold=True, size=14, color="FFFFFF")
+    header_fill = PatternFill(start_color="1F4E79", end_color="1F4E79", fill_type="solid")
+    summary_font = Font(bold=True, size=12)
+    summary_fill = PatternFill(start_color="D9E2F3", end_color="D9E2F3", fill_type="solid")
+    category_font = Font(bold=True, size=11)
+    border = Border(left=Side(style='thin'), right=Side(style='thin'), 
+                   top=Side(style='thin'), bottom=Side(style='thin'))
+    center_alignment = Alignment(horizontal='center', vertical='center')
+    
+    # Calculate weighted scores by category
+    category_scores = {}
+    weighted_total = 0
+    total_weight = 0
+    
+    for category in NIC_EVALUATION_CRITERIA.keys():
+        category_data = results_df[results_df['Kategori'] == category]
+        avg_score = category_data['Score'].mean()
+        weight = category_data['Vekt (%)'].iloc[0]
+        weighted_score = (avg_score / 4) * weight  # Convert to percentage and apply weight
+        
+        category_scores[category] = {
+            'avg_score': avg_score,
+            'weight': weight,
+            'weighted_score': weighted_score
+        }
+        
+        weighted_total += weighted_score
+        total_weight += weight
+    
+    # Overall weighted score (out of 100)
+    overall_score = weighted_total
+    
+    # Determine assessment
+    if overall_score >= 80:
+        assessment = "🎉 Utmerket klyngesøknad! Høy sannsynlighet for godkjenning."
+        assessment_color = "C6EFCE"  # Light green
+    elif overall_score >= 65:
+        assessment = "👍 God klyngesøknad med potensial. Noen forbedringer kan styrke den."
+        assessment_color = "FFEB9C"  # Light yellow
+    elif overall_score >= 50:
+        assessment = "⚠️ Klyngesøknaden trenger forbedringer i flere områder."
+        assessment_color = "FFEB9C"  # Light yellow
+    else:
+        assessment = "🔴 Klyngesøknaden har betydelige svakheter som bør adresseres."
+        assessment_color = "FFC7CE"  # Light red
+    
+    current_row = 1
+    
+    # Title
+    ws.merge_cells(f'A{current_row}:E{current_row}')
+    title_cell = ws[f'A{current_row}']
+    title_cell.value = "NIC KLYNGEEVALUERING"
+    title_cell.font = Font(bold=True, size=16, color="FFFFFF")
+    title_cell.fill = header_fill
+    title_cell.alignment = center_alignment
+    current_row += 2
+    
+    # PDF filename
+    ws[f'A{current_row}'] = "Evaluert søknad:"
+    ws[f'A{current_row}'].font = summary_font
+    ws[f'B{current_row}'] = pdf_filename
+    ws.merge_cells(f'B{current_row}:E{current_row}')
+    current_row += 2
+    
+    # Overall weighted score
+    ws[f'A{current_row}'] = "TOTAL VEKTET SCORE:"
+    ws[f'A{current_row}'].font = Font(bold=True, size=14)
+    ws[f'B{current_row}'] = f"{overall_score:.1f}/100"
+    ws[f'B{current_row}'].font = Font(bold=True, size=14, color="FFFFFF")
+    ws[f'B{current_row}'].fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    ws[f'B{current_row}'].alignment = center_alignment
+    current_row += 1
+    
+    # Assessment
+    ws.merge_cells(f'A{current_row}:E{current_row}')
+    assessment_cell = ws[f'A{current_row}']
+    assessment_cell.value = assessment
+    assessment_cell.font = Font(bold=True, size=12)
+    assessment_cell.fill = PatternFill(start_color=assessment_color, end_color=assessment_color, fill_type="solid")
+    assessment_cell.alignment = center_alignment
+    current_row += 2
+    
+    # Category summary header
+    ws[f'A{current_row}'] = "SAMMENDRAG PER KATEGORI"
+    ws[f'A{current_row}'].font = header_font
+    ws[f'A{current_row}'].fill = header_fill
+    ws.merge_cells(f'A{current_row}:D{current_row}')
+    current_row += 1
+    
+    # Category summary headers
+    headers = ['Kategori', 'Vekt (%)', 'Gj.snitt Score', 'Vektet Bidrag']
+    for col, header in enumerate(headers, 1):
+        cell = ws.cell(row=current_row, column=col, value=header)
+        cell.font = category_font
+        cell.fill = summary_fill
+        cell.alignment = center_alignment
+        cell.border = border
+    current_row += 1
+    
+    # Category summary data
+    for category, scores in category_scores.items():
+        avg_score = scores['avg_score']
+        weight = scores['weight']
+        weighted_score = scores['weighted_score']
+        
+        # Color coding based on average score
+        if avg_score >= 3.2:  # 80% of 4
+            fill_color = "C6EFCE"  # Green
+        elif avg_score >= 2.4:  # 60% of 4
+            fill_color = "FFEB9C"  # Yellow
+        else:
+            fill_color = "FFC7CE"  # Red
+        
+        ws.cell(row=current_row, column=1, value=category).border = border
+        ws.cell(row=current_row, column=2, value=f"{weight}%").border = border
+        ws.cell(row=current_row, column=2).alignment = center_alignment
+        
+        score_cell = ws.cell(row=current_row, column=3, value=f"{avg_score:.1f}/4")
+        score_cell.border = border
+        score_cell.alignment = center_alignment
+        score_cell.fill = PatternFill(start_color=fill_color, end_color=fill_color, fill_type="solid")
+        
+        ws.cell(row=current_row, column=4, value=f"{weighted_score:.1f}").border = border
+        ws.cell(row=current_row, column=4).alignment = center_alignment
+        
+        current_row += 1
+    
+    current_row += 2
+    
+    # Detailed results header
+    ws[f'A{current_row}'] = "DETALJERTE RESULTATER"
+    ws[f'A{current_row}'].font = header_font
+    ws[f'A{current_row}'].fill = header_fill
+    ws.merge_cells(f'A{current_row}:E{current_row}')
+    current_row += 1
+    
+    # Column headers for detailed results
+    detail_headers = ['Kategori', 'Vekt (%)', 'Spørsmål', 'Score', 'Kommentar']
+    for col, header in enumerate(detail_headers, 1):
+        cell = ws.cell(row=current_row, column=col, value=header)
+        cell.font = category_font
+        cell.fill = summary_fill
+        cell.alignment = center_alignment
+        cell.border = border
+    current_row += 1
+    
+    # Add detailed results
+    for _, row in results_df.iterrows():
+        ws.cell(row=current_row, column=1, value=row['Kategori']).border = border
+        ws.cell(row=current_row, column=2, value=f"{row['Vekt (%)']}%").border = border
+        ws.cell(row=current_row, column=2).alignment = center_alignment
+        ws.cell(row=current_row, column=3, value=row['Spørsmål']).border = border
+        
+        score_cell = ws.cell(row=current_row, column=4, value=f"{row['Score']}/4")
+        score_cell.border = border
+        score_cell.alignment = center_alignment
+        
+        # Color code scores
+        if row['Score'] >= 3.2:  # 80% of 4
+            score_cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+        elif row['Score'] >= 2.4:  # 60% of 4
+            score_cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
+        else:
+            score_cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+        
+        comment_cell = ws.cell(row=current_row, column=5, value=row['Kommentar'])
+        comment_cell.border = border
+        comment_cell.alignment = Alignment(wrap_text=True, vertical='top')
+        
+        current_row += 1
+    
+    # Adjust column widths
+    ws.column_dimensions['A'].width = 30
+    ws.column_dimensions['B'].width = 10
+    ws.column_dimensions['C'].width = 60
+    ws.column_dimensions['D'].width = 10
+    ws.column_dimensions['E'].width = 80
+    
+    # Set row heights for better readability
+    for row in range(1, current_row):
+        if row > len(category_scores) + 15:  # Detailed results section
+            ws.row_dimensions[row].height = 60
+    
+    # Save the workbook
+    wb.save(excel_filename)
@@ -0,0 +1,260 @@
+"""Benchmark suite: extraction, scoring, report rendering and the web app, with JSON results.
+
+Runs a fixed set of cases, each `--repeat` times, and writes the median and
+all runs per case to `--output` (JSON) along with the settings, Python version
+and git commit:
+  * extract/<sider>         – read_application_text on a synthetic Norwegian
+                              application PDF (5, 50 and 300 pages by default),
+  * scoring/<rubrikk>       – evaluate_application (oppstart2) and
+                              evaluate_nic_application (nic) on the 50-page text,
+                              against the local fake OpenAI server with
+                              `--latency` seconds per completion,
+  * report/<rubrikk>/<rader> – create_excel_report and create_nic_excel_report
+                              for synthetic results of `--rows` rows,
+  * app/evaluate            – `--app-requests` uploads to POST /evaluate/ at once,
+                              followed until every Excel report is downloaded.
+Caches and stores are turned off and every input is seeded, so two runs on
+the same machine measure the same work.
+
+With `--compare GAMMEL.json NY.json` (or `--baseline GAMMEL.json` during a run)
+the medians are compared case by case; a case that got more than `--threshold`
+slower (and by at least `--min-seconds`) is a regression and the exit status is 1.
+
+    python benchmarks/run_suite.py --output før.json
+    python benchmarks/run_suite.py --output etter.json --baseline før.json
+    python benchmarks/run_suite.py --only extract report --pages 5 50 --rows 1000
+    python benchmarks/run_suite.py --compare før.json etter.json --threshold 0.1
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_pdf import generate_pdf  # noqa: E402
+
+GROUPS = ("extract", "scoring", "report", "app")
+SCORING_TEXT_PAGES = 50
+
+
+def measure(fn: Callable[[], Optional[dict]], repeat: int, warmup: int = 1) -> dict:
+    """Run `fn` `warmup` times untimed, then `repeat` times; its wall time per run plus the details the last run returned."""
+    runs = []
+    details: dict = {}
+    for attempt in range(warmup + repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            details = fn() or {}
+        if attempt >= warmup:
+            runs.append(time.perf_counter() - start)
+    return {"seconds": statistics.median(runs), "min_seconds": min(runs), "runs": runs, **details}
+
+
+def extraction_cases(pdfs: Dict[int, str]) -> Dict[str, Callable[[], dict]]:
+    from evaluate_application import read_application_text
+
+    def case(path: str) -> Callable[[], dict]:
+        def run() -> dict:
+            text, _ = read_application_text(path)
+            return {"characters": len(text)}
+        return run
+    return {f"extract/{pages}": case(path) for pages, path in pdfs.items()}
+
+
+def scoring_cases(application_text: str) -> Dict[str, Callable[[], dict]]:
+    from evaluate_application import EVALUATION_QUESTIONS, evaluate_application
+    from evaluate_nic_application import evaluate_nic_application
+    from llm_usage import usage_totals
+
+    def case(evaluate: Callable[[], "object"]) -> Callable[[], dict]:
+        def run() -> dict:
+            before = usage_totals()
+            results_df = evaluate()
+            failed = len(results_df.attrs.get("errors", []))
+            if failed:
+                raise RuntimeError(f"{failed} spørsmål feilet mot testserveren")
+            return {"questions": len(results_df), "requests": usage_totals()["requests"] - before["requests"]}
+        return run
+    return {
+        "scoring/oppstart2": case(lambda: evaluate_application(application_text, "benchmark.pdf", EVALUATION_QUESTIONS)),
+        "scoring/nic": case(lambda: evaluate_nic_application(application_text, "benchmark.pdf")),
+    }
+
+
+def report_cases(rows: List[int], tmp: str) -> Dict[str, Callable[[], dict]]:
+    from bench_excel_report import synthetic_results
+    from evaluate_application import create_excel_report
+    from evaluate_nic_application import create_nic_excel_report
+
+    cases = {}
+    for count in rows:
+        oppstart_df = synthetic_results("oppstart", count, seed=0)
+        nic_df = synthetic_results("nic", count, seed=0)
+        cases[f"report/oppstart/{count}"] = lambda df=oppstart_df, count=count: create_excel_report(df, "soknad.pdf", os.path.join(tmp, f"oppstart_{count}.xlsx"), "Oppstart 2")
+        cases[f"report/nic/{count}"] = lambda df=nic_df, count=count: create_nic_excel_report(df, "soknad.pdf", os.path.join(tmp, f"nic_{count}.xlsx"))
+    return cases
+
+
+def app_cases(pdf_path: str, requests: int, stack: contextlib.ExitStack) -> Dict[str, Callable[[], dict]]:
+    from fastapi.testclient import TestClient
+    from app import app
+
+    # One client for all runs: leaving it shuts the app's job pool down
+    client = stack.enter_context(TestClient(app))
+
+    def run() -> dict:
+        job_ids = []
+        for i in range(requests):
+            with open(pdf_path, "rb") as pdf:
+                response = client.post("/evaluate/", files={"file": (f"soknad_{i}.pdf", pdf, "application/pdf")}, data={"oppstartstype": "Oppstart 2"})
+            response.raise_for_status()
+            job_ids.append(response.json()["job_id"])
+        for job_id in job_ids:
+            while True:
+                job = client.get(f"/jobs/{job_id}").json()
+                if job["status"] in ("done", "failed"):
+                    break
+                time.sleep(0.02)
+            if job["status"] != "done":
+                raise RuntimeError(f"Jobb {job_id} feilet: {job.get('error')}")
+            client.get(job["result_url"]).raise_for_status()
+        return {"requests": requests}
+    return {"app/evaluate": run}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(args) -> dict:
+    os.environ.update({
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "sk-benchmark",
+        "EVAL_BACKEND": "openai",
+        "SCORE_CACHE_DISABLED": "1",  # every run must reach the server
+        "TEXT_STORE_DISABLED": "1",  # and extract every PDF
+        "RESULTS_STORE_DISABLED": "1",
+        "PDF_WORKERS": str(args.pdf_workers),
+    })
+    from fake_openai_server import start_fake_server
+
+    server, _ = start_fake_server(latency=args.latency)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+
+    groups = args.only or list(GROUPS)
+    results: Dict[str, dict] = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench_suite_") as tmp, contextlib.ExitStack() as stack:
+        os.chdir(tmp)  # uploads/ and results/ from the app end up here
+        stack.callback(os.chdir, cwd)
+        pages = sorted(set(args.pages) | ({SCORING_TEXT_PAGES} if {"scoring", "app"} & set(groups) else set()))
+        pdfs = {count: generate_pdf(os.path.join(tmp, f"soknad_{count}.pdf"), count, seed=0) for count in pages}
+
+        cases: Dict[str, Callable[[], Optional[dict]]] = {}
+        if "extract" in groups:
+            cases.update(extraction_cases({count: pdfs[count] for count in args.pages}))
+        if "scoring" in groups:
+            from evaluate_application import read_application_text
+            with contextlib.redirect_stdout(io.StringIO()):
+                application_text, _ = read_application_text(pdfs[SCORING_TEXT_PAGES])
+            cases.update(scoring_cases(application_text))
+        if "report" in groups:
+            cases.update(report_cases(args.rows, tmp))
+        if "app" in groups:
+            cases.update(app_cases(pdfs[SCORING_TEXT_PAGES], args.app_requests, stack))
+
+        print(f"{'måling':>24} {'median (s)':>11} {'min (s)':>9}  detaljer")
+        for name, fn in cases.items():
+            result = results[name] = measure(fn, args.repeat, args.warmup)
+            details = ", ".join(f"{key} {value}" for key, value in result.items() if key not in ("seconds", "min_seconds", "runs"))
+            print(f"{name:>24} {result['seconds']:>11.3f} {result['min_seconds']:>9.3f}  {details}")
+    server.shutdown()
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": {"repeat": args.repeat, "warmup": args.warmup, "pages": args.pages, "rows": args.rows, "latency": args.latency,
+                     "app_requests": args.app_requests, "pdf_workers": args.pdf_workers, "groups": groups},
+        "results": results,
+    }
+
+
+def compare(old: dict, new: dict, threshold: float, min_seconds: float) -> List[str]:
+    """Print old vs. new median per case and return the cases that regressed."""
+    if old.get("settings") != new.get("settings"):
+        print(f"⚠️  Kjøringene har ulike innstillinger:\n   gammel: {old.get('settings')}\n   ny:     {new.get('settings')}")
+    print(f"Sammenligner {old.get('commit') or '?'} ({old.get('created')}) med {new.get('commit') or '?'} ({new.get('created')})")
+    print(f"{'måling':>24} {'gammel (s)':>11} {'ny (s)':>9} {'endring':>9}")
+    regressions = []
+    for name in sorted(old["results"].keys() & new["results"].keys()):
+        before, after = old["results"][name]["seconds"], new["results"][name]["seconds"]
+        change = after / before - 1 if before > 0 else 0.0
+        regressed = change > threshold and after - before >= min_seconds
+        flag = "❌ REGRESJON" if regressed else ("✅ raskere" if change < -threshold and before - after >= min_seconds else "")
+        print(f"{name:>24} {before:>11.3f} {after:>9.3f} {change:>+8.1%}  {flag}")
+        if regressed:
+            regressions.append(name)
+    for name in sorted(old["results"].keys() ^ new["results"].keys()):
+        print(f"{name:>24} finnes bare i {'gammel' if name in old['results'] else 'ny'} kjøring")
+    return regressions
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="benchmark.json", help="Where the JSON results are written")
+    parser.add_argument("--only", nargs="+", choices=GROUPS, help="Run only these groups of cases")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case (the median is compared)")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per case first (imports, connections, file cache)")
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 50, 300], help="Sizes of the extraction PDFs")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 20000], help="Result rows in the rendered reports")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake server delay per completion (s)")
+    parser.add_argument("--app-requests", type=int, default=4, help="Uploads sent to /evaluate/ at once")
+    parser.add_argument("--pdf-workers", type=int, default=1, help="PDF_WORKERS during the run (1 = one process, least noise)")
+    parser.add_argument("--baseline", metavar="GAMMEL.json", help="Compare the new run with an earlier one")
+    parser.add_argument("--compare", nargs=2, metavar=("GAMMEL.json", "NY.json"), help="Only compare two earlier runs")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Slowdown counted as a regression (0.15 = 15%%)")
+    parser.add_argument("--min-seconds", type=float, default=0.005, help="Ignore slowdowns smaller than this (timer noise)")
+    args = parser.parse_args()
+
+    if args.compare:
+        old, new = (load(path) for path in args.compare)
+    else:
+        new = run_suite(args)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(new, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultater lagret i {args.output}")
+        if not args.baseline:
+            return
+        old = load(args.baseline)
+        print()
+
+    regressions = compare(old, new, args.threshold, args.min_seconds)
+    if regressions:
+        sys.exit(f"❌ FEIL: {len(regressions)} målinger har blitt tregere: {', '.join(regressions)}")
+    print("✅ Ingen regresjoner")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Simulation: several evaluations at once against a rate-limited fake API.
+
+Starts the fake completion server with RPM/TPM budgets over a short window
+(time compressed: `--window 10` means "a minute" lasts ten seconds) and runs
+`--applications` evaluations in parallel, first without client-side limiting
+and then through rate_limiter. Reports 429 responses, questions that ended as
+errors, wall-clock time and the adaptive concurrency limit.
+
+    python benchmarks/simulate_rate_limits.py --applications 3 --rpm 60 --tpm 120000 --window 10
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_openai_server import start_fake_server  # noqa: E402
+
+PAGE_TEXT = (
+    "Selskapet utvikler en ny løsning for sporing av fiskehelse i oppdrettsanlegg. "
+    "Prosjektet skal validere teknologien sammen med tre pilotkunder i Nordland og Troms. "
+) * 25
+
+
+class NoLimit:
+    """Stand-in for RateLimiter that lets every request through immediately."""
+
+    def acquire(self, estimated_tokens):
+        pass
+
+    def release(self):
+        pass
+
+    def on_success(self, headers, estimated_tokens, used_tokens):
+        pass
+
+    def on_rate_limit(self, headers):
+        pass
+
+    def stats(self):
+        return {}
+
+
+def run_round(applications: int, application_text: str, concurrency: int) -> tuple:
+    import evaluate_application as ea
+
+    def evaluate(index: int):
+        # A different text per application so the runs do not share cached answers
+        text = f"Søknad nr. {index}\n{application_text}"
+        return ea.evaluate_application(text, f"soknad_{index}.pdf", ea.EVALUATION_QUESTIONS, max_concurrency=concurrency)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=applications) as pool:
+        frames = list(pool.map(evaluate, range(applications)))
+    failed = sum(len(df.attrs.get("errors", [])) for df in frames)
+    return time.perf_counter() - start, failed, sum(len(df) for df in frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, default=3, help="Evaluations running at the same time")
+    parser.add_argument("--pages", type=int, default=2, help="Synthetic application length in pages")
+    parser.add_argument("--concurrency", type=int, default=8, help="EVAL_MAX_CONCURRENCY per evaluation")
+    parser.add_argument("--rpm", type=int, default=60, help="Requests allowed per window")
+    parser.add_argument("--tpm", type=int, default=120000, help="Tokens allowed per window")
+    parser.add_argument("--window", type=float, default=10.0, help="Length of the server's rate-limit 'minute' in seconds")
+    parser.add_argument("--latency", type=float, default=0.2, help="Injected latency per completion (s)")
+    args = parser.parse_args()
+
+    server, _ = start_fake_server(latency=args.latency, rpm_limit=args.rpm, tpm_limit=args.tpm, window=args.window)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ["SCORE_CACHE_DISABLED"] = "1"  # every run must reach the server
+    os.environ.setdefault("EVAL_RETRY_BASE_DELAY", "0.5")
+    os.environ.setdefault("EVAL_RETRY_MAX_DELAY", "5")
+
+    import rate_limiter
+
+    application_text = PAGE_TEXT * args.pages
+    print(f"{args.applications} samtidige evalueringer, {args.rpm} forespørsler / {args.tpm:,} tokens per "
+          f"{args.window:g}s-vindu, ~{len(application_text) // 4:,} tokens per søknad")
+    print(f"{'klient':>12} {'429-svar':>9} {'feilede spm.':>13} {'tid (s)':>9} {'samtidighet':>12}")
+
+    for label, limiter in (
+        ("uten limiter", NoLimit()),
+        ("rate_limiter", rate_limiter.RateLimiter(max_concurrency=args.concurrency * args.applications, period=args.window)),
+    ):
+        rate_limiter.set_rate_limiter(limiter)
+        server.reset_counters()
+        time.sleep(args.window)  # let the server's window drain between rounds
+        elapsed, failed, total = run_round(args.applications, application_text, args.concurrency)
+        concurrency = limiter.stats().get("concurrency_limit", "-")
+        print(f"{label:>12} {server.rate_limited:>9} {failed:>6} av {total:<4} {elapsed:>9.1f} {concurrency:>12}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Generate synthetic Norwegian application PDFs for benchmarks.
+
+Writes plain PDF 1.4 by hand (Helvetica, WinAnsiEncoding for æøå), so no
+extra dependencies are needed. Text is deterministic for a given seed.
+
+    python benchmarks/synthetic_pdf.py soknad_300.pdf --pages 300
+"""
+import argparse
+import random
+from typing import List
+
+SECTIONS = [
+    "Problemløsning og marked",
+    "Verdiskapning",
+    "Gjennomføringsevne",
+    "Utløsende effekt av støtte fra Innovasjon Norge",
+    "Klyngens ressursgrunnlag",
+    "Vedlegg",
+]
+
+SENTENCES = [
+    "Selskapet utvikler en ny løsning for sporing av fiskehelse i oppdrettsanlegg langs kysten.",
+    "Dagens alternativer krever manuell prøvetaking og gir svar først etter flere dager.",
+    "Prosjektet skal validere teknologien sammen med tre pilotkunder i Nordland og Troms.",
+    "FoU-utfordringen er å oppnå pålitelig deteksjon under varierende lysforhold og strøm.",
+    "Markedet for digital overvåking i havbruk er anslått til over to milliarder kroner.",
+    "Teamet har bakgrunn fra maskinlæring, havbruk og kommersialisering av teknologi.",
+    "Uten støtte fra Innovasjon Norge vil prosjektet bli forsinket med minst to år.",
+    "Finansieringsplanen omfatter egenkapital, tilskudd og et konvertibelt lån fra investor.",
+    "Klyngen samler trettifem medlemsbedrifter, to universiteter og et regionalt forskningsinstitutt.",
+    "Vedlagt følger siste års regnskap, perioderegnskap og driftsbudsjett for de neste tre årene.",
+    "Risikoen er knyttet til sertifisering, kundeadopsjon og tilgang på kvalifisert personell.",
+    "Løsningen reduserer dødelighet, antibiotikabruk og klimaavtrykk per produsert kilo fisk.",
+]
+
+LINES_PER_PAGE = 56
+LINE_WIDTH = 95
+
+
+def _wrap(text: str, width: int) -> List[str]:
+    lines, current = [], ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}".strip()
+    if current:
+        lines.append(current)
+    return lines
+
+
+def page_lines(page_number: int, rng: random.Random) -> List[str]:
+    """Text lines for one synthetic page: a section heading and wrapped paragraphs."""
+    lines = [f"{SECTIONS[(page_number - 1) % len(SECTIONS)]} – side {page_number}", ""]
+    while len(lines) < LINES_PER_PAGE:
+        paragraph = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(3, 6)))
+        lines.extend(_wrap(paragraph, LINE_WIDTH))
+        lines.append("")
+    return lines[:LINES_PER_PAGE]
+
+
+def _pdf_string(text: str) -> bytes:
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return b"(" + escaped.encode("cp1252", errors="replace") + b")"
+
+
+def generate_pdf(path: str, pages: int, seed: int = 0) -> str:
+    """Write a `pages`-page text PDF to `path` and return the path."""
+    rng = random.Random(seed)
+    objects: List[bytes] = [b"", b""]  # 1: catalog, 2: page tree (filled in below)
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    font_id = len(objects)
+    page_ids = []
+    for page_number in range(1, pages + 1):
+        ops = [b"BT /F1 10 Tf 14 TL 50 800 Td"]
+        ops.extend(_pdf_string(line) + b" '" for line in page_lines(page_number, rng))
+        ops.append(b"ET")
+        stream = b"\n".join(ops)
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (font_id, content_id)
+        )
+        page_ids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % i for i in page_ids), pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_pdf(args.path, args.pages, args.seed)
+    print(f"📄 Skrev {args.pages} sider til {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import os
+import re
+from typing import Dict, Iterable, List, Tuple
+
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+
+from evaluate_nic_application import NIC_ASSESSMENT_THRESHOLDS, nic_category_scores
+from report_writer import ReportSheet, counted_scores, new_report_workbook, score_cell, traffic_light
+
+# Excel allows at most 31 characters in a sheet name and none of []:*?/\
+MAX_SHEET_TITLE = 31
+INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+def sheet_title(number: int, name: str) -> str:
+    """A valid, unique sheet name for application `number`: "0007 soknad_firma"."""
+    stem = INVALID_SHEET_CHARS.sub("_", os.path.splitext(os.path.basename(name))[0])
+    return f"{number:04d} {stem}"[:MAX_SHEET_TITLE]
+
+def application_summary(results_df: pd.DataFrame, nic: bool) -> dict:
+    """Total and per-category scores of one application, computed as in its own report."""
+    if nic:
+        category_scores, weighted_score = nic_category_scores(results_df)
+        categories = {category: scores['avg_score'] for category, scores in category_scores.items()}
+        return {"score": weighted_score, "average": sum(categories.values()) / len(categories), "categories": categories}
+    summary = counted_scores(results_df).groupby(results_df['Kategori'], sort=False).mean().round(2)
+    return {"score": summary.mean(), "categories": summary.to_dict()}
+
+def _write_detail_sheet(wb, title: str, name: str, results_df: pd.DataFrame, summary: dict, nic: bool) -> None:
+    """One application's detailed results, laid out like the detail section of its own report."""
+    if nic:
+        sheet = ReportSheet(wb, title, {'A': 30, 'B': 10, 'C': 60, 'D': 10, 'E': 80}, tall_rows_after=4)
+        sheet.append([(name, "section_dark")], merge="A:E")
+        sheet.append([("TOTAL VEKTET SCORE:", "total_label"), (f"{summary['score']:.1f}/100", "total_value")])
+        sheet.skip()
+        sheet.append([(header, "table_header") for header in ['Kategori', 'Vekt (%)', 'Spørsmål', 'Score', 'Kommentar']])
+        for category, weight, question, score, comment in results_df[['Kategori', 'Vekt (%)', 'Spørsmål', 'Score', 'Kommentar']].itertuples(index=False, name=None):
+            sheet.append([
+                (category, "cell"),
+                (f"{weight}%", "cell_center"),
+                (question, "cell"),
+                (f"{score}/4", f"score_{traffic_light(score, 3.2, 2.4)}"),
+                (comment, "comment"),
+            ])
+    else:
+        sheet = ReportSheet(wb, title, {'A': 25, 'B': 50, 'C': 10, 'D': 80}, tall_rows_after=4)
+        sheet.append([(name, "section")], merge="A:D")
+        sheet.append([("TOTAL GJENNOMSNITTSSCORE:", "total_label"), (f"{summary['score']:.2f}/3.0", "total_value")])
+        sheet.skip()
+        sheet.append([(header, "table_header") for header in ['Kategori', 'Spørsmål', 'Score', 'Kommentar']])
+        for category, question, score, comment in zip(results_df['Kategori'], results_df['Spørsmål'], counted_scores(results_df), results_df['Kommentar']):
+            sheet.append([
+                (category, "cell"),
+                (question, "cell"),
+                score_cell(score, 3, 2.5, 1.5),
+                (comment, "comment"),
+            ])
+    sheet.close()
+
+def create_comparison_report(applications: Iterable[Tuple[str, pd.DataFrame]], excel_filename: str, oppstartstype: str = "") -> int:
+    """Write one workbook comparing many evaluated applications; returns how many were included.
+
+    `applications` yields (name, results DataFrame) pairs and may be a generator:
+    each detail sheet is streamed to disk and closed before the next application
+    is read, and only the scores per category are kept for the ranking sheet and
+    the category matrix, so memory stays flat however many applications there are.
+    """
+    nic = oppstartstype == "NIC"
+    wb = new_report_workbook(write_only=True)
+
+    # The ranking sheet and the category matrix come first in the workbook but are
+    # filled in last; a write-only sheet writes nothing until its first row
+    if nic:
+        headers = ['Plass', 'Søknad', 'Vektet score (/100)', 'Gj.snitt (/4)', 'Spørsmål', 'Ark']
+        ranking = ReportSheet(wb, "Rangering", {'A': 8, 'B': 50, 'C': 20, 'D': 15, 'E': 12, 'F': 32})
+    else:
+        headers = ['Plass', 'Søknad', 'Total score (/3)', 'Spørsmål', 'Ark']
+        ranking = ReportSheet(wb, "Rangering", {'A': 8, 'B': 50, 'C': 18, 'D': 12, 'E': 32})
+    matrix = ReportSheet(wb, "Kategorimatrise", {'A': 50})
+
+    summaries: List[dict] = []
+    categories: Dict[str, None] = {}  # every category seen, in first-seen order
+    for number, (name, results_df) in enumerate(applications, 1):
+        summary = application_summary(results_df, nic)
+        summary.update(name=name, sheet=sheet_title(number, name), questions=len(results_df))
+        _write_detail_sheet(wb, summary["sheet"], name, results_df, summary, nic)
+        categories.update(dict.fromkeys(summary["categories"]))
+        summaries.append(summary)
+
+    # Highest score first; ties keep their input order
+    ranked = sorted(summaries, key=lambda summary: -summary["score"])
+
+    last_column = get_column_letter(len(headers))
+    title = f"RANGERING - {oppstartstype}" if oppstartstype else "RANGERING"
+    ranking.append([(f"{title} ({len(ranked)} søknader)", "title")], merge=f"A:{last_column}")
+    ranking.skip()
+    ranking.append([(header, "table_header") for header in headers])
+    for place, summary in enumerate(ranked, 1):
+        if nic:
+            scores = [(round(summary["score"], 1), f"score_{traffic_light(summary['score'], NIC_ASSESSMENT_THRESHOLDS[0], NIC_ASSESSMENT_THRESHOLDS[2])}"),
+                      (round(summary["average"], 2), "cell_center")]
+        else:
+            scores = [(round(summary["score"], 2), f"score_{traffic_light(summary['score'], 2.5, 1.5)}")]
+        ranking.append([(place, "cell_center"), (summary["name"], "cell"), *scores,
+                        (summary["questions"], "cell_center"), (summary["sheet"], "cell")])
+
+    # Applications × categories, in ranking order
+    green_from, yellow_from = (3.2, 2.4) if nic else (2.5, 1.5)
+    columns = list(categories)
+    for i in range(2, len(columns) + 2):
+        matrix.ws.column_dimensions[get_column_letter(i)].width = 18
+    matrix.append([("Søknad", "table_header")] + [(category, "table_header") for category in columns], height=45)
+    for summary in ranked:
+        row = [(summary["name"], "cell")]
+        for category in columns:
+            score = summary["categories"].get(category)
+            row.append(("", "cell") if pd.isna(score) else (round(score, 2), f"score_{traffic_light(score, green_from, yellow_from)}"))
+        matrix.append(row)
+
+    wb.save(excel_filename)
+    return len(summaries)
+
+def read_report_results(excel_filename: str) -> pd.DataFrame:
+    """The detailed results of a report written by create_excel_report or create_nic_excel_report."""
+    wb = load_workbook(excel_filename, read_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        for row in rows:
+            if row and row[0] == "DETALJERTE RESULTATER":
+                break
+        else:
+            raise Exception(f"❌ FEIL: Fant ikke detaljerte resultater i {excel_filename}")
+        header = [column for column in next(rows) if column is not None]
+        records = []
+        for row in rows:
+            if not row or row[0] is None:
+                continue
+            record = dict(zip(header, row))
+            # A blank score is a question skipped by early stopping
+            record['Score'] = None if record['Score'] is None else int(str(record['Score']).split('/')[0])
+            if 'Vekt (%)' in record:
+                record['Vekt (%)'] = int(str(record['Vekt (%)']).rstrip('%'))
+            records.append(record)
+    finally:
+        wb.close()
+    return pd.DataFrame(records, columns=header)
@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+class DiskLRUCache:
+    """Small persistent key/value cache in a SQLite file with size-bounded LRU eviction.
+
+    Values are bytes. When the total stored size exceeds `max_bytes` the least
+    recently read or written entries are deleted. Safe to share between threads.
+
+    The total size is kept in memory and only re-read from the file before an
+    eviction. Reads are not committed one by one: their access times are
+    written with the next `set`, or once TOUCH_BATCH hits have piled up.
+    """
+
+    TOUCH_BATCH = 64
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries(last_access)")
+        self._conn.commit()
+        self._total = self._stored_bytes()
+        self._touched: Dict[str, float] = {}  # access times of hits not yet written
+
+    def _stored_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _write_touches(self) -> None:
+        if self._touched:
+            self._conn.executemany("UPDATE entries SET last_access = ? WHERE key = ?", [(at, key) for key, at in self._touched.items()])
+            self._touched.clear()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[key] = time.time()
+            if len(self._touched) >= self.TOUCH_BATCH:
+                self._write_touches()
+                self._conn.commit()
+            return row[0]
+
+    def set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time()),
+            )
+            self._touched.pop(key, None)
+            self._total += len(value) - (old[0] if old else 0)
+            self._write_touches()
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        if self._total <= self.max_bytes:
+            return
+        # Other processes may share the file, so count again before deleting anything
+        self._total = self._stored_bytes()
+        if self._total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._total -= size
+            if self._total <= self.max_bytes:
+                break
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self._total = 0
+            self._touched.clear()
+
+    def close(self) -> None:
+        with self._lock:
+            self._write_touches()
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,91 @@
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from dotenv import load_dotenv
+from typing import Callable, Dict, Iterator, Optional, Tuple, Type, TypeVar
+
+from metrics import LLM_RETRIES
+
+# Load environment variables from .env file
+load_dotenv()
+
+T = TypeVar("T")
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded by attempts and a per-question deadline."""
+    max_attempts: int = int(os.getenv("EVAL_RETRY_MAX_ATTEMPTS", "5"))
+    base_delay: float = float(os.getenv("EVAL_RETRY_BASE_DELAY", "1.0"))
+    max_delay: float = float(os.getenv("EVAL_RETRY_MAX_DELAY", "30"))
+    deadline: float = float(os.getenv("EVAL_QUESTION_DEADLINE", "120"))
+
+    def delay(self, attempt: int) -> float:
+        """Sleep before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+# time.monotonic() by which the question being scored must be done; set by question_deadline
+_deadline: ContextVar[Optional[float]] = ContextVar("question_deadline", default=None)
+
+@contextmanager
+def question_deadline(policy: RetryPolicy = DEFAULT_RETRY_POLICY) -> Iterator[None]:
+    """Start the deadline for one question: every retry_call in the block shares it.
+
+    A question may take several calls (format repair, routing samples, the large
+    model); without this each of them would get the whole deadline.
+    """
+    token = _deadline.set(time.monotonic() + policy.deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+class ScoringError(Exception):
+    """A question could not be scored; `kind` says why (rate_limit, timeout, auth, parse, ...)."""
+
+    def __init__(self, message: str, kind: str = "unknown"):
+        super().__init__(message)
+        self.kind = kind
+
+def retry_call(
+    fn: Callable[[], T],
+    retryable: Tuple[Type[BaseException], ...],
+    policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+    sleep: Callable[[float], None] = time.sleep,
+) -> T:
+    """Call `fn`, retrying transient `retryable` errors until attempts or the deadline run out.
+
+    The deadline is the current question's (see question_deadline), or
+    `policy.deadline` from now outside one. The last error is re-raised
+    unchanged, so callers keep their own error handling.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        deadline = time.monotonic() + policy.deadline
+    attempt = 1
+    while True:
+        try:
+            return fn()
+        except retryable as e:
+            if attempt >= policy.max_attempts:
+                raise
+            delay = policy.delay(attempt)
+            if time.monotonic() + delay > deadline:
+                raise
+            print(f"  🔁 {type(e).__name__} – nytt forsøk {attempt + 1}/{policy.max_attempts} om {delay:.1f}s")
+            LLM_RETRIES.inc(error=type(e).__name__)
+            sleep(delay)
+            attempt += 1
+
+def error_record(category: str, question: str, error: BaseException) -> Dict[str, str]:
+    """Structured description of a failed question, stored in `results_df.attrs["errors"]`."""
+    return {
+        "Kategori": category,
+        "Spørsmål": question,
+        "Feiltype": getattr(error, "kind", type(error).__name__),
+        "Feilmelding": str(error),
+    }
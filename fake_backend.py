@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+from dotenv import load_dotenv
+from typing import Optional
+
+import httpx
+
+from prompts import TASK_SEPARATOR
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Latency of a fake completion: log-normal with this median (ms) and spread (sigma of the log)
+EVAL_FAKE_LATENCY_MS = float(os.getenv("EVAL_FAKE_LATENCY_MS", "800"))
+EVAL_FAKE_LATENCY_SIGMA = float(os.getenv("EVAL_FAKE_LATENCY_SIGMA", "0.5"))
+# Share of fake completions answered with a server error (500) and with a rate limit (429)
+EVAL_FAKE_ERROR_RATE = float(os.getenv("EVAL_FAKE_ERROR_RATE", "0"))
+EVAL_FAKE_RATE_LIMIT_RATE = float(os.getenv("EVAL_FAKE_RATE_LIMIT_RATE", "0"))
+# Seed for latencies and errors, so load tests can be repeated
+EVAL_FAKE_SEED = int(os.getenv("EVAL_FAKE_SEED", "0"))
+
+FAKE_MODEL_NAME = "fake-scorer"
+
+def fake_score(text: str, max_score: int) -> int:
+    """Deterministic score for a question text: the same question always gets the same score."""
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest(), 16) % (max_score + 1)
+
+class FakeCompletionTransport(httpx.AsyncBaseTransport):
+    """In-process stand-in for the chat completions endpoint; no network or API key needed.
+
+    Answers in the JSON format the evaluators ask for, with scores derived from the
+    question text, after a simulated latency. A configurable share of the calls fail
+    with 429 or 500 so retry and error handling are exercised as well.
+    """
+
+    def __init__(self, latency_ms: float = EVAL_FAKE_LATENCY_MS, latency_sigma: float = EVAL_FAKE_LATENCY_SIGMA, error_rate: float = EVAL_FAKE_ERROR_RATE, rate_limit_rate: float = EVAL_FAKE_RATE_LIMIT_RATE, seed: int = EVAL_FAKE_SEED):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+    def _draw(self):
+        with self._lock:
+            self.requests += 1
+            delay = self.random.lognormvariate(0.0, self.latency_sigma) * self.latency_ms / 1000 if self.latency_ms > 0 else 0.0
+            return delay, self.random.random()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(await request.aread() or b"{}")
+        delay, roll = self._draw()
+        await asyncio.sleep(delay)
+
+        if roll < self.rate_limit_rate:
+            with self._lock:
+                self.rate_limited += 1
+            return httpx.Response(429, headers={"retry-after": "1"}, json={"error": {
+                "message": "Rate limit reached (fake backend)", "type": "requests", "code": "rate_limit_exceeded",
+            }})
+        if roll < self.rate_limit_rate + self.error_rate:
+            with self._lock:
+                self.errors += 1
+            return httpx.Response(500, json={"error": {"message": "Simulated server error (fake backend)", "type": "server_error"}})
+
+        content = self._answer(body)
+        prompt_tokens = sum(len(message.get("content") or "") for message in body.get("messages", [])) // 4
+        return httpx.Response(200, json={
+            "id": f"chatcmpl-fake-{self.requests}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body.get("model", FAKE_MODEL_NAME),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4, "total_tokens": prompt_tokens + len(content) // 4},
+        })
+
+    def _answer(self, body: dict) -> str:
+        response_format = body.get("response_format") or {}
+        schema = (response_format.get("json_schema") or {})
+        task = (body.get("messages") or [{}])[-1].get("content") or ""
+        task = task.split(TASK_SEPARATOR)[-1]
+        max_score = _max_score(schema.get("schema") or {})
+        if schema.get("name") == "batch" or response_format.get("type") == "json_object":
+            answers = [
+                {"nr": int(nr), "score": fake_score(question, max_score), "kommentar": "Testvurdering fra fake-backend."}
+                for nr, question in re.findall(r"^\s*\[(\d+)\]\s*(.+)$", task, re.MULTILINE)
+            ]
+            return json.dumps({"svar": answers}, ensure_ascii=False)
+        answer = {"score": fake_score(task, max_score), "kommentar": "Testvurdering fra fake-backend."}
+        if "sikkerhet" in ((schema.get("schema") or {}).get("properties") or {}):
+            answer["sikkerhet"] = 1 + fake_score("sikkerhet " + task, 4)
+        return json.dumps(answer, ensure_ascii=False)
+
+def _max_score(schema: dict, default: int = 3) -> int:
+    """Highest score allowed by a score/batch JSON schema (the `enum` of its score field)."""
+    properties = schema.get("properties") or {}
+    if "svar" in properties:
+        properties = (properties["svar"].get("items") or {}).get("properties") or {}
+    enum: Optional[list] = (properties.get("score") or {}).get("enum")
+    return max(enum) if enum else default
@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from dotenv import load_dotenv
+from typing import Callable, Dict, List, Optional
+
+from metrics import JOB_SECONDS, JOBS_IN_PROGRESS
+from rubrics import rubric_key
+
+# Load environment variables from .env file
+load_dotenv()
+
+# How many evaluations run at the same time; the rest wait in the queue
+EVAL_JOB_WORKERS = int(os.getenv("EVAL_JOB_WORKERS", "4"))
+# Finished jobs are forgotten after this many seconds
+EVAL_JOB_TTL_SECONDS = int(os.getenv("EVAL_JOB_TTL_SECONDS", str(24 * 3600)))
+
+@dataclass
+class Job:
+    """One queued evaluation and its progress."""
+    id: str
+    filename: str
+    oppstartstype: str
+    status: str = "queued"  # queued | running | done | failed
+    done: int = 0
+    total: int = 0
+    result_path: Optional[str] = None
+    result_filename: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    events: List[dict] = field(default_factory=list, repr=False)
+    _events_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def update_progress(self, done: int, total: int) -> None:
+        self.done, self.total = done, total
+
+    def add_event(self, event: dict) -> None:
+        """Record a progress event; each gets a sequence `id` (from 1) and a timestamp."""
+        with self._events_lock:
+            self.events.append({"id": len(self.events) + 1, "time": time.time(), **event})
+
+    def events_since(self, last_id: int) -> List[dict]:
+        """Events after sequence number `last_id` (0 = all of them)."""
+        with self._events_lock:
+            return self.events[last_id:]
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "filename": self.filename,
+            "oppstartstype": self.oppstartstype,
+            "status": self.status,
+            "progress": {"done": self.done, "total": self.total},
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result_url": f"/jobs/{self.id}/result" if self.status == "done" else None,
+            "events_url": f"/jobs/{self.id}/events",
+        }
+
+class JobManager:
+    """Runs evaluation jobs on a bounded worker pool, separate from the web server's threads."""
+
+    def __init__(self, max_workers: int = EVAL_JOB_WORKERS, ttl_seconds: int = EVAL_JOB_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="eval-job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, filename: str, oppstartstype: str, work: Callable[[Job], None], cleanup: Optional[Callable[[], None]] = None) -> Job:
+        """Queue `work(job)`; it must set `job.result_path` and `job.result_filename`.
+
+        `cleanup()` runs once the job is over: done, failed, or cancelled by
+        `shutdown` before it started.
+        """
+        job = Job(id=uuid.uuid4().hex, filename=filename, oppstartstype=oppstartstype)
+        with self._lock:
+            self._forget_expired()
+            self._jobs[job.id] = job
+        JOBS_IN_PROGRESS.inc(status="queued")
+        future = self._executor.submit(self._run, job, work)
+        future.add_done_callback(lambda future: self._finish(job, future, cleanup))
+        return job
+
+    def _finish(self, job: Job, future: Future, cleanup: Optional[Callable[[], None]]) -> None:
+        if future.cancelled():
+            job.error = "❌ FEIL: Jobben ble avbrutt fordi serveren stoppet før den startet."
+            job.status = "failed"
+            job.finished_at = time.time()
+            JOBS_IN_PROGRESS.dec(status="queued")
+            job.add_event({"event": "job_failed", "error": job.error, "seconds": 0.0})
+        if cleanup is not None:
+            cleanup()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job, work: Callable[[Job], None]) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        JOBS_IN_PROGRESS.dec(status="queued")
+        JOBS_IN_PROGRESS.inc(status="running")
+        job.add_event({"event": "job_started"})
+        try:
+            work(job)
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+            print(f"❌ Jobb {job.id} ({job.filename}) feilet: {e}")
+        finally:
+            job.finished_at = time.time()
+            JOBS_IN_PROGRESS.dec(status="running")
+            JOB_SECONDS.observe(job.finished_at - job.created_at, rubric=rubric_key(job.oppstartstype), status=job.status)
+            seconds = round(job.finished_at - job.started_at, 3)
+            if job.status == "done":
+                job.add_event({"event": "job_done", "result_url": f"/jobs/{job.id}/result", "seconds": seconds})
+            else:
+                job.add_event({"event": "job_failed", "error": job.error, "seconds": seconds})
+
+    def _forget_expired(self) -> None:
+        cutoff = time.time() - self.ttl_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            if job.result_path and os.path.exists(job.result_path):
+                os.remove(job.result_path)
+
+    def shutdown(self) -> None:
+        """Stop taking jobs; queued ones are cancelled (their cleanup still runs), running ones finish."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
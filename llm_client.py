@@ -0,0 +1,198 @@
+import asyncio
+import importlib.util
+import os
+import threading
+from dotenv import load_dotenv
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from error_policy import retry_call
+from llm_usage import tracked_call
+from prompts import messages_text
+from rate_limiter import estimate_request_tokens
+from tracing import traced
+
+# openai and httpx are imported when the first client is created, not at startup
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncOpenAI
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Which model backend scores applications: openai (the API), local (an OpenAI-compatible
+# server on this machine, e.g. Ollama or llama.cpp) or fake (in-process test scorer, no network)
+EVAL_BACKEND = os.getenv("EVAL_BACKEND", "openai").lower()
+EVAL_LOCAL_BASE_URL = os.getenv("EVAL_LOCAL_BASE_URL", "http://localhost:11434/v1")
+EVAL_LOCAL_MODEL = os.getenv("EVAL_LOCAL_MODEL", "llama3.1")
+BACKENDS = ("openai", "local", "fake")
+
+# Connection pool shared by every evaluation in the process
+EVAL_HTTP_MAX_CONNECTIONS = int(os.getenv("EVAL_HTTP_MAX_CONNECTIONS", "64"))
+EVAL_HTTP_KEEPALIVE_SECONDS = float(os.getenv("EVAL_HTTP_KEEPALIVE_SECONDS", "60"))
+# Timeout for one completion request (seconds); connecting gets at most 10 s of it
+EVAL_REQUEST_TIMEOUT = float(os.getenv("EVAL_REQUEST_TIMEOUT", "60"))
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]"); without it HTTP/1.1 keep-alive is used
+EVAL_HTTP2 = os.getenv("EVAL_HTTP2", "1").lower() in {"1", "true", "ja"}
+
+def retryable_errors() -> Tuple[type, ...]:
+    """Transient API errors that are retried with backoff before a question is given up."""
+    from openai import APIConnectionError, APITimeoutError, RateLimitError
+    return (RateLimitError, APITimeoutError, APIConnectionError)
+
+# httpcore's async pool scans every waiting request against every connection on each
+# event, so one large pool costs more CPU than it saves; the connections are split
+# into pools of this size and each request goes to the least busy one
+POOL_SHARD_SIZE = 8
+
+class CompletionBackend:
+    """AsyncOpenAI clients over pooled httpx connections, driven by a background event loop.
+
+    Evaluations run on worker threads and call `chat_completion`, which submits the
+    request to the shared loop, so all of them reuse the same connections. Pass an
+    httpx `transport` (e.g. `httpx.MockTransport`) or a `base_url` to point the
+    backend at a local stub server. `model`, when set, is used instead of the
+    model name the evaluators ask for.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, transport: Optional["httpx.AsyncBaseTransport"] = None, model: Optional[str] = None):
+        self.api_key = api_key
+        self.model = model  # replaces the evaluator's model name when set (local and fake backends)
+        self.base_url = base_url
+        self.transport = transport
+        self.http2 = EVAL_HTTP2 and transport is None and importlib.util.find_spec("h2") is not None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._clients: List["AsyncOpenAI"] = []
+        self._busy: List[int] = []  # requests in flight per client; only touched on the loop thread
+        self._lock = threading.Lock()
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="llm-client", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def _new_client(self, max_connections: int) -> "AsyncOpenAI":
+        import httpx
+        from openai import AsyncOpenAI
+
+        http_client = httpx.AsyncClient(
+            http2=self.http2,
+            transport=self.transport,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=EVAL_HTTP_KEEPALIVE_SECONDS,
+            ),
+            timeout=httpx.Timeout(EVAL_REQUEST_TIMEOUT, connect=min(10.0, EVAL_REQUEST_TIMEOUT)),
+        )
+        # Retries are handled by error_policy.retry_call, not by the client itself
+        return AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, http_client=http_client, max_retries=0)
+
+    def _pick_client(self) -> int:
+        # Created on the loop thread on first use, so a missing API key only fails when scoring starts
+        if not self._clients:
+            total = max(1, EVAL_HTTP_MAX_CONNECTIONS)
+            sizes = [min(POOL_SHARD_SIZE, total - start) for start in range(0, total, POOL_SHARD_SIZE)]
+            self._clients = [self._new_client(size) for size in sizes]
+            self._busy = [0] * len(sizes)
+        return min(range(len(self._busy)), key=self._busy.__getitem__)
+
+    async def achat_completion(self, **params: Any):
+        """Raw chat completion (with response headers); call `.parse()` for the completion."""
+        index = self._pick_client()
+        self._busy[index] += 1
+        try:
+            return await self._clients[index].chat.completions.with_raw_response.create(**params)
+        finally:
+            self._busy[index] -= 1
+
+    def chat_completion(self, **params: Any):
+        """Blocking bridge for worker threads: runs `achat_completion` on the shared loop."""
+        future = asyncio.run_coroutine_threadsafe(self.achat_completion(**params), self._start())
+        return future.result()
+
+    def close(self) -> None:
+        """Close pooled connections and stop the loop."""
+        with self._lock:
+            loop, self._loop, self._thread = self._loop, None, None
+        if loop is None:
+            return
+
+        async def close_clients():
+            await asyncio.gather(*(client.close() for client in self._clients))
+            self._clients, self._busy = [], []
+
+        asyncio.run_coroutine_threadsafe(close_clients(), loop).result(timeout=10)
+        loop.call_soon_threadsafe(loop.stop)
+
+_backends: Dict[str, CompletionBackend] = {}
+_backend_lock = threading.Lock()
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    """Backend name to use: `name` if given, otherwise EVAL_BACKEND."""
+    name = (name or EVAL_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"❌ FEIL: Ukjent modell-backend '{name}'. Gyldige valg: {', '.join(BACKENDS)}")
+    return name
+
+def _create_backend(name: str) -> CompletionBackend:
+    if name == "local":
+        # Local servers ignore the key, but the client requires one
+        return CompletionBackend(api_key=os.getenv("EVAL_LOCAL_API_KEY", "local"), base_url=EVAL_LOCAL_BASE_URL, model=EVAL_LOCAL_MODEL)
+    if name == "fake":
+        from fake_backend import FAKE_MODEL_NAME, FakeCompletionTransport
+        return CompletionBackend(api_key="fake", base_url="http://fake-backend.invalid/v1", transport=FakeCompletionTransport(), model=FAKE_MODEL_NAME)
+    return CompletionBackend()
+
+def get_backend(name: Optional[str] = None) -> CompletionBackend:
+    """The process-wide backend `name` (default EVAL_BACKEND); openai uses OPENAI_API_KEY / OPENAI_BASE_URL."""
+    name = resolve_backend(name)
+    with _backend_lock:
+        if name not in _backends:
+            _backends[name] = _create_backend(name)
+        return _backends[name]
+
+def backend_model(model: str, backend: Optional[str] = None) -> str:
+    """The model name that is actually sent: the backend's own model, or `model` for the API."""
+    return get_backend(backend).model or model
+
+def configure_backend(api_key: Optional[str] = None, base_url: Optional[str] = None, transport: Optional["httpx.AsyncBaseTransport"] = None, name: str = "openai", model: Optional[str] = None) -> CompletionBackend:
+    """Replace backend `name` (tests and benchmarks use this for a local stub server)."""
+    name = resolve_backend(name)
+    with _backend_lock:
+        old = _backends.get(name)
+        _backends[name] = CompletionBackend(api_key, base_url, transport, model)
+        backend = _backends[name]
+    if old is not None:
+        old.close()
+    return backend
+
+def close_backend() -> None:
+    """Close every backend that has been used."""
+    with _backend_lock:
+        old = list(_backends.values())
+        _backends.clear()
+    for backend in old:
+        backend.close()
+
+@traced("llm", "model")
+def complete(model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int, response_format: Optional[dict] = None, backend: Optional[str] = None) -> str:
+    """One chat completion through the usage tracker, rate limiter and retry policy; returns the reply text.
+
+    `backend` picks openai, local or fake (default EVAL_BACKEND).
+    """
+    backend = resolve_backend(backend)
+    completion_backend = get_backend(backend)
+    model = completion_backend.model or model
+    params = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens}
+    if response_format is not None:
+        params["response_format"] = response_format
+    response = retry_call(
+        lambda: tracked_call(model, lambda: completion_backend.chat_completion(**params), estimate_request_tokens(messages_text(messages), max_tokens), backend),
+        retryable_errors(),
+    )
+    return response.choices[0].message.content
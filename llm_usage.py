@@ -0,0 +1,204 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dotenv import load_dotenv
+from typing import Callable, Dict, Iterator, Mapping, Optional, Tuple, TypeVar
+
+from metrics import LLM_IN_FLIGHT, LLM_PARSE_FAILURES, LLM_RATE_LIMIT_HITS, LLM_REQUESTS, LLM_TOKENS
+from rate_limiter import get_rate_limiter
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Process-wide cap on simultaneous LLM requests across all evaluations (0 = no cap).
+# Per-evaluation concurrency (EVAL_MAX_CONCURRENCY) still applies underneath it.
+EVAL_MAX_IN_FLIGHT = int(os.getenv("EVAL_MAX_IN_FLIGHT", "0"))
+
+T = TypeVar("T")
+
+_slots: Optional[threading.BoundedSemaphore] = None
+_lock = threading.Lock()
+_in_flight = 0
+_usage: Dict[str, Dict[str, int]] = {}
+# The innermost metered_calls block; worker threads see it when given a copy of the context
+_meter: ContextVar[Optional[Dict[str, float]]] = ContextVar("usage_meter", default=None)
+
+def set_max_in_flight(limit: int) -> None:
+    """Set the global in-flight cap; call before evaluations start."""
+    global _slots
+    _slots = threading.BoundedSemaphore(limit) if limit > 0 else None
+
+set_max_in_flight(EVAL_MAX_IN_FLIGHT)
+
+@contextmanager
+def llm_slot() -> Iterator[None]:
+    """Hold one of the global in-flight slots for the duration of an API call."""
+    global _in_flight
+    slots = _slots
+    if slots is not None:
+        slots.acquire()
+    with _lock:
+        _in_flight += 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _in_flight -= 1
+        if slots is not None:
+            slots.release()
+
+COUNTER_NAMES = (
+    "requests", "failures", "prompt_tokens", "cached_tokens", "completion_tokens", "seconds",
+    "parsed", "parse_failures", "repaired",
+)
+
+def _field(obj, name: str):
+    if obj is None:
+        return None
+    return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+def _usage_counts(response) -> Tuple[int, int, int]:
+    """(prompt_tokens, cached_tokens, completion_tokens) from a chat completion response, 0 when not reported.
+
+    cached_tokens is the part of the prompt the provider served from its prompt cache.
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None and isinstance(response, dict):
+        usage = response.get("usage")
+    cached_tokens = _field(_field(usage, "prompt_tokens_details"), "cached_tokens")
+    return _field(usage, "prompt_tokens") or 0, cached_tokens or 0, _field(usage, "completion_tokens") or 0
+
+def _counters(model: str) -> Dict[str, float]:
+    return _usage.setdefault(model, dict.fromkeys(COUNTER_NAMES, 0))
+
+def _error_headers(error: Exception) -> Optional[Mapping[str, str]]:
+    """Response headers of an API error (openai 1.x keeps them on .response, 0.28 on .headers)."""
+    response = getattr(error, "response", None)
+    return getattr(response, "headers", None) or getattr(error, "headers", None)
+
+def tracked_call(model: str, call: Callable[[], T], estimated_tokens: int = 0, backend: str = "openai") -> T:
+    """Run one API call through the global slots and the model's rate limiter, and count its requests and tokens per model.
+
+    `call` may return a raw response (`with_raw_response`); its rate-limit headers
+    are fed to the limiter and the parsed completion is returned. Backends that
+    are not remote (local, fake) have no limiter.
+    """
+    limiter = get_rate_limiter(backend, model)
+    with llm_slot():
+        if limiter is not None:
+            limiter.acquire(estimated_tokens)
+        start = time.perf_counter()
+        try:
+            response = call()
+        except Exception as e:
+            if type(e).__name__ == "RateLimitError":
+                if limiter is not None:
+                    limiter.on_rate_limit(_error_headers(e))
+                LLM_RATE_LIMIT_HITS.inc(model=model)
+            with _lock:
+                _counters(model)["failures"] += 1
+            count_usage(failures=1)
+            LLM_REQUESTS.inc(model=model, status="error")
+            raise
+        finally:
+            if limiter is not None:
+                limiter.release()
+    headers = None
+    if hasattr(response, "parse") and hasattr(response, "headers"):
+        headers = response.headers
+        response = response.parse()
+    seconds = time.perf_counter() - start
+    prompt_tokens, cached_tokens, completion_tokens = _usage_counts(response)
+    if limiter is not None:
+        limiter.on_success(headers, estimated_tokens, prompt_tokens + completion_tokens)
+    with _lock:
+        counters = _counters(model)
+        counters["requests"] += 1
+        counters["prompt_tokens"] += prompt_tokens
+        counters["cached_tokens"] += cached_tokens
+        counters["completion_tokens"] += completion_tokens
+        counters["seconds"] += seconds
+    LLM_REQUESTS.inc(model=model, status="ok")
+    LLM_TOKENS.inc(prompt_tokens, model=model, kind="prompt")
+    LLM_TOKENS.inc(cached_tokens, model=model, kind="cached")
+    LLM_TOKENS.inc(completion_tokens, model=model, kind="completion")
+    count_usage(requests=1, prompt_tokens=prompt_tokens, cached_tokens=cached_tokens, completion_tokens=completion_tokens, seconds=seconds)
+    return response
+
+def count_usage(**amounts: float) -> None:
+    """Add to the counters of the current metered_calls block (nothing outside one)."""
+    meter = _meter.get()
+    if meter is not None:
+        with _lock:
+            for name, amount in amounts.items():
+                meter[name] = meter.get(name, 0) + amount
+
+@contextmanager
+def metered_calls() -> Iterator[Dict[str, float]]:
+    """Count the API calls (COUNTER_NAMES) and other count_usage figures made inside the block.
+
+    Used to attribute tokens to a single question (or batch) and to report one
+    evaluation on its own while others run. Worker threads count for the block
+    when their work runs in a copy of its context (`contextvars.copy_context().run`).
+    Nesting is allowed; an inner block's counts go to the enclosing one as well.
+    """
+    meter: Dict[str, float] = dict.fromkeys(COUNTER_NAMES, 0)
+    token = _meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _meter.reset(token)
+        previous = _meter.get()
+        if previous is not None:
+            with _lock:
+                for name, value in meter.items():
+                    previous[name] = previous.get(name, 0) + value
+
+def record_parse_result(model: str, failed: bool, repaired: bool) -> None:
+    """Count one parsed answer, and whether it needed (and survived) a format repair."""
+    with _lock:
+        counters = _counters(model)
+        counters["parsed"] += 1
+        counters["parse_failures"] += int(failed)
+        counters["repaired"] += int(repaired)
+    count_usage(parsed=1, parse_failures=int(failed), repaired=int(repaired))
+    if failed:
+        LLM_PARSE_FAILURES.inc(model=model, repaired="true" if repaired else "false")
+
+def parse_failure_rates() -> Dict[str, float]:
+    """Share of answers per model that did not parse on the first try."""
+    with _lock:
+        return {model: c["parse_failures"] / c["parsed"] for model, c in _usage.items() if c["parsed"]}
+
+def in_flight() -> int:
+    with _lock:
+        return _in_flight
+
+LLM_IN_FLIGHT.function = in_flight
+
+def usage_snapshot() -> Dict[str, Dict[str, int]]:
+    """Copy of the per-model counters since the process started."""
+    with _lock:
+        return {model: dict(counters) for model, counters in _usage.items()}
+
+def usage_totals(snapshot: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, int]:
+    """Counters summed over all models."""
+    totals = dict.fromkeys(COUNTER_NAMES, 0)
+    for counters in (usage_snapshot() if snapshot is None else snapshot).values():
+        for name in totals:
+            totals[name] += counters.get(name, 0)
+    return totals
+
+def print_usage_stats(usage: Mapping[str, float]) -> None:
+    """Print API calls, tokens (and how many came from the provider's prompt cache) and mean latency from a metered_calls meter."""
+    if not usage["requests"]:
+        return
+    cached_share = usage["cached_tokens"] / usage["prompt_tokens"] if usage["prompt_tokens"] else 0.0
+    print(f"📡 API: {usage['requests']} kall, {usage['prompt_tokens']:,} prompt-tokens "
+          f"({usage['cached_tokens']:,} fra leverandørens cache, {cached_share:.0%}), "
+          f"snitt {usage['seconds'] / usage['requests']:.2f}s per kall")
+    if usage["parse_failures"]:
+        print(f"🧩 Formatfeil i {usage['parse_failures']} av {usage['parsed']} svar "
+              f"({usage['parse_failures'] / usage['parsed']:.1%}), {usage['repaired']} reparert uten ny vurdering")
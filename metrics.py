@@ -0,0 +1,164 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Metrics for GET /metrics in the Prometheus text format. An update is a dict lookup
+# and an addition under the metric's own lock, cheap enough to leave on in production
+METRICS_ENABLED = os.getenv("METRICS_DISABLED", "").lower() not in {"1", "true", "ja"}
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds; from a cached answer (milliseconds) to a slow report (minutes)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_registry: List["Metric"] = []
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class Metric:
+    """A named metric with fixed label names; values are kept per combination of label values."""
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def _sample_lines(self) -> List[str]:
+        raise NotImplementedError
+
+    def expose(self) -> str:
+        return "\n".join([f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self._sample_lines()])
+
+class Counter(Metric):
+    """A count that only goes up (requests, tokens, retries)."""
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _sample_lines(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_number(value)}" for key, value in values]
+
+class Gauge(Counter):
+    """A value that goes up and down, or is read from `function` when the metrics are collected."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), function: Optional[Callable[[], float]] = None):
+        super().__init__(name, help, labels)
+        self.function = function
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def _sample_lines(self) -> List[str]:
+        if self.function is not None:
+            return [f"{self.name} {_format_number(self.function())}"]
+        return super()._sample_lines()
+
+class Histogram(Metric):
+    """Observations counted in cumulative buckets, with their sum and count."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the seconds the block takes (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return sum(state[0]) if state else 0
+
+    def _sample_lines(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labels + ("le",), key + (_format_number(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+def render() -> str:
+    """Every metric in the Prometheus text exposition format."""
+    return "\n".join(metric.expose() for metric in _registry) + "\n"
+
+# Where the time goes: reading the PDF, scoring each question, writing Excel, and the whole evaluation
+PDF_EXTRACTION_SECONDS = Histogram("eval_pdf_extraction_seconds", "Time to get the text of one PDF (source: pdf = parsed, store = text store).", ["source"])
+QUESTION_SECONDS = Histogram("eval_question_seconds", "Time to score one question with the model, retries included (cached and pre-checked answers are not counted).", ["rubric", "category"])
+EXCEL_RENDER_SECONDS = Histogram("eval_excel_render_seconds", "Time to write one Excel report.", ["rubric"])
+JOB_SECONDS = Histogram("eval_job_seconds", "Time from upload to finished report (or failure), queueing included.", ["rubric", "status"])
+HTTP_REQUEST_SECONDS = Histogram("eval_http_request_seconds", "Time until an HTTP response starts (a streamed body is not included).", ["method", "route", "status"])
+
+# What the model calls cost and how often they go wrong
+LLM_REQUESTS = Counter("eval_llm_requests_total", "Chat completion requests (status: ok or error).", ["model", "status"])
+LLM_TOKENS = Counter("eval_llm_tokens_total", "Tokens per model (kind: prompt, cached = prompt tokens from the provider's cache, completion).", ["model", "kind"])
+LLM_RETRIES = Counter("eval_llm_retries_total", "Requests retried after a transient error.", ["error"])
+LLM_RATE_LIMIT_HITS = Counter("eval_llm_rate_limit_hits_total", "Requests answered with a rate-limit error.", ["model"])
+LLM_PARSE_FAILURES = Counter("eval_llm_parse_failures_total", "Answers that did not parse on the first try (repaired: fixed without a new assessment).", ["model", "repaired"])
+
+# What is going on right now
+HTTP_IN_FLIGHT = Gauge("eval_http_requests_in_flight", "HTTP requests being answered.")
+JOBS_IN_PROGRESS = Gauge("eval_jobs", "Evaluation jobs by status (queued or running).", ["status"])
+# Read from llm_usage.in_flight when the metrics are collected
+LLM_IN_FLIGHT = Gauge("eval_llm_requests_in_flight", "Chat completion requests waiting for an answer.")
@@ -0,0 +1,161 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from dotenv import load_dotenv
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
+
+from metrics import PDF_EXTRACTION_SECONDS
+from retrieval import remember_page_offsets
+from text_store import file_sha256, lookup_text, store_text
+from tracing import traced
+
+# PyPDF2 is imported when a PDF is first read, so importing this module stays cheap
+if TYPE_CHECKING:
+    import PyPDF2
+
+# Load environment variables from .env file
+load_dotenv()
+
+# PDFs with at least this many pages are extracted in a process pool
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "60"))
+# Number of extraction processes (default: one per CPU)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+
+@dataclass
+class ExtractedPage:
+    """Text of one PDF page and how long it took to extract."""
+    number: int  # 1-based
+    text: str
+    seconds: float
+
+@dataclass
+class ExtractionResult:
+    """Full document text (pages joined with newlines), page start offsets and per-page timings."""
+    text: str
+    page_count: int
+    page_offsets: List[int] = field(default_factory=list)
+    page_seconds: List[float] = field(default_factory=list)
+    wall_seconds: float = 0.0
+    sha256: Optional[str] = None
+    from_store: bool = False
+
+def normalize_page_text(text: str) -> str:
+    """NFC-normalize so 'ø' is the same code point whether the PDF stored it composed or not."""
+    return unicodedata.normalize("NFC", text or "")
+
+def _open_reader(filename: str, data: Optional[bytes] = None) -> "PyPDF2.PdfReader":
+    """A reader over `data` when the PDF is in memory (BytesIO shares a bytes object without copying), else over the file."""
+    import PyPDF2
+    return PyPDF2.PdfReader(filename if data is None else io.BytesIO(data))
+
+# The in-memory PDF in an extraction process, handed over once per process rather than once per page range
+_worker_data: Optional[bytes] = None
+
+def _init_worker(data: Optional[bytes]) -> None:
+    global _worker_data
+    _worker_data = data
+
+def _extract_page_range(filename: str, start: int, stop: int) -> List[Tuple[int, str, float]]:
+    """Extract pages [start, stop) in a worker process (opens its own reader)."""
+    reader = _open_reader(filename, _worker_data)
+    pages = []
+    for index in range(start, stop):
+        page_start = time.perf_counter()
+        text = normalize_page_text(reader.pages[index].extract_text())
+        pages.append((index + 1, text, time.perf_counter() - page_start))
+    return pages
+
+def iter_pdf_pages(filename: str, workers: Optional[int] = None, parallel_min_pages: Optional[int] = None, data: Optional[bytes] = None) -> Iterator[ExtractedPage]:
+    """Yield the pages of a PDF in order as they are extracted.
+
+    Small files are read in-process; files with at least `parallel_min_pages`
+    pages are split into page ranges that are extracted in a process pool.
+    With `data` the PDF is read from those bytes instead of from `filename`.
+    """
+    yield from _iter_reader_pages(_open_reader(filename, data), filename, workers, parallel_min_pages, data)
+
+def _iter_reader_pages(reader: "PyPDF2.PdfReader", filename: str, workers: Optional[int], parallel_min_pages: Optional[int], data: Optional[bytes] = None) -> Iterator[ExtractedPage]:
+    workers = PDF_WORKERS if workers is None else workers
+    parallel_min_pages = PDF_PARALLEL_MIN_PAGES if parallel_min_pages is None else parallel_min_pages
+    total_pages = len(reader.pages)
+
+    if workers <= 1 or total_pages < parallel_min_pages:
+        for index, page in enumerate(reader.pages):
+            page_start = time.perf_counter()
+            text = normalize_page_text(page.extract_text())
+            yield ExtractedPage(index + 1, text, time.perf_counter() - page_start)
+        return
+
+    # A few ranges per worker keeps the pool busy even if some pages are slow
+    chunk_size = max(1, -(-total_pages // (workers * 4)))
+    ranges = [(start, min(start + chunk_size, total_pages)) for start in range(0, total_pages, chunk_size)]
+    # Spawned, not forked: the server and batch runs have threads (client event loop, job
+    # pool) whose locks a forked child would inherit in whatever state they were in
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker, initargs=(data,)) as executor:
+        chunks = executor.map(
+            _extract_page_range,
+            [filename] * len(ranges),
+            [start for start, _ in ranges],
+            [stop for _, stop in ranges],
+        )
+        for chunk in chunks:
+            for number, text, seconds in chunk:
+                yield ExtractedPage(number, text, seconds)
+
+@traced("extract", "filename")
+def extract_pdf_text(filename: str, workers: Optional[int] = None, parallel_min_pages: Optional[int] = None, progress: bool = True, use_store: bool = True, data: Optional[bytes] = None, sha256: Optional[str] = None) -> ExtractionResult:
+    """Extract all text from a PDF, joining the pages once at the end.
+
+    With `use_store` the text is looked up in (and saved to) the text store by the
+    SHA-256 of the file, so the same PDF is only parsed once. `data` reads the PDF
+    from memory instead of `filename`; pass `sha256` when the hash is already known
+    (e.g. computed while the upload was received) so the bytes are not hashed again.
+    """
+    start = time.perf_counter()
+    pdf_sha256 = None
+    if use_store:
+        pdf_sha256 = sha256 or (file_sha256(filename) if data is None else hashlib.sha256(data).hexdigest())
+    if pdf_sha256 is not None:
+        stored = lookup_text(pdf_sha256)
+        if stored is not None:
+            text, page_offsets = stored
+            remember_page_offsets(text, page_offsets)
+            if progress:
+                print(f"♻️  Gjenbruker tekst fra tidligere lesing av samme PDF ({len(page_offsets)} sider)")
+            wall_seconds = time.perf_counter() - start
+            PDF_EXTRACTION_SECONDS.observe(wall_seconds, source="store")
+            return ExtractionResult(text, len(page_offsets), page_offsets, [], wall_seconds, pdf_sha256, True)
+
+    parts: List[str] = []
+    page_offsets: List[int] = []
+    page_seconds: List[float] = []
+    offset = 0
+    reader = _open_reader(filename, data)
+    total_pages = len(reader.pages)
+    if progress:
+        print(f"📖 Leser {total_pages} sider fra PDF...")
+
+    for page in _iter_reader_pages(reader, filename, workers, parallel_min_pages, data):
+        parts.append(page.text)
+        page_offsets.append(offset)
+        offset += len(page.text) + 1
+        page_seconds.append(page.seconds)
+        if progress and page.number % 5 == 0:  # Show progress every 5 pages
+            print(f"   📄 Behandlet side {page.number}/{total_pages}")
+
+    # Same layout as before: every page followed by a newline
+    parts.append("")
+    result = ExtractionResult("\n".join(parts), total_pages, page_offsets, page_seconds, time.perf_counter() - start, pdf_sha256)
+    PDF_EXTRACTION_SECONDS.observe(result.wall_seconds, source="pdf")
+    remember_page_offsets(result.text, page_offsets)
+    if pdf_sha256 is not None and result.text.strip():
+        store_text(pdf_sha256, result.text, page_offsets)
+    if progress and page_seconds:
+        slowest = max(range(total_pages), key=page_seconds.__getitem__)
+        print(f"   ⏱️  {result.wall_seconds:.2f}s totalt, tregeste side {slowest + 1} ({page_seconds[slowest]:.2f}s)")
+    return result
@@ -0,0 +1,20 @@
+from typing import Dict, List
+
+# Separates the shared document prefix from the per-question task in the user message
+TASK_SEPARATOR = "\n\n---\n\n"
+
+def scoring_messages(system_prompt: str, application_text: str, task: str, text_label: str = "Søknad") -> List[Dict[str, str]]:
+    """Chat messages for one scoring call, with the parts shared by every call first.
+
+    The system prompt (instructions and scoring scale) and the application text are
+    identical for all questions on a document, so they form a prefix the provider
+    can cache. Only the task at the very end (question(s) and answer format) varies.
+    """
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": f"{text_label}:\n{application_text}{TASK_SEPARATOR}{task}"},
+    ]
+
+def messages_text(messages: List[Dict[str, str]]) -> str:
+    """All message contents joined, for token estimates."""
+    return "\n".join(message["content"] for message in messages)
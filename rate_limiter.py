@@ -0,0 +1,217 @@
+import os
+import re
+import threading
+import time
+from dotenv import load_dotenv
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Organisation limits per model. 0 = unknown: learned from the x-ratelimit-* response headers.
+EVAL_RPM_LIMIT = int(os.getenv("EVAL_RPM_LIMIT", "0"))
+EVAL_TPM_LIMIT = int(os.getenv("EVAL_TPM_LIMIT", "0"))
+# Ceiling for the adaptive number of simultaneous requests per model across all evaluations in the process
+EVAL_ADAPTIVE_MAX_CONCURRENCY = int(os.getenv("EVAL_ADAPTIVE_MAX_CONCURRENCY", "32"))
+
+# Backends with provider rate limits; local servers and the fake backend are not limited
+REMOTE_BACKENDS = ("openai",)
+
+def estimate_request_tokens(prompt: str, max_tokens: int) -> int:
+    """Tokens a request counts against the TPM limit: prompt (about four characters per token) plus max_tokens."""
+    return len(prompt) // 4 + max_tokens
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """Seconds from a reset/retry header: '1.5', '20ms', '6m0s', '1h2m3.5s'."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+class TokenBucket:
+    """Refills `capacity` units evenly over `period` seconds; `take` blocks until enough are available."""
+
+    def __init__(self, capacity: float, period: float = 60.0, clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.capacity = capacity
+        self.period = period
+        self.level = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.capacity / self.period)
+        self._updated = now
+
+    def take(self, amount: float) -> float:
+        """Remove `amount` units (at most one full bucket), waiting as needed; returns seconds waited."""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.level >= amount:
+                    self.level -= amount
+                    return waited
+                shortfall = (amount - self.level) * self.period / self.capacity
+            pause = min(shortfall, 1.0)
+            self._sleep(pause)
+            waited += pause
+
+    def adjust(self, amount: float) -> None:
+        """Give back (positive) or charge (negative) units after the real usage is known."""
+        with self._lock:
+            self._refill()
+            self.level = min(self.capacity, self.level + amount)
+
+    def sync(self, capacity: Optional[float] = None, remaining: Optional[float] = None) -> None:
+        """Adopt the limit and remaining budget the server reported."""
+        with self._lock:
+            self._refill()
+            if capacity:
+                self.capacity = capacity
+            if remaining is not None:
+                self.level = min(self.level, remaining, self.capacity)
+
+class RateLimiter:
+    """Client-side limiter for one model of the completion API, shared by the whole process.
+
+    Every request first takes one unit from the request bucket and its estimated
+    tokens from the token bucket, then waits for a concurrency slot. The number of
+    slots adapts AIMD-style: +1/limit per successful request, halved (at most once
+    per second) on a rate-limit response, which also pauses all requests for the
+    server's retry-after. Bucket sizes come from EVAL_RPM_LIMIT/EVAL_TPM_LIMIT or
+    are learned from the x-ratelimit-* headers.
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, max_concurrency: int = 32, min_concurrency: int = 1, period: float = 60.0, clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.period = period
+        self._clock = clock
+        self._sleep = sleep
+        self._fixed_rpm, self._fixed_tpm = bool(rpm), bool(tpm)
+        self.requests: Optional[TokenBucket] = TokenBucket(rpm, period, clock, sleep) if rpm else None
+        self.tokens: Optional[TokenBucket] = TokenBucket(tpm, period, clock, sleep) if tpm else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.rate_limited = 0
+        self.waited_seconds = 0.0
+        self._last_decrease = float("-inf")
+        self._cond = threading.Condition()
+
+    def acquire(self, estimated_tokens: int) -> None:
+        """Block until the request fits the request/token budgets and a concurrency slot is free."""
+        waited = 0.0
+        if self.requests is not None:
+            waited += self.requests.take(1)
+        if self.tokens is not None:
+            waited += self.tokens.take(estimated_tokens)
+        start = self._clock()
+        with self._cond:
+            while True:
+                pause = self.paused_until - self._clock()
+                if pause <= 0 and self.in_flight < int(self.limit):
+                    break
+                self._cond.wait(timeout=max(pause, 0.05) if pause > 0 else 1.0)
+            self.in_flight += 1
+            self.waited_seconds += waited + (self._clock() - start)
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self, headers: Optional[Mapping[str, str]], estimated_tokens: int, used_tokens: int) -> None:
+        """Grow the concurrency limit and reconcile the token bucket with real usage and headers."""
+        with self._cond:
+            self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+        if self.tokens is not None and used_tokens:
+            self.tokens.adjust(estimated_tokens - used_tokens)
+        if headers:
+            self._sync_headers(headers)
+
+    def on_rate_limit(self, headers: Optional[Mapping[str, str]]) -> None:
+        """Halve the concurrency limit and pause everyone until the server's retry-after."""
+        now = self._clock()
+        retry_after = None
+        if headers:
+            retry_after = parse_reset(headers.get("retry-after-ms"))
+            retry_after = retry_after / 1000 if retry_after is not None else parse_reset(headers.get("retry-after"))
+            self._sync_headers(headers)
+        with self._cond:
+            self.rate_limited += 1
+            if now - self._last_decrease >= 1.0:
+                self.limit = max(float(self.min_concurrency), self.limit / 2)
+                self._last_decrease = now
+            if retry_after:
+                self.paused_until = max(self.paused_until, now + retry_after)
+
+    def _sync_headers(self, headers: Mapping[str, str]) -> None:
+        def number(name: str) -> Optional[float]:
+            try:
+                return float(headers.get(name))
+            except (TypeError, ValueError):
+                return None
+
+        limit_requests, remaining_requests = number("x-ratelimit-limit-requests"), number("x-ratelimit-remaining-requests")
+        limit_tokens, remaining_tokens = number("x-ratelimit-limit-tokens"), number("x-ratelimit-remaining-tokens")
+        if limit_requests and not self._fixed_rpm:
+            if self.requests is None:
+                self.requests = TokenBucket(limit_requests, self.period, self._clock, self._sleep)
+            self.requests.sync(capacity=limit_requests)
+        if self.requests is not None and remaining_requests is not None:
+            self.requests.sync(remaining=remaining_requests)
+        if limit_tokens and not self._fixed_tpm:
+            if self.tokens is None:
+                self.tokens = TokenBucket(limit_tokens, self.period, self._clock, self._sleep)
+            self.tokens.sync(capacity=limit_tokens)
+        if self.tokens is not None and remaining_tokens is not None:
+            self.tokens.sync(remaining=remaining_tokens)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "concurrency_limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "rate_limited": self.rate_limited,
+                "waited_seconds": round(self.waited_seconds, 2),
+            }
+
+# One limiter per (backend, model): the provider's limits and headers are per model
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+_override: Optional[RateLimiter] = None
+
+def get_rate_limiter(backend: str = "openai", model: str = "") -> Optional[RateLimiter]:
+    """The limiter for `model` on `backend`, created on first use; None for backends that are not remote."""
+    if backend not in REMOTE_BACKENDS:
+        return None
+    if _override is not None:
+        return _override
+    with _limiters_lock:
+        limiter = _limiters.get((backend, model))
+        if limiter is None:
+            limiter = _limiters[(backend, model)] = RateLimiter(EVAL_RPM_LIMIT, EVAL_TPM_LIMIT, EVAL_ADAPTIVE_MAX_CONCURRENCY)
+        return limiter
+
+def set_rate_limiter(limiter: Optional[RateLimiter]) -> None:
+    """Use `limiter` for every remote model (benchmarks use this to compress time); None restores one per model."""
+    global _override
+    _override = limiter
+
+def reset_rate_limiters() -> None:
+    """Forget every learned limit (tests)."""
+    with _limiters_lock:
+        _limiters.clear()
@@ -0,0 +1,203 @@
+import os
+from dotenv import load_dotenv
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Tuple, Union
+
+from openpyxl import Workbook
+from openpyxl.cell import Cell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.styles.borders import DEFAULT_BORDER
+from openpyxl.styles.fonts import DEFAULT_FONT
+
+from tracing import STAGES, current_trace, profiling_requested
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Reports with at least this many result rows are written in openpyxl's write-only
+# mode, which streams rows to disk instead of keeping every cell in memory (a little
+# slower, but memory stays flat)
+EXCEL_WRITE_ONLY_MIN_ROWS = int(os.getenv("EXCEL_WRITE_ONLY_MIN_ROWS", "10000"))
+# Add a hidden "Ytelse" sheet with stage timings and tokens per question to every report
+# (runs started with --profile get it without this)
+REPORT_PERFORMANCE_SHEET = os.getenv("REPORT_PERFORMANCE_SHEET", "").lower() in {"1", "true", "ja"}
+
+GREEN = "C6EFCE"
+YELLOW = "FFEB9C"
+RED = "FFC7CE"
+GREY = "EDEDED"  # questions skipped by early stopping
+
+def _solid(color: str) -> PatternFill:
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+_THIN = Side(style="thin")
+BORDER = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)
+CENTER = Alignment(horizontal="center", vertical="center")
+WHITE_HEADING = Font(bold=True, size=14, color="FFFFFF")
+
+# Every cell format used by the reports; registered once per workbook as named styles
+REPORT_STYLES: Dict[str, dict] = {
+    "title": {"font": Font(bold=True, size=16, color="FFFFFF"), "fill": _solid("1F4E79"), "alignment": CENTER},
+    "label": {"font": Font(bold=True, size=12)},
+    "total_label": {"font": Font(bold=True, size=14)},
+    "total_value": {"font": WHITE_HEADING, "fill": _solid("366092"), "alignment": CENTER},
+    "section": {"font": WHITE_HEADING, "fill": _solid("366092")},
+    "section_dark": {"font": WHITE_HEADING, "fill": _solid("1F4E79")},
+    "table_header": {"font": Font(bold=True, size=11), "fill": _solid("D9E2F3"), "alignment": CENTER, "border": BORDER},
+    "cell": {"border": BORDER},
+    "cell_center": {"border": BORDER, "alignment": CENTER},
+    "comment": {"border": BORDER, "alignment": Alignment(wrap_text=True, vertical="top")},
+}
+for _name, _color in (("green", GREEN), ("yellow", YELLOW), ("red", RED)):
+    REPORT_STYLES[f"assessment_{_name}"] = {"font": Font(bold=True, size=12), "fill": _solid(_color), "alignment": CENTER}
+    REPORT_STYLES[f"summary_{_name}"] = {"fill": _solid(_color), "alignment": CENTER}
+    REPORT_STYLES[f"score_{_name}"] = {"border": BORDER, "alignment": CENTER, "fill": _solid(_color)}
+REPORT_STYLES["summary_skipped"] = {"font": Font(italic=True), "fill": _solid(GREY), "alignment": CENTER}
+REPORT_STYLES["score_skipped"] = {"border": BORDER, "alignment": CENTER, "fill": _solid(GREY)}
+
+# Name shown in Excel's style list
+STYLE_PREFIX = "Rapport "
+
+CellSpec = Union[None, str, int, float, Tuple[object, str]]  # value, or (value, style key)
+
+def traffic_light(score: float, green_from: float, yellow_from: float) -> str:
+    """"green", "yellow" or "red" for a score, as used in the style names."""
+    if score >= green_from:
+        return "green"
+    if score >= yellow_from:
+        return "yellow"
+    return "red"
+
+def counted_scores(results_df: "pd.DataFrame") -> "pd.Series":
+    """The Score column with questions skipped by early stopping (`attrs["skipped"]`) as NaN, so means leave them out."""
+    skipped = results_df.attrs.get("skipped")
+    if not skipped:
+        return results_df['Score']
+    return results_df['Score'].mask(skipped)
+
+def score_cell(score: Optional[float], max_score: int, green_from: float, yellow_from: float) -> CellSpec:
+    """A question's score as "2/3" coloured by traffic_light, or a blank grey cell for a skipped question (NaN or None)."""
+    if score is None or score != score:
+        return (None, "score_skipped")
+    return (f"{int(score)}/{max_score}", f"score_{traffic_light(score, green_from, yellow_from)}")
+
+def new_report_workbook(write_only: bool = False) -> Workbook:
+    """An empty workbook (no sheets) with the report styles registered."""
+    wb = Workbook(write_only=write_only)
+    if not write_only:
+        wb.remove(wb.active)
+    existing = set(wb.named_styles)
+    for key, formatting in REPORT_STYLES.items():
+        if STYLE_PREFIX + key not in existing:
+            # Parts a style leaves out keep the workbook defaults, as on a plain cell
+            wb.add_named_style(NamedStyle(name=STYLE_PREFIX + key, **{"font": DEFAULT_FONT, "border": DEFAULT_BORDER, **formatting}))
+    return wb
+
+def use_write_only(row_count: int, write_only: Optional[bool] = None) -> bool:
+    """`write_only` if given, otherwise whether `row_count` reaches EXCEL_WRITE_ONLY_MIN_ROWS."""
+    return row_count >= EXCEL_WRITE_ONLY_MIN_ROWS if write_only is None else write_only
+
+class ReportSheet:
+    """Appends styled rows to a new worksheet, top to bottom.
+
+    Works the same on normal and write-only workbooks: column widths are set
+    before the first row, and row heights and merges are given as rows are
+    appended, so nothing has to be revisited after a row is written. Rows after
+    `tall_rows_after` get `tall_row_height` unless a row gives its own height.
+    """
+
+    def __init__(self, wb: Workbook, title: str, column_widths: Dict[str, float], tall_rows_after: Optional[int] = None, tall_row_height: float = 60):
+        self.ws = wb.create_sheet(title)
+        self.write_only = wb.write_only
+        for column, width in column_widths.items():
+            self.ws.column_dimensions[column].width = width
+        self.tall_rows_after = tall_rows_after
+        self.tall_row_height = tall_row_height
+        self.row = 1  # the row the next append writes to
+
+    def append(self, cells: Iterable[CellSpec], height: Optional[float] = None, merge: Optional[str] = None) -> None:
+        """Write one row; `merge` is a column range such as "A:D" on this row."""
+        if height is None and self.tall_rows_after is not None and self.row > self.tall_rows_after:
+            height = self.tall_row_height
+        if height is not None:
+            self.ws.row_dimensions[self.row].height = height
+        row = []
+        for spec in cells:
+            if isinstance(spec, tuple):
+                cell = Cell(self.ws, value=spec[0])
+                cell.style = STYLE_PREFIX + spec[1]
+                row.append(cell)
+            else:
+                row.append(spec)
+        self.ws.append(row)
+        if height is not None and self.write_only:
+            # A write-only row (and its height) is on disk once appended; keep memory flat
+            del self.ws.row_dimensions[self.row]
+        if merge is not None:
+            first, last = merge.split(":")
+            reference = f"{first}{self.row}:{last}{self.row}"
+            if self.write_only:
+                self.ws.merged_cells.add(reference)
+            else:
+                self.ws.merge_cells(reference)
+        self.row += 1
+
+    def skip(self, rows: int = 1, height: Optional[float] = None) -> None:
+        """Leave `rows` empty rows."""
+        for _ in range(rows):
+            self.append((), height=height)
+
+    def close(self) -> None:
+        """Finish a write-only sheet now, releasing its open temporary file, instead of at save."""
+        if self.write_only:
+            self.ws.close()
+
+def use_performance_sheet(performance_sheet: Optional[bool] = None) -> bool:
+    """`performance_sheet` if given, otherwise REPORT_PERFORMANCE_SHEET or a run started with --profile."""
+    if performance_sheet is not None:
+        return performance_sheet
+    return REPORT_PERFORMANCE_SHEET or profiling_requested()
+
+def append_performance_sheet(wb: Workbook, results_df: "pd.DataFrame") -> None:
+    """Add the hidden "Ytelse" sheet: the run, the stage timings of the current trace and seconds and tokens per question.
+
+    Stages still running (the report itself) are timed up to this point.
+    """
+    sheet = ReportSheet(wb, "Ytelse", {'A': 30, 'B': 60, 'C': 12, 'D': 14, 'E': 16})
+    sheet.ws.sheet_state = "hidden"
+    sheet.append([("YTELSE", "title")], merge="A:E")
+    sheet.skip()
+
+    run = results_df.attrs.get("run") or {}
+    labels = {"model": "Modell", "backend": "Backend", "scoring_mode": "Vurderingsmodus", "prompt_version": "Promptversjon"}
+    for key, label in labels.items():
+        if key in run:
+            sheet.append([(label, "label"), (str(run[key]), "cell")])
+    if run:
+        sheet.skip()
+
+    sheet.append([("TID PER TRINN", "section")], merge="A:E")
+    trace = current_trace()
+    totals = trace.stage_totals() if trace is not None else {}
+    if totals:
+        sheet.append([(header, "table_header") for header in ['Trinn', 'Navn i sporingen', 'Antall', 'Sekunder totalt', 'Lengste (sekunder)']])
+        for name, (count, seconds, longest) in totals.items():
+            sheet.append([(STAGES.get(name, name), "cell"), (name, "cell"), (count, "cell_center"), (round(seconds, 3), "cell_center"), (round(longest, 3), "cell_center")])
+    else:
+        sheet.append([("Ingen tidsmåling for denne rapporten", "cell")], merge="A:E")
+    sheet.skip()
+
+    stats = results_df.attrs.get("question_stats") or {}
+    if not stats:
+        return
+    sheet.append([("TID OG TOKENS PER SPØRSMÅL", "section")], merge="A:E")
+    sheet.append([(header, "table_header") for header in ['Kategori', 'Spørsmål', 'Sekunder', 'Prompt-tokens', 'Completion-tokens']])
+    columns = zip(results_df['Kategori'], results_df['Spørsmål'], stats["seconds"], stats["prompt_tokens"], stats["completion_tokens"])
+    for category, question, seconds, prompt_tokens, completion_tokens in columns:
+        sheet.append([(category, "cell"), (question, "cell"), (round(seconds, 3), "cell_center"), (prompt_tokens, "cell_center"), (completion_tokens, "cell_center")])
+    sheet.append([
+        ("Sum", "label"), ("", "cell"), (round(sum(stats["seconds"]), 3), "cell_center"),
+        (sum(stats["prompt_tokens"]), "cell_center"), (sum(stats["completion_tokens"]), "cell_center"),
+    ])
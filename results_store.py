@@ -0,0 +1,277 @@
+"""Columnar store of every evaluation, one row per scored question, with a small query CLI.
+
+Evaluations are appended as Parquet files partitioned by rubric (rubrics.rubric_key)
+and date (rubric=nic/date=2026-10-17/<id>.parquet). Queries read only the columns
+and partitions they need through pyarrow.dataset, so aggregates over thousands of
+applications do not touch the Excel reports. pyarrow is in requirements.txt; in an
+environment without it, evaluations still run but nothing is stored (with a
+one-time notice) and the queries explain how to install it.
+
+    python results_store.py categories --rubric nic --since 2026-01-01
+    python results_store.py drift --from gpt-4o --to gpt-4o-mini
+    python results_store.py slowest --limit 10
+    python results_store.py compact
+"""
+import argparse
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+from typing import List, Optional, Union
+
+import pandas as pd
+
+from rubrics import rubric_key
+from text_store import file_sha256
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Where evaluations are appended (a directory of Parquet partitions)
+RESULTS_STORE_PATH = os.getenv("RESULTS_STORE_PATH", os.path.join(".cache", "results"))
+RESULTS_STORE_ENABLED = os.getenv("RESULTS_STORE_DISABLED", "").lower() not in {"1", "true", "ja"}
+
+_warned_lock = threading.Lock()
+_warned = False
+
+def _pyarrow():
+    """(pyarrow, pyarrow.dataset, pyarrow.parquet, pyarrow.compute), or None when pyarrow is not installed."""
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow, pyarrow.dataset, pyarrow.parquet, pyarrow.compute
+
+def _require_pyarrow():
+    modules = _pyarrow()
+    if modules is None:
+        raise Exception("❌ FEIL: Resultatlageret trenger pyarrow. Installer med: pip install pyarrow")
+    return modules
+
+def _schema(pa):
+    """Columns of a stored question row (rubric and date are the partition directories)."""
+    return pa.schema([
+        ("evaluation_id", pa.string()),
+        ("evaluated_at", pa.timestamp("ms", tz="UTC")),
+        ("document", pa.string()),
+        ("document_sha256", pa.string()),
+        ("model", pa.string()),
+        ("backend", pa.string()),
+        ("scoring_mode", pa.string()),
+        ("prompt_version", pa.string()),
+        ("question_index", pa.int16()),
+        ("category", pa.string()),
+        ("question", pa.string()),
+        ("score", pa.int8()),
+        ("max_score", pa.int8()),
+        ("comment", pa.string()),
+        ("failed", pa.bool_()),
+        ("skipped", pa.bool_()),  # not asked: early stopping (score 0 is a placeholder)
+        ("seconds", pa.float32()),
+        ("prompt_tokens", pa.int32()),
+        ("completion_tokens", pa.int32()),
+    ])
+
+def append_evaluation(results_df: pd.DataFrame, oppstartstype: str, pdf_filename: Optional[str] = None, document_sha256: Optional[str] = None, path: str = None) -> Optional[str]:
+    """Append one evaluation (a results DataFrame from the evaluators) and return the file written.
+
+    Seconds, tokens, the model behind each row and the prompt version come from
+    the DataFrame's attrs (see rubric_evaluation._results_dataframe). Returns None
+    when the store is disabled (RESULTS_STORE_DISABLED) or pyarrow is missing.
+    """
+    global _warned
+    if not RESULTS_STORE_ENABLED:
+        return None
+    modules = _pyarrow()
+    if modules is None:
+        with _warned_lock:
+            if not _warned:
+                print("ℹ️  pyarrow er ikke installert – evalueringer lagres ikke i resultatlageret (pip install pyarrow)")
+                _warned = True
+        return None
+    pa, _, pq, _ = modules
+
+    if document_sha256 is None and pdf_filename and os.path.isfile(pdf_filename):
+        document_sha256 = file_sha256(pdf_filename)
+    run = results_df.attrs.get("run", {})
+    rows = len(results_df)
+    stats = results_df.attrs.get("question_stats") or {}
+    failed = {(error["Kategori"], error["Spørsmål"]) for error in results_df.attrs.get("errors", [])}
+    evaluated_at = datetime.now(timezone.utc)
+    evaluation_id = uuid.uuid4().hex
+    categories = results_df["Kategori"].tolist()
+    questions = results_df["Spørsmål"].tolist()
+
+    columns = {
+        "evaluation_id": [evaluation_id] * rows,
+        "evaluated_at": [evaluated_at] * rows,
+        "document": [os.path.basename(pdf_filename) if pdf_filename else None] * rows,
+        "document_sha256": [document_sha256] * rows,
+        "model": results_df.attrs.get("answered_by") or [run.get("model")] * rows,
+        "backend": [run.get("backend")] * rows,
+        "scoring_mode": [run.get("scoring_mode")] * rows,
+        "prompt_version": [run.get("prompt_version")] * rows,
+        "question_index": list(range(rows)),
+        "category": categories,
+        "question": questions,
+        "score": results_df["Score"].tolist(),
+        "max_score": [run.get("max_score")] * rows,
+        "comment": results_df["Kommentar"].tolist(),
+        "failed": [(category, question) in failed for category, question in zip(categories, questions)],
+        "skipped": results_df.attrs.get("skipped") or [False] * rows,
+        "seconds": stats.get("seconds") or [None] * rows,
+        "prompt_tokens": stats.get("prompt_tokens") or [None] * rows,
+        "completion_tokens": stats.get("completion_tokens") or [None] * rows,
+    }
+    table = pa.Table.from_pydict(columns, schema=_schema(pa))
+
+    partition = os.path.join(path or RESULTS_STORE_PATH, f"rubric={rubric_key(oppstartstype)}", f"date={evaluated_at:%Y-%m-%d}")
+    os.makedirs(partition, exist_ok=True)
+    filename = os.path.join(partition, f"{evaluation_id}.parquet")
+    # Written under a dot-name first (ignored by readers), then renamed into place
+    temp_filename = os.path.join(partition, f".{evaluation_id}.parquet.tmp")
+    pq.write_table(table, temp_filename, compression="zstd")
+    os.replace(temp_filename, filename)
+    return filename
+
+def _scan(columns, rubric: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None, model: Union[str, List[str], None] = None, path: str = None, scored_only: bool = False):
+    """Read only `columns` of the rows matching the filters; rubric and dates prune whole partitions.
+
+    `model` is one model name or a list of them. `scored_only` leaves out failed and
+    skipped questions, whose score 0 is not an answer (files written before the
+    skipped column have it as null, which counts as not skipped).
+    """
+    pa, ds, _, _ = _require_pyarrow()
+    path = path or RESULTS_STORE_PATH
+    if not os.path.isdir(path):
+        raise Exception(f"❌ FEIL: Fant ikke resultatlageret i '{path}'. Er det evaluert noe ennå?")
+    partitioning = ds.partitioning(pa.schema([("rubric", pa.string()), ("date", pa.string())]), flavor="hive")
+    dataset = ds.dataset(path, format="parquet", partitioning=partitioning, schema=_schema(pa).append(pa.field("rubric", pa.string())).append(pa.field("date", pa.string())))
+    condition = None
+    for expression in (
+        ds.field("rubric") == rubric_key(rubric) if rubric else None,
+        ds.field("date") >= since if since else None,
+        ds.field("date") <= until if until else None,
+        (ds.field("model").isin(model) if isinstance(model, list) else ds.field("model") == model) if model else None,
+        ~ds.field("failed") & (ds.field("skipped").is_null() | ~ds.field("skipped")) if scored_only else None,
+    ):
+        if expression is not None:
+            condition = expression if condition is None else condition & expression
+    return dataset.to_table(columns=list(columns), filter=condition)
+
+def mean_score_by_category(rubric: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None, model: Optional[str] = None, path: str = None) -> pd.DataFrame:
+    """Mean score, number of answers and number of documents per rubric and category (failed and skipped questions left out)."""
+    table = _scan(["rubric", "category", "score", "max_score", "document_sha256"], rubric, since, until, model, path, scored_only=True)
+    grouped = table.group_by(["rubric", "category"]).aggregate([
+        ("score", "mean"), ("max_score", "max"), ("score", "count"), ("document_sha256", "count_distinct"),
+    ])
+    return grouped.to_pandas().rename(columns={
+        "score_mean": "mean_score", "max_score_max": "max_score", "score_count": "answers", "document_sha256_count_distinct": "documents",
+    }).sort_values(["rubric", "mean_score"], ascending=[True, False], ignore_index=True)
+
+def score_drift(from_model: str, to_model: str, rubric: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None, path: str = None) -> pd.DataFrame:
+    """How scores moved from one model to another, per category, on the same documents and questions.
+
+    Only (document, question) pairs scored by both models are compared (failed and
+    skipped questions are not scores); repeated evaluations of a pair are averaged first.
+    """
+    _, ds, _, pc = _require_pyarrow()
+    keys = ["rubric", "category", "question", "document_sha256"]
+    table = _scan(keys + ["model", "score"], rubric, since, until, [from_model, to_model], path, scored_only=True)
+    per_model = {}
+    for name, model in (("from", from_model), ("to", to_model)):
+        selected = table.filter(pc.equal(table["model"], model))
+        per_model[name] = selected.group_by(keys).aggregate([("score", "mean")]).rename_columns(keys + [f"score_{name}"])
+    paired = per_model["from"].join(per_model["to"], keys=keys, join_type="inner")
+    paired = paired.append_column("change", pc.subtract(paired["score_to"], paired["score_from"]))
+    grouped = paired.group_by(["rubric", "category"]).aggregate([
+        ("score_from", "mean"), ("score_to", "mean"), ("change", "mean"), ("change", "count"),
+    ])
+    return grouped.to_pandas().rename(columns={
+        "score_from_mean": "from_score", "score_to_mean": "to_score", "change_mean": "change", "change_count": "pairs",
+    }).sort_values("change", key=abs, ascending=False, ignore_index=True)
+
+def slowest_questions(limit: int = 10, rubric: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None, model: Optional[str] = None, path: str = None) -> pd.DataFrame:
+    """Questions with the highest mean latency, with their token use; cached answers (0 s) are left out."""
+    _, _, _, pc = _require_pyarrow()
+    table = _scan(["rubric", "question", "seconds", "prompt_tokens", "completion_tokens"], rubric, since, until, model, path)
+    table = table.filter(pc.greater(table["seconds"], 0))
+    grouped = table.group_by(["rubric", "question"]).aggregate([
+        ("seconds", "mean"), ("seconds", "max"), ("seconds", "count"), ("prompt_tokens", "mean"), ("completion_tokens", "mean"),
+    ])
+    return grouped.to_pandas().rename(columns={
+        "seconds_mean": "mean_seconds", "seconds_max": "max_seconds", "seconds_count": "answers",
+        "prompt_tokens_mean": "prompt_tokens", "completion_tokens_mean": "completion_tokens",
+    }).sort_values("mean_seconds", ascending=False, ignore_index=True).head(limit)
+
+def compact(path: str = None) -> int:
+    """Merge each partition's per-evaluation files into one file; returns how many files were merged away."""
+    pa, _, pq, _ = _require_pyarrow()
+    path = path or RESULTS_STORE_PATH
+    merged = 0
+    for directory, _, filenames in os.walk(path):
+        parts = sorted(name for name in filenames if name.endswith(".parquet") and not name.startswith("."))
+        if len(parts) < 2:
+            continue
+        # Read with the current schema so files written before a column was added get it as null
+        combined = pa.concat_tables([pq.read_table(os.path.join(directory, name), schema=_schema(pa)) for name in parts])
+        name = f"compacted-{uuid.uuid4().hex}.parquet"
+        pq.write_table(combined, os.path.join(directory, f".{name}.tmp"), compression="zstd")
+        os.replace(os.path.join(directory, f".{name}.tmp"), os.path.join(directory, name))
+        # Files appended while compacting were not listed and are kept
+        for part in parts:
+            os.remove(os.path.join(directory, part))
+        merged += len(parts) - 1
+    return merged
+
+# Column headings for the command-line output
+HEADINGS = {
+    "rubric": "rubrikk", "category": "kategori", "question": "spørsmål", "mean_score": "snitt", "max_score": "maks",
+    "answers": "svar", "documents": "dokumenter", "from_score": "fra", "to_score": "til", "change": "endring", "pairs": "par",
+    "mean_seconds": "snitt (s)", "max_seconds": "maks (s)", "prompt_tokens": "tokens inn", "completion_tokens": "tokens ut",
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=RESULTS_STORE_PATH, help="Results store directory (default RESULTS_STORE_PATH)")
+    filters = argparse.ArgumentParser(add_help=False)
+    filters.add_argument("--rubric", help="Only this rubric, e.g. nic or 'Oppstart 2'")
+    filters.add_argument("--since", help="First date (YYYY-MM-DD)")
+    filters.add_argument("--until", help="Last date (YYYY-MM-DD)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    categories = commands.add_parser("categories", parents=[filters], help="Mean score per category")
+    categories.add_argument("--model")
+    drift = commands.add_parser("drift", parents=[filters], help="Score change per category between two models")
+    drift.add_argument("--from", dest="from_model", required=True)
+    drift.add_argument("--to", dest="to_model", required=True)
+    slowest = commands.add_parser("slowest", parents=[filters], help="Questions with the highest mean latency")
+    slowest.add_argument("--model")
+    slowest.add_argument("--limit", type=int, default=10)
+    commands.add_parser("compact", help="Merge small files per partition")
+    args = parser.parse_args()
+
+    pd.set_option("display.width", 200)
+    pd.set_option("display.max_colwidth", 80)
+    if args.command == "categories":
+        result = mean_score_by_category(args.rubric, args.since, args.until, args.model, args.path)
+        print("📊 Gjennomsnittlig score per kategori")
+    elif args.command == "drift":
+        result = score_drift(args.from_model, args.to_model, args.rubric, args.since, args.until, args.path)
+        print(f"📈 Endring i score fra {args.from_model} til {args.to_model} (samme dokumenter og spørsmål)")
+    elif args.command == "slowest":
+        result = slowest_questions(args.limit, args.rubric, args.since, args.until, args.model, args.path)
+        print(f"🐢 De {args.limit} tregeste spørsmålene (gjennomsnittlig svartid)")
+    else:
+        print(f"🗜️  {compact(args.path)} filer slått sammen i {args.path}")
+        return
+    if result.empty:
+        print("   Ingen treff.")
+    else:
+        print(result.round(2).rename(columns=HEADINGS).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
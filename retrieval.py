@@ -0,0 +1,212 @@
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from dotenv import load_dotenv
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from llm_usage import count_usage
+
+# Load environment variables from .env file
+load_dotenv()
+
+# "full" = always send the whole application, "retrieval" = always send only the
+# most relevant passages, "auto" = retrieval only for applications above EVAL_CONTEXT_MAX_TOKENS
+EVAL_CONTEXT_MODE = os.getenv("EVAL_CONTEXT_MODE", "auto")
+EVAL_CONTEXT_MAX_TOKENS = int(os.getenv("EVAL_CONTEXT_MAX_TOKENS", "90000"))
+EVAL_CONTEXT_TOKEN_BUDGET = int(os.getenv("EVAL_CONTEXT_TOKEN_BUDGET", "6000"))
+EVAL_CONTEXT_TOP_K = int(os.getenv("EVAL_CONTEXT_TOP_K", "12"))
+
+CHUNK_MAX_CHARS = 1200
+
+STOPWORDS = {
+    "og", "i", "på", "av", "for", "til", "er", "det", "som", "en", "et", "ei", "med", "at", "de", "den",
+    "har", "om", "fra", "vi", "dere", "seg", "sin", "sine", "sitt", "ikke", "eller", "hvor", "hva",
+    "hvordan", "hvis", "hvilke", "hvilken", "godt", "beskrevet", "beskriver", "beskrives", "grad",
+    "stor", "kommer", "frem", "være", "blir", "skal", "kan", "dette", "disse", "så", "også", "etc",
+}
+_SUFFIXES = ("ene", "ane", "ende", "ert", "het", "ing", "er", "en", "et", "e")
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token for Norwegian prose)."""
+    return len(text) // 4
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords removed and common Norwegian suffixes stripped."""
+    terms = []
+    for word in re.findall(r"\w+", text.lower()):
+        if word in STOPWORDS or word.isdigit():
+            continue
+        for suffix in _SUFFIXES:
+            if len(word) - len(suffix) >= 4 and word.endswith(suffix):
+                word = word[: -len(suffix)]
+                break
+        terms.append(word)
+    return terms
+
+@dataclass
+class Chunk:
+    """A passage of the application: paragraphs from a single page."""
+    index: int
+    page: int  # 1-based
+    text: str
+
+def _paragraph_units(page_text: str, max_chars: int) -> Iterator[str]:
+    """Paragraphs of a page; paragraphs longer than `max_chars` are split at line breaks."""
+    for paragraph in re.split(r"\n\s*\n", page_text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            yield paragraph
+            continue
+        for line in paragraph.splitlines():
+            for start in range(0, len(line), max_chars):
+                if line[start:start + max_chars].strip():
+                    yield line[start:start + max_chars].strip()
+
+def chunk_text(text: str, page_offsets: Optional[List[int]] = None, max_chars: int = CHUNK_MAX_CHARS) -> List[Chunk]:
+    """Split text into paragraph-based chunks of at most ~`max_chars`, never crossing a page boundary."""
+    page_offsets = page_offsets or [0]
+    bounds = zip(page_offsets, page_offsets[1:] + [len(text)])
+    chunks: List[Chunk] = []
+    for page_number, (page_start, page_end) in enumerate(bounds, 1):
+        current: List[str] = []
+        size = 0
+        for unit in _paragraph_units(text[page_start:page_end], max_chars):
+            if current and size + len(unit) > max_chars:
+                chunks.append(Chunk(len(chunks), page_number, "\n".join(current)))
+                current, size = [], 0
+            current.append(unit)
+            size += len(unit) + 1
+        if current:
+            chunks.append(Chunk(len(chunks), page_number, "\n".join(current)))
+    return chunks
+
+class BM25Index:
+    """Okapi BM25 over the chunks of one document; built once, queried per question."""
+
+    def __init__(self, chunks: List[Chunk], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1, self.b = k1, b
+        self.term_freqs = [Counter(tokenize(chunk.text)) for chunk in chunks]
+        self.lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        doc_freq: Counter = Counter()
+        for tf in self.term_freqs:
+            doc_freq.update(tf.keys())
+        n = len(chunks)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+
+    def scores(self, query: str) -> List[float]:
+        terms = [term for term in set(tokenize(query)) if term in self.idf]
+        scores = []
+        for tf, length in zip(self.term_freqs, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self.avg_length or 1))
+            scores.append(sum(self.idf[t] * tf[t] * (self.k1 + 1) / (tf[t] + norm) for t in terms if t in tf))
+        return scores
+
+    def top_chunks(self, query: str, top_k: int, token_budget: int) -> List[Chunk]:
+        """Best-scoring chunks that fit the token budget, returned in document order."""
+        ranked = sorted(range(len(self.chunks)), key=self.scores(query).__getitem__, reverse=True)
+        selected, used = [], 0
+        for index in ranked:
+            tokens = estimate_tokens(self.chunks[index].text)
+            if used + tokens > token_budget:
+                continue
+            selected.append(self.chunks[index])
+            used += tokens
+            if len(selected) >= top_k:
+                break
+        return sorted(selected, key=lambda chunk: chunk.index)
+
+@dataclass
+class ContextReport:
+    """How much of the application was sent for one question."""
+    full_tokens: int
+    sent_tokens: int
+    chunks: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.full_tokens - self.sent_tokens
+
+# Indexes and page offsets for the most recent documents, keyed by the text itself
+_MAX_DOCUMENTS = 8
+_indexes: "OrderedDict[str, BM25Index]" = OrderedDict()
+_page_offsets: "OrderedDict[str, List[int]]" = OrderedDict()
+_lock = threading.Lock()
+_totals = {"full_tokens": 0, "sent_tokens": 0, "questions": 0}
+
+def remember_page_offsets(text: str, page_offsets: List[int]) -> None:
+    """Let retrieval chunk a freshly extracted document along its page boundaries."""
+    with _lock:
+        _page_offsets[text] = page_offsets
+        _page_offsets.move_to_end(text)
+        while len(_page_offsets) > _MAX_DOCUMENTS:
+            _page_offsets.popitem(last=False)
+
+def get_index(application_text: str) -> BM25Index:
+    """BM25 index for a document, built on first use and reused for every question."""
+    with _lock:
+        index = _indexes.get(application_text)
+        if index is not None:
+            _indexes.move_to_end(application_text)
+            return index
+        page_offsets = _page_offsets.get(application_text)
+    index = BM25Index(chunk_text(application_text, page_offsets))
+    with _lock:
+        _indexes[application_text] = index
+        while len(_indexes) > _MAX_DOCUMENTS:
+            _indexes.popitem(last=False)
+    return index
+
+def uses_retrieval(application_text: str) -> bool:
+    if EVAL_CONTEXT_MODE == "retrieval":
+        return True
+    if EVAL_CONTEXT_MODE == "auto":
+        return estimate_tokens(application_text) > EVAL_CONTEXT_MAX_TOKENS
+    return False
+
+def context_signature(application_text: str) -> str:
+    """Describes how context is built for this document; part of the score cache key."""
+    if not uses_retrieval(application_text):
+        return "full"
+    return f"bm25-k{EVAL_CONTEXT_TOP_K}-t{EVAL_CONTEXT_TOKEN_BUDGET}-c{CHUNK_MAX_CHARS}"
+
+def prepare_context(application_text: str, query: str) -> Tuple[str, Optional[ContextReport]]:
+    """Return the application text to put in the prompt for `query`.
+
+    Without retrieval this is the full text and no report. With retrieval it is
+    the top-k passages within the token budget, each marked with its page number.
+    """
+    if not uses_retrieval(application_text):
+        return application_text, None
+
+    chunks = get_index(application_text).top_chunks(query, EVAL_CONTEXT_TOP_K, EVAL_CONTEXT_TOKEN_BUDGET)
+    context = "\n[...]\n".join(f"[Side {chunk.page}]\n{chunk.text}" for chunk in chunks)
+    report = ContextReport(estimate_tokens(application_text), estimate_tokens(context), len(chunks))
+    with _lock:
+        _totals["full_tokens"] += report.full_tokens
+        _totals["sent_tokens"] += report.sent_tokens
+        _totals["questions"] += 1
+    count_usage(retrieval_questions=1, retrieval_full_tokens=report.full_tokens, retrieval_sent_tokens=report.sent_tokens)
+    print(f"  ✂️  Kontekst: {report.chunks} utdrag, ~{report.sent_tokens:,} av ~{report.full_tokens:,} tokens "
+          f"({report.saved_tokens:,} spart) – {query[:50]}...")
+    return context, report
+
+def retrieval_stats() -> Dict[str, int]:
+    """Questions and tokens with retrieval since the process started."""
+    with _lock:
+        return dict(_totals, saved_tokens=_totals["full_tokens"] - _totals["sent_tokens"])
+
+def print_retrieval_stats(usage: Mapping[str, float]) -> None:
+    """Print how many prompt tokens retrieval saved, from an evaluation's meter (nothing when it was not used)."""
+    questions, full_tokens = int(usage.get("retrieval_questions", 0)), int(usage.get("retrieval_full_tokens", 0))
+    if questions:
+        saved_tokens = full_tokens - int(usage.get("retrieval_sent_tokens", 0))
+        share = saved_tokens / full_tokens if full_tokens else 0.0
+        print(f"✂️  Utdrag i stedet for hele søknaden: ~{saved_tokens:,} tokens spart "
+              f"({share:.0%}) over {questions} forespørsler")
@@ -0,0 +1,192 @@
+import json
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from llm_client import backend_model, complete, get_backend
+from llm_usage import count_usage, metered_calls
+from structured_output import parse_confidence, parse_score_with_repair, score_response_format
+
+# Load environment variables from .env file
+load_dotenv()
+
+# A routing policy is "large" (only the large model, as without routing), "cheap" (only
+# the cheap model) or escalation signals joined with "+", e.g. "confidence+borderline":
+# the cheap model answers first and the large model is asked when any signal fires
+#   confidence  the cheap model's self-reported "sikkerhet" is below EVAL_ROUTING_MIN_CONFIDENCE
+#   agreement   a second cheap sample (at EVAL_ROUTING_SAMPLE_TEMPERATURE) gives another score
+#   borderline  the cheap score is neither 0 nor full score
+# A cheap reply that cannot be parsed, even after the format repair, is always escalated.
+# Routing only applies to the openai backend: local and fake answer every request with
+# their one model, so there is nothing to route between and questions go straight to it.
+SIGNALS = ("confidence", "agreement", "borderline")
+EVAL_ROUTING = os.getenv("EVAL_ROUTING", "large")
+# Per-category overrides: "Krav fra IN=cheap;Klyngens rolle=confidence+agreement"
+EVAL_ROUTING_POLICIES = os.getenv("EVAL_ROUTING_POLICIES", "")
+EVAL_CHEAP_MODEL = os.getenv("EVAL_CHEAP_MODEL", "gpt-4o-mini")
+EVAL_ROUTING_MIN_CONFIDENCE = int(os.getenv("EVAL_ROUTING_MIN_CONFIDENCE", "4"))
+EVAL_ROUTING_SAMPLE_TEMPERATURE = float(os.getenv("EVAL_ROUTING_SAMPLE_TEMPERATURE", "0.8"))
+
+# Shadow mode asks both models on every question, answers with the large one and logs
+# everything to EVAL_ROUTING_LOG for benchmarks/eval_routing_policies.py
+EVAL_ROUTING_SHADOW = os.getenv("EVAL_ROUTING_SHADOW", "").lower() in {"1", "true", "ja"}
+EVAL_ROUTING_LOG = os.getenv("EVAL_ROUTING_LOG", os.path.join(".cache", "routing_log.jsonl"))
+
+CONFIDENCE_REQUEST = '\n    Oppgi også "sikkerhet" (heltall 1-5): hvor sikker du er på scoren, der 1 er en gjetning og 5 er helt sikker.'
+
+Policy = Optional[FrozenSet[str]]  # None = large model only; otherwise the escalation signals
+
+def parse_policy(text: str) -> Policy:
+    """"large" -> None, "cheap" -> no signals, "confidence+borderline" -> those signals."""
+    name = text.strip().lower()
+    if name == "large":
+        return None
+    if name == "cheap":
+        return frozenset()
+    signals = frozenset(part.strip() for part in name.split("+"))
+    unknown = signals - set(SIGNALS)
+    if unknown:
+        raise ValueError(f"❌ FEIL: Ukjent rutingspolicy '{text}'. Bruk large, cheap eller {'+'.join(SIGNALS)} (eller en del av dem).")
+    return signals
+
+def parse_category_policies(text: str) -> Dict[str, Policy]:
+    """Policies per category from "Kategori=policy;Kategori=policy" (category names may contain "=")."""
+    policies = {}
+    for entry in text.split(";"):
+        if entry.strip():
+            category, _, policy = entry.rpartition("=")
+            policies[category.strip()] = parse_policy(policy)
+    return policies
+
+def policy_name(policy: Policy) -> str:
+    """The policy written as in EVAL_ROUTING."""
+    if policy is None:
+        return "large"
+    return "+".join(signal for signal in SIGNALS if signal in policy) or "cheap"
+
+DEFAULT_POLICY = parse_policy(EVAL_ROUTING)
+CATEGORY_POLICIES = parse_category_policies(EVAL_ROUTING_POLICIES)
+
+def routing_policy(category: str) -> Policy:
+    """The policy for a category: its override in EVAL_ROUTING_POLICIES, otherwise EVAL_ROUTING."""
+    return CATEGORY_POLICIES.get(category, DEFAULT_POLICY)
+
+def routes_models(backend: Optional[str] = None) -> bool:
+    """Whether `backend` serves the model asked for; local and fake use their own model for every request."""
+    return get_backend(backend).model is None
+
+def uses_routing(category: str, backend: Optional[str] = None) -> bool:
+    """Whether questions in `category` go through score_with_routing (always in shadow mode, never on local/fake)."""
+    return routes_models(backend) and (EVAL_ROUTING_SHADOW or routing_policy(category) is not None)
+
+def routed_model(category: str, large_model: str, backend: Optional[str] = None) -> str:
+    """Model label for a category's answers (used in cache keys): "gpt-4o-mini>gpt-4o:confidence" when routed."""
+    policy = routing_policy(category)
+    if policy is None or EVAL_ROUTING_SHADOW or not routes_models(backend):
+        return backend_model(large_model, backend)
+    return f"{backend_model(EVAL_CHEAP_MODEL, backend)}>{backend_model(large_model, backend)}:{policy_name(policy)}"
+
+def escalation_reasons(policy: FrozenSet[str], samples: List[Tuple[int, Optional[int]]], max_score: int, min_confidence: int = EVAL_ROUTING_MIN_CONFIDENCE) -> List[str]:
+    """The signals in `policy` that fire for the cheap (score, confidence) samples; empty = keep the cheap answer."""
+    score, confidence = samples[0]
+    reasons = []
+    if "confidence" in policy and (confidence is None or confidence < min_confidence):
+        reasons.append("confidence")
+    if "agreement" in policy and len({sample_score for sample_score, _ in samples}) > 1:
+        reasons.append("agreement")
+    if "borderline" in policy and 0 < score < max_score:
+        reasons.append("borderline")
+    return reasons
+
+def sample_count(policy: Policy) -> int:
+    """Cheap samples a policy needs: two for the agreement signal, otherwise one (none for large)."""
+    if policy is None:
+        return 0
+    return 2 if "agreement" in policy else 1
+
+_log_lock = threading.Lock()
+
+def _ask(model: str, messages: List[Dict[str, str]], temperature: float, max_score: int, confidence: bool, backend: Optional[str]) -> dict:
+    """One scored answer from `model` with the model name, its confidence, seconds and tokens."""
+    start = time.perf_counter()
+    with metered_calls() as meter:
+        reply = complete(model, messages, temperature, 200, score_response_format(max_score, confidence), backend)
+        score, comment = parse_score_with_repair(reply, max_score, backend_model(model, backend),
+                                                 lambda repair, max_tokens, response_format: complete(model, repair, temperature, max_tokens, response_format, backend))
+    return {"score": score, "comment": comment, "model": backend_model(model, backend), "confidence": parse_confidence(reply) if confidence else None,
+            "seconds": round(time.perf_counter() - start, 3), "prompt_tokens": meter["prompt_tokens"], "completion_tokens": meter["completion_tokens"]}
+
+def score_with_routing(category: str, messages: List[Dict[str, str]], max_score: int, large_model: str, temperature: float, backend: Optional[str] = None, log_fields: Optional[dict] = None) -> Tuple[int, str, str]:
+    """Score one question with the cheap model first, escalating to `large_model` per the category's policy.
+
+    Returns the score, the comment and the model that gave them.
+
+    `messages` are the evaluator's usual scoring messages; a confidence request is
+    appended to the task when the policy needs it. Cheap samples are asked one
+    after the other; a cheap reply that cannot be parsed sends the question to the
+    large model whatever the policy. In shadow mode both models answer, the large
+    model's answer is returned and everything is logged with `log_fields`
+    (document, question).
+    """
+    policy = routing_policy(category)
+    shadow = EVAL_ROUTING_SHADOW
+    confidence = shadow or "confidence" in policy
+    cheap_messages = messages
+    if confidence:
+        cheap_messages = messages[:-1] + [{**messages[-1], "content": messages[-1]["content"] + CONFIDENCE_REQUEST}]
+    samples = []
+    unparsable = False
+    for number in range(2 if shadow else sample_count(policy)):
+        try:
+            samples.append(_ask(EVAL_CHEAP_MODEL, cheap_messages, temperature if number == 0 else EVAL_ROUTING_SAMPLE_TEMPERATURE, max_score, confidence, backend))
+        except ValueError:
+            unparsable = True
+            break
+    if unparsable:
+        reasons = ["parse"]
+    else:
+        reasons = [] if policy is None else escalation_reasons(policy, [(sample["score"], sample["confidence"]) for sample in samples], max_score)
+    if shadow or policy is None or reasons:
+        large = _ask(large_model, messages, temperature, max_score, False, backend)
+    else:
+        large = None
+
+    # Counted on the evaluation's meter (see llm_usage.metered_calls)
+    if shadow:
+        count_usage(routing_shadow=1)
+    elif large is None:
+        count_usage(routing_cheap=1)
+    else:
+        count_usage(routing_escalated=1, **{f"routing_{reason}": 1 for reason in reasons})
+    if shadow:
+        _log_shadow({
+            **(log_fields or {}), "category": category, "max_score": max_score,
+            "cheap_model": backend_model(EVAL_CHEAP_MODEL, backend), "large_model": backend_model(large_model, backend),
+            "cheap": [{name: value for name, value in sample.items() if name not in ("comment", "model")} for sample in samples],
+            "cheap_unparsable": unparsable,
+            "large": {name: value for name, value in large.items() if name not in ("comment", "model", "confidence")},
+        })
+    answer = samples[0] if large is None else large
+    return answer["score"], answer["comment"], answer["model"]
+
+def _log_shadow(record: dict) -> None:
+    """Append one shadow-mode record to EVAL_ROUTING_LOG."""
+    with _log_lock:
+        directory = os.path.dirname(EVAL_ROUTING_LOG)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(EVAL_ROUTING_LOG, "a", encoding="utf-8") as log:
+            log.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+def print_routing_stats(usage: Mapping[str, float]) -> None:
+    """Print how many questions the cheap model answered and why others were escalated, from an evaluation's meter (nothing without routing)."""
+    stats = {name: int(usage.get(f"routing_{name}", 0)) for name in ("cheap", "escalated", "shadow", "parse") + SIGNALS}
+    if stats["shadow"]:
+        print(f"🔀 Ruting (skygge): {stats['shadow']} spørsmål besvart av begge modeller, logget til {EVAL_ROUTING_LOG}")
+    routed = stats["cheap"] + stats["escalated"]
+    if routed:
+        reasons = ", ".join(f"{signal} {stats[signal]}" for signal in SIGNALS + ("parse",) if stats[signal])
+        print(f"🔀 Ruting: {stats['cheap']} av {routed} spørsmål besvart av {EVAL_CHEAP_MODEL}, "
+              f"{stats['escalated']} eskalert" + (f" ({reasons})" if reasons else ""))
@@ -0,0 +1,299 @@
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+
+from adaptive_scoring import EARLY_STOP_COMMENT, EARLY_STOP_ENABLED, PRECHECK_ENABLED, outcome_decided, precheck_answers, priority_order
+from batch_scoring import DEFAULT_SCORING_MODE, batch_max_tokens, format_batch_questions, score_questions_batched
+from error_policy import ScoringError, error_record, question_deadline
+from llm_client import backend_model, complete, resolve_backend
+from llm_usage import metered_calls, print_usage_stats
+from prompts import scoring_messages
+from retrieval import context_signature, prepare_context, print_retrieval_stats
+from routing import EVAL_ROUTING_SHADOW, print_routing_stats, routed_model, score_with_routing, uses_routing
+from score_cache import lookup_answer, print_cache_stats, score_cache_key, store_score, text_fingerprint
+from scoring_engine import DEFAULT_MAX_CONCURRENCY, EventCallback, ProgressCallback, QuestionStats, emit_event, emit_outcome, rubric_jobs, score_questions_concurrently
+from structured_output import batch_response_format, parse_score_with_repair, score_response_format
+from tracing import traced
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+@dataclass(frozen=True)
+class Evaluator:
+    """What differs between evaluate_application and evaluate_nic_application; run_evaluation does the rest."""
+    rubric: str  # name in metrics and progress events (see rubrics.rubric_name)
+    max_score: int
+    model: str
+    temperature: float
+    prompt_version: str  # bump whenever a prompt changes, so cached scores from the old prompt are not reused
+    batch_prompt_version: str
+    system_prompt: str
+    # The task after the application text: with {question} and {category}, or {questions} for a batch
+    question_task: str
+    batch_task: str
+    text_label: str = "Søknad"  # heading of the application text in the prompt
+    # Result columns after "Kategori" for every question in a category (NIC's weight)
+    category_columns: Callable[[str], dict] = lambda category: {}
+    # Heading printed before a category's questions when scoring one at a time
+    category_heading: Callable[[str], str] = lambda category: category
+    # Total scores where the overall assessment changes; without them there is no early stop
+    assessment_thresholds: Optional[Sequence[float]] = None
+
+def run_evaluation(evaluator: Evaluator, application_text: str, questions: Dict[str, List[str]], max_concurrency: Optional[int] = None, scoring_mode: Optional[str] = None, progress_callback: Optional[ProgressCallback] = None, interactive: bool = False, backend: Optional[str] = None, event_callback: Optional[EventCallback] = None, early_stop: Optional[bool] = None) -> "pd.DataFrame":
+    """Score `questions` ({category: [question, ...]}) and return the results DataFrame.
+
+    The arguments and defaults are those of evaluate_application, which documents
+    them. Early stopping needs `evaluator.assessment_thresholds`.
+    """
+    if max_concurrency is None:
+        max_concurrency = DEFAULT_MAX_CONCURRENCY
+    if scoring_mode is None:
+        scoring_mode = DEFAULT_SCORING_MODE
+    if early_stop is None:
+        early_stop = EARLY_STOP_ENABLED
+    early_stop = early_stop and evaluator.assessment_thresholds is not None
+    backend = resolve_backend(backend)
+    parallel = max_concurrency > 1 or scoring_mode != "question" or early_stop
+    if interactive and parallel:
+        print("ℹ️  Interaktiv modus: spørsmålene vurderes ett om gangen, så du kan velge å fortsette etter en feil.")
+    # Everything this evaluation uses is counted on its own meter, also with other evaluations running
+    with metered_calls() as usage:
+        if parallel and not interactive:
+            results_df = _evaluate_parallel(evaluator, application_text, questions, max_concurrency, scoring_mode, progress_callback, backend, event_callback, early_stop)
+        else:
+            results_df = _evaluate_sequential(evaluator, application_text, questions, progress_callback, interactive, backend, event_callback)
+    print_cache_stats(usage)
+    print_routing_stats(usage)
+    print_retrieval_stats(usage)
+    print_usage_stats(usage)
+    return results_df
+
+def _complete(evaluator: Evaluator, messages: List[Dict[str, str]], max_tokens: int, response_format: Optional[dict] = None, backend: Optional[str] = None) -> str:
+    """One chat completion with the evaluator's model settings; returns the reply text."""
+    return complete(evaluator.model, messages, evaluator.temperature, max_tokens, response_format, backend)
+
+@traced("score", "category", "question")
+def score_question(evaluator: Evaluator, question: str, application_text: str, category: str = "", backend: Optional[str] = None, document: Optional[str] = None) -> Tuple[int, str, str]:
+    """Score, comment and the model that answered for one question (cached on disk).
+
+    `document` is the text_fingerprint of `application_text`; evaluations compute it once and pass it.
+    """
+    max_score = evaluator.max_score
+    model = backend_model(evaluator.model, backend)
+    document = document or text_fingerprint(application_text)
+    label = routed_model(category, evaluator.model, backend)
+    cache_key = score_cache_key(document, question, category, label, evaluator.temperature, f"{evaluator.prompt_version}/{context_signature(application_text)}")
+    cached = lookup_answer(cache_key)
+    if cached is not None and not EVAL_ROUTING_SHADOW:  # shadow mode logs every question
+        score, comment, answered_by = cached
+        return score, comment, answered_by or label  # entries cached before the model was stored
+
+    context, _ = prepare_context(application_text, f"{category} {question}")
+    messages = scoring_messages(evaluator.system_prompt, context, evaluator.question_task.format(question=question, category=category), text_label=evaluator.text_label)
+
+    try:
+        if uses_routing(category, backend):
+            # Cheap model first, large model when the category's routing policy says so
+            score, comment, model = score_with_routing(category, messages, max_score, evaluator.model, evaluator.temperature, backend, {"document": document, "question": question})
+        else:
+            response_text = _complete(evaluator, messages, 200, score_response_format(max_score), backend)
+            score, comment = parse_score_with_repair(response_text, max_score, model, lambda repair, max_tokens, response_format: _complete(evaluator, repair, max_tokens, response_format, backend))
+        store_score(cache_key, score, comment, model)
+        return score, comment, model
+
+    except Exception as e:
+        raise scoring_error(e)
+
+@traced("score")
+def score_batch(evaluator: Evaluator, items: List[Tuple[str, str]], application_text: str, backend: Optional[str] = None) -> str:
+    """Ask for scores on several (category, question) pairs in one call and return the raw JSON answer."""
+    context, _ = prepare_context(application_text, " ".join(f"{category} {question}" for category, question in items))
+    messages = scoring_messages(evaluator.system_prompt, context, evaluator.batch_task.format(questions=format_batch_questions(items)), text_label=evaluator.text_label)
+
+    try:
+        return _complete(evaluator, messages, batch_max_tokens(len(items)), batch_response_format(evaluator.max_score), backend)
+
+    except Exception as e:
+        raise scoring_error(e)
+
+def scoring_error(error: Exception) -> ScoringError:
+    """The ScoringError a failed scoring call is reported as, with its `kind` (auth, rate_limit, timeout, ...)."""
+    from openai import OpenAIError, APITimeoutError, APIConnectionError, AuthenticationError, BadRequestError, RateLimitError
+    if isinstance(error, ScoringError):
+        return error
+    if isinstance(error, AuthenticationError):
+        return ScoringError(f"❌ FEIL: OpenAI API-nøkkel er ugyldig. Sjekk at OPENAI_API_KEY er riktig satt i .env filen. Detaljer: {error}", kind="auth")
+    if isinstance(error, RateLimitError):
+        return ScoringError(f"❌ FEIL: OpenAI API rate limit nådd. Vent litt og prøv igjen. Detaljer: {error}", kind="rate_limit")
+    if isinstance(error, APITimeoutError):
+        return ScoringError(f"❌ FEIL: OpenAI API svarte ikke i tide. Detaljer: {error}", kind="timeout")
+    if isinstance(error, APIConnectionError):
+        return ScoringError(f"❌ FEIL: Kunne ikke koble til OpenAI API. Sjekk internettforbindelsen din. Detaljer: {error}", kind="connection")
+    if isinstance(error, BadRequestError):
+        return ScoringError(f"❌ FEIL: Ugyldig forespørsel til OpenAI API: {error}. Sjekk at input ikke er for lang eller inneholder ugyldige parametre.", kind="bad_request")
+    if isinstance(error, ValueError):
+        return ScoringError(f"❌ FEIL: Problem med å tolke OpenAI-respons: {error}", kind="parse")
+    if isinstance(error, OpenAIError):
+        return ScoringError(f"❌ FEIL: OpenAI-feil: {type(error).__name__}: {error}", kind="openai")
+    import traceback
+    tb = "".join(traceback.format_exception(type(error), error, error.__traceback__))
+    return ScoringError(f"❌ FEIL: Uventet feil ved OpenAI API-kall: {type(error).__name__}: {error}\nTraceback:\n{tb}", kind="unknown")
+
+def _evaluate_sequential(evaluator: Evaluator, application_text: str, questions: Dict[str, List[str]], progress_callback: Optional[ProgressCallback], interactive: bool, backend: str, event_callback: Optional[EventCallback]) -> "pd.DataFrame":
+    """Score the questions one at a time in rubric order."""
+    results = []
+    errors = []
+    stats = QuestionStats(event_callback, evaluator.rubric)
+    prechecked = _precheck(rubric_jobs(questions), application_text, evaluator.max_score)
+    document = text_fingerprint(application_text)
+    answered_by = []
+    # Calculate total number of questions for progress tracking
+    total_questions = sum(len(category_questions) for category_questions in questions.values())
+    current_question = 0
+
+    for category, category_questions in questions.items():
+        print(f"\n📋 Evaluerer kategori: {evaluator.category_heading(category)}")
+        for question in category_questions:
+            current_question += 1
+            print(f"  ⏳ Spørsmål {current_question}/{total_questions}: {question[:50]}...")
+
+            emit_event(stats, "started", current_question - 1, category, question, current_question - 1, total_questions)
+            start = time.perf_counter()
+            try:
+                with metered_calls() as meter, question_deadline():
+                    if current_question - 1 in prechecked:
+                        (score, comment), model = prechecked[current_question - 1], None
+                    else:
+                        score, comment, model = score_question(evaluator, question, application_text, category, backend, document)
+                print(f"  ✅ Score: {score}/{evaluator.max_score}")
+                emit_outcome(stats, (score, comment), current_question - 1, category, question, current_question, total_questions, evaluator.max_score, time.perf_counter() - start, meter)
+                results.append(_result_row(evaluator, category, question, score, comment))
+                answered_by.append(model)
+            except Exception as e:
+                print(f"  ❌ Feil ved evaluering av spørsmål: {e}")
+                emit_outcome(stats, e, current_question - 1, category, question, current_question, total_questions, evaluator.max_score, time.perf_counter() - start, meter)
+                # Add a fallback entry with error information
+                results.append(_result_row(evaluator, category, question, 0, f"Feil ved evaluering: {str(e)[:100]}..."))
+                answered_by.append(None)
+                errors.append(error_record(category, question, e))
+                if interactive:
+                    # Ask user if they want to continue
+                    print(f"  ⚠️  Vil du fortsette med neste spørsmål? (Trykk Enter for å fortsette, Ctrl+C for å avbryte)")
+                    try:
+                        input()
+                    except KeyboardInterrupt:
+                        print("\n🛑 Evaluering avbrutt av bruker.")
+                        raise
+
+            if progress_callback is not None:
+                progress_callback(current_question, total_questions)
+
+    print(f"\n🎉 Evaluering fullført! {total_questions} spørsmål behandlet.")
+    return _results_dataframe(results, errors, stats, answered_by, _run_info(evaluator, backend, "question", answered_by))
+
+def _evaluate_parallel(evaluator: Evaluator, application_text: str, questions: Dict[str, List[str]], max_concurrency: int, scoring_mode: str, progress_callback: Optional[ProgressCallback], backend: str, event_callback: Optional[EventCallback], early_stop: bool) -> "pd.DataFrame":
+    """Score every question concurrently or in batches and return rows in rubric order."""
+    stats = QuestionStats(event_callback, evaluator.rubric)
+    jobs = rubric_jobs(questions)
+    prechecked = _precheck(jobs, application_text, evaluator.max_score)
+    document = text_fingerprint(application_text)
+    models: Dict[Tuple[str, str], str] = {}  # the model behind each answer from score_question
+
+    def score_one(category: str, question: str) -> Tuple[int, str]:
+        score, comment, models[category, question] = score_question(evaluator, question, application_text, category, backend, document)
+        return score, comment
+
+    if scoring_mode == "question":
+        stop_when = (lambda outcomes: outcome_decided(jobs, outcomes, evaluator.max_score, evaluator.assessment_thresholds)) if early_stop else None
+        outcomes = score_questions_concurrently(jobs, score_one, max_in_flight=max_concurrency, max_score=evaluator.max_score, progress_callback=progress_callback, event_callback=stats,
+                                                answered=prechecked, order=priority_order(jobs) if early_stop else None, stop_when=stop_when)
+        batch_model = None
+    else:
+        batch_model = backend_model(evaluator.model, backend)
+        prompt_version = f"{evaluator.batch_prompt_version}/{context_signature(application_text)}"
+        outcomes = score_questions_batched(
+            jobs,
+            lambda items: score_batch(evaluator, items, application_text, backend),
+            score_one,
+            scoring_mode=scoring_mode,
+            max_score=evaluator.max_score,
+            max_in_flight=max_concurrency,
+            cache_key_fn=lambda category, question: score_cache_key(document, question, category, batch_model, evaluator.temperature, prompt_version),
+            progress_callback=progress_callback,
+            event_callback=stats,
+            answered=prechecked,
+        )
+
+    results = []
+    errors = []
+    answered_by = []
+    skipped = []
+    for index, ((category, question), outcome) in enumerate(zip(jobs, outcomes)):
+        model = None
+        if outcome is None:
+            score, comment = 0, EARLY_STOP_COMMENT
+        elif isinstance(outcome, Exception):
+            score, comment = 0, f"Feil ved evaluering: {str(outcome)[:100]}..."
+            errors.append(error_record(category, question, outcome))
+        else:
+            score, comment = outcome
+            if index not in prechecked:
+                # Questions a batch call could not answer were scored one by one (see batch_scoring)
+                model = models.get((category, question), batch_model)
+        results.append(_result_row(evaluator, category, question, score, comment))
+        answered_by.append(model)
+        skipped.append(outcome is None)
+
+    print(f"\n🎉 Evaluering fullført! {len(jobs)} spørsmål behandlet.")
+    return _results_dataframe(results, errors, stats, answered_by, _run_info(evaluator, backend, scoring_mode, answered_by), skipped)
+
+def _precheck(jobs: List[Tuple[str, str]], application_text: str, max_score: int) -> Dict[int, Tuple[int, str]]:
+    """Answers adaptive_scoring can give from the text alone, keyed by job index (none if disabled)."""
+    if not PRECHECK_ENABLED:
+        return {}
+    prechecked = precheck_answers(jobs, application_text, max_score)
+    if prechecked:
+        print(f"\n🔎 Forhåndssjekk: {len(prechecked)} av {len(jobs)} spørsmål avgjort uten AI-kall")
+    return prechecked
+
+def _result_row(evaluator: Evaluator, category: str, question: str, score: int, comment: str) -> dict:
+    return {"Kategori": category, **evaluator.category_columns(category), "Spørsmål": question, "Score": score, "Kommentar": comment}
+
+def _run_info(evaluator: Evaluator, backend: str, scoring_mode: str, answered_by: List[Optional[str]]) -> dict:
+    """Model, backend and prompt version behind an evaluation (stored by results_store).
+
+    "model" is the one model that answered, or each model with its count when routing used several.
+    """
+    counts = Counter(model for model in answered_by if model)
+    if len(counts) > 1:
+        model = ", ".join(f"{name} ({count})" for name, count in counts.most_common())
+    else:
+        model = next(iter(counts), backend_model(evaluator.model, backend))
+    return {
+        "model": model,
+        "backend": backend,
+        "scoring_mode": scoring_mode,
+        "prompt_version": evaluator.prompt_version if scoring_mode == "question" else evaluator.batch_prompt_version,
+        "max_score": evaluator.max_score,
+    }
+
+def _results_dataframe(results: List[dict], errors: List[dict], stats: QuestionStats, answered_by: List[Optional[str]], run_info: dict, skipped: Optional[List[bool]] = None) -> "pd.DataFrame":
+    """Build the results DataFrame and attach error records, per-question stats and run info.
+
+    `attrs["question_stats"]` has seconds and tokens per row (see scoring_engine.QuestionStats),
+    `attrs["answered_by"]` the model behind each row (None when no model answered it: pre-checked,
+    skipped or failed), `attrs["skipped"]` whether early stopping left the row unscored (its
+    score 0 is a placeholder, see report_writer.counted_scores) and `attrs["run"]` the model
+    and prompt version, for results_store.
+    """
+    import pandas as pd
+    if errors:
+        print(f"⚠️  {len(errors)} spørsmål kunne ikke vurderes og har fått score 0.")
+    results_df = pd.DataFrame(results)
+    results_df.attrs["errors"] = errors
+    results_df.attrs["question_stats"] = stats.columns(len(results))
+    results_df.attrs["answered_by"] = answered_by
+    results_df.attrs["skipped"] = skipped or [False] * len(results)
+    results_df.attrs["run"] = run_info
+    return results_df
@@ -0,0 +1,224 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# The evaluation criteria as plain data, so the web app, the batch CLI and the
+# benchmarks can list and pick rubrics without loading the evaluators' dependencies
+
+# Evaluation questions organized by category
+EVALUATION_QUESTIONS = {
+    "Problemløsning og marked": [
+        "Hvor godt er problemet/behovet/dagens situasjon beskrevet, inkludert dagens alternative løsninger?",
+        "Hvor godt er løsningsbeskrivelsen beskrevet og er den tydelig avgrenset?",
+        "Hvor godt er FoU-utfordringer knyttet til løsningen beskrevet?",
+        "Hvor godt er det forklart hvorfor FoU-utfordringer ikke er løst tidligere?",
+        "Hvor godt er dagens konkurrenter og konkurransebilde beskrevet?",
+        "Hvor godt beskrevet er forskjellene og forbedringene fra dagens alternativer?",
+        "Hvor tydelig er de unike aspektene ved løsningen beskrevet (det må være vesentlige forskjeller fra dagens løsninger)?"
+    ],
+    "Kapning": [
+        "Hvor godt er den kortsiktige effekten av prosjektresultatet for selskapet beskrevet? (kunder, inntekt, arbeidsplasser o.l.)",
+        "Hvor godt er den langsiktige effekten av prosjektresultatet for selskapet beskrevet? (kunder, inntekt, arbeidsplasser o.l.)",
+        "Hvor tydelig er det at prosjektet bygger opp under selskapets langsiktige ambisjon og strategi?",
+        "Hvor godt er verdiskapningen for samfunnet beskrevet?",
+        "Hvor godt er miljøgevinsten beskrevet?",
+        "Hvor godt er gevinster som bærekraft, likestilling og mangfold beskrevet?",
+        "Hvor toverig fremstår markedsbeskrivelsen, i både nasjonal og internasjonal perspektiv?",
+        "Hvor tydelig og realistisk er forretningsmodellen beskrevet?",
+        "Hvor godt er kundeverdien beskrevet?",
+        "Hvor godt er interaksjon med kunder beskrevet som en del av prosjektet?"
+    ],
+    "Gjennomføringsevne": [
+        "Hvor godt er selskapets nåværende situasjon, målsetting og strategi beskrevet?",
+        "Hvor tydelig og avgrenset er prosjektet beskrevet?",
+        "Hvor godt er aktivitetene/arbeidspakkene i prosjektet beskrevet?",
+        "Hvor godt er roller og ansvar beskrevet?",
+        "For FoU-prosjekter: hvor godt er håndteringen av disse beskrevet?",
+        "Hvor godt er teamets og selskapets erfaring og kompetanse beskrevet?",
+        "Hvis dere har partnere eller kunder som er en del av prosjektet, hvor godt beskrevet er disse inkludert bidrag under og etter prosjektet?",
+        "Hvor gode forutsetninger har selskapet for å kunne realisere 'go-to-market'-planer? f.eks. etablering av kanaler til markedet?",
+        "Hvis dere har leverandører, hvor godt er disse og deres fortinn beskrevet?",
+        "Hvor godt er finansieringsplanen under og etter prosjektet beskrevet i tekst og vedlegg? Er dere tydelig likviditet i perioden?",
+        "Hvor godt kommer det frem at selskapet har spesifikke fordeler som gjør selskapet spesielt egnet til å forvalte investeringen?"
+    ],
+    "Statsstøtte-effekt av støtte fra Innovasjon Norge": [
+        "Hvor godt kommer det frem at dere er avhengig av støtte/lån for å realisere/akselerere prosjektet?",
+        "Hvor godt er teknisk risiko beskrevet i søknaden?",
+        "Hvor godt er markeds-/kommersiell risiko beskrevet i søknaden?",
+        "Hvor godt er klimarisiko (negativ effekt av prosjekt-antagelser og klimaendringer) beskrevet?",
+        "Totalt sett, er risikoen i prosjektet stor nok til at det aktuelt for en bank eller investor å investere i prosjektet uten statsstøtte?",
+        "Hvor godt beskrevet er scenarioene med og uten støtte fra Innovasjon Norge for selskapet?",
+        "Hvor godt er et potensielle investorer beskrevet, helst navngitt, gitt støtte fra Innovasjon Norge? Beskrevet i tekst eller vedlegg?",
+        "Hvor godt kommer det frem at dere har kunder som vil kjøpe, gitt gjennomføring av prosjekt (LOI eller tilsvarende)?",
+        "Hvor godt er markedssituasjonen beskrevet, og hvordan støtte fra IN kan posisjonere dere?"
+    ],
+    "Gjennomføring og detaljer": [
+        "Svarer søknaden på alle krav som etterspørres i IN sin søknadsportal?",
+        "Er språket korrekturlest, både med tanke på tegnsetting og rettskrivning? (Nei = 0, Ja =3)",
+        "Hvor overbevisende/tillitsvekkende er språket i søknaden?",
+        "I hvor stor grad er språket kort og konsist?",
+        "I hvor stor grad er 'buzzwords' unngått?",
+        "I hvor stor grad har det blitt benyttet kildehenvisninger for dataunderlag og argumenter?",
+        "Er timesatser for de forskjellige personalkategoriene innenfor grensene til IN (Nei = 0, Ja =3)",
+        "Er maksimal støttegrad for de forskjellige aktivitetene tilpasset deres bedrift? (Nei = 0, Ja =3)",
+        "Hvis det søkes om lån, hvor godt er sikkerheten for lånet beskrevet og dokumentert?",
+        "Er alle tall dobbeltsjekket opp mot prosjektoppsettet deres?"
+    ],
+    "Krav fra IN": [
+        "Krav fra IN: Siste års regnskap",
+        "Krav fra IN: Perioderegnskab, ikke eldre enn 3 mnd",
+        "Krav fra IN: Driftsbudsjett for bedriftens virksomhet de neste 3 årene",
+        "Krav fra IN: Eventuelle budsjetter/lønnsomhetsberegninger",
+        "Selskapsrepresentasjon",
+        "Prosjektpresentasjon",
+        "Organisasjonskart inkludert CV på nøkkelpersoner i prosjektet",
+        "Kundeavtaler, Letter of Intent (LOI), eller annet som understreker markedsbehovet",
+        "Termsheet, Intensjonsbrev eller lignende som dokumenterer at dere har investor som vil investere gitt støtte fra IN.",
+        "For vedlegg utarbeidet i Excel-format, er disse sendt i originalformatet?"
+    ]
+}
+
+# Spørsmål for oppstart 1 (fra bildet)
+EVALUATION_QUESTIONS_OPPSTART_1 = {
+    "Problemløsning og marked": [
+        "Hvor godt er problemet/behovet/dagens situasjon beskrevet, inkludert dagens alternative løsninger?",
+        "Hvor godt er løsningsbeskrivelsen beskrevet og er den tydelig avgrenset?",
+        "Hvor godt er dagens konkurrenter og konkurransebilde beskrevet?",
+        "Hvor godt er forskjellene og forbedringene fra dagens alternativer beskrevet?",
+        "Hvor tydelig er de unike aspektene ved løsningen beskrevet (det må være VESENTLIGE forskjeller fra dagens løsninger)?"
+    ],
+    "Verdiskapning": [
+        "Hvor godt er det kommersielle potensialet for selskapet beskrevet? (kunder, inntekt, arbeidsplasser o.l.)",
+        "Hvor godt er verdiskapningen for samfunnet beskrevet?",
+        "Hvor er gevinster som miljø, bærekraft, likestilling og mangfold beskrevet?",
+        "Hvor tydelig og realistisk er forretningsmodellen beskrevet?",
+        "Hvor godt er kundeverdien beskrevet?",
+        "Hvor godt er kundegruppe og markedet beskrevet?"
+    ],
+    "Gjennomføringsevne": [
+        "Hvor tydelig og avgrenset er prosjektet beskrevet?",
+        "Hvor godt er målsettingen for prosjektet tilpasset hensikten med ordningen -> validering av problem, løsning og marked?",
+        "Hvor godt er suksesskriterier for å kunne gå videre med forretningsideen etter endt prosjekt beskrevet?",
+        "Hvor godt er teamets og selskapets relevante erfaring og relevant kompetanse beskrevet?",
+        "Hvor er investorer, inkubatorer, rådgivere eller andre støttespillere beskrevet?",
+        "Hvor godt er kundegruppe og markedet beskrevet?"
+    ],
+    "Utløsende effekt av støtte fra Innovasjon Norge": [
+        "Hvor godt kommer det frem at dere er avhengig av tilskudd for å realisere prosjektet?",
+        "Hvor godt er risikoen prosjektet skal redusere beskrevet i søknaden?",
+        "Hvis dere har investorer som ønsker å investere i dere, i etterkant av prosjektet, er dette beskrevet?"
+    ],
+    "Søknadsutforming og detaljer": [
+        "Svarer søknaden på alle krav som etterspørres i IN sin søknadsportal?",
+        "Er språket korrekturlest, både med tanke på tegnsetting og rettskrivning? (Nei = 0, Ja =3)",
+        "Hvor overbevisende/tillitsvekkende er språket i søknaden?",
+        "I hvor stor grad er språket kort og konsist?",
+        "I hvor stor grad er 'buzzwords' unngått?",
+        "I hvor stor grad har det blitt benyttet kildehenvisninger for dataunderlag og argumenter?"
+    ],
+    "Vedlegg (Nei = 0, Ja = 3)": [
+        "Finansiell modell eller likviditetsbudsjett for selskapet",
+        "Selskaspresentasjon / Pitch-deck",
+        "Prosjektpresentasjon",
+        "Forretningsmodell (hvis ikke en del av selskapspresentasjonen), som 'lean business canvas' eller tilsvarende",
+        "Konkurrentanalyse (hvis ikke en del av prosjektpresentasjon)",
+        "Siste til løsningsforslag",
+        "For vedlegg utarbeidet i Excel-format, er disse sendt i originalformatet?"
+    ]
+}
+
+# NIC Cluster Program evaluation criteria with weights
+NIC_EVALUATION_CRITERIA = {
+    "Bakgrunn for klyngen": {
+        "weight": 10,
+        "questions": [
+            "Beskriver klyngens opprinnelse og hvorfor den ble etablert",
+            "Beskriver klyngens målgruppe(r), hvilke utfordringer den adresserer og hvorfor medlemmene ikke klarer å løse disse utfordringene individuelt",
+            "Beskriver klyngens egnethet til å løse akkurat disse utfordringene"
+        ]
+    },
+    "Klyngens visjon, misjon og hovedmål": {
+        "weight": 15,
+        "questions": [
+            "Beskriver klyngens visjon (hva vil de gjerne bli)",
+            "Beskriver klyngens misjon (hvorfor man er til)",
+            "Beskriver klyngens SMARTE mål som er målbare og realistiske",
+            "Beskriver klyngens SMARTE mål knyttet opp mot klyngeprogrammets mål og ESG",
+            "Hvis relevant: Beskriver klyngens bidrag til oppfyllelse av FNs bærekraftsmål"
+        ]
+    },
+    "Fokusområder, aktiviteter, tjenester og gjennomføringsplan": {
+        "weight": 25,
+        "questions": [
+            "Beskriver klyngens fokusområder",
+            "Beskriver hva som er forventet resultatmål (konkrete og kvantifiserbare)",
+            "Beskriver hvilke aktiviteter klyngen skal arbeide med og hvordan disse underbygger resultatmålene",
+            "Beskriver hvordan klyngens aktiviteter er relevante for klyngens medlemmer",
+            "Beskriver en gjennomføringsplan som inkluderer hvem som skal gjøre hva og hvordan"
+        ]
+    },
+    "Fremtidige effekter av klyngens arbeid": {
+        "weight": 20,
+        "questions": [
+            "Beskriver fremtidige effekter av klyngens arbeid (både kort og lang sikt)",
+            "Beskriver en kobling opp mot klyngeprogrammets mål",
+            "Beskriver fremtidige effekter mot ESG, lønnsomhet og medlemsbedriftenes konkurransekraft",
+            "Hvis relevant: Beskriver et potensial i klyngens arbeid for medlemmene (eks økte markedsandeler, gevinster og/eller omstilling)"
+        ]
+    },
+    "Klyngens ressursgrunnlag": {
+        "weight": 20,
+        "questions": [
+            "Beskriver klyngens medlemsmasse og sammensetning",
+            "Beskriver klyngemedlemmenes motivasjon og ambisjon for medlemskap i klyngen",
+            "Beskriver klyngens interne ressursgrunnlag: klyngeledelse, styre og kompetanse",
+            "Beskriver klyngens rolle i forhold til klyngens medlemmer og hvordan man organiserer arbeidet",
+            "Beskriver sentrale aktiviteter i klyngen og medlemmenes forpliktelser til disse"
+        ]
+    },
+    "Klyngens rolle": {
+        "weight": 10,
+        "questions": [
+            "Beskriver hvorfor klyngen trengs i sitt marked/område",
+            "Beskriver hvilken posisjon klyngen har i dag, og hvilken posisjon den skal ta nasjonalt evt internasjonalt",
+            "Beskriver hvordan klyngens arbeid kan bidra til realisering av regionale og nasjonale utviklingsplaner",
+            "Beskriver klyngens samarbeidspartnere utenfor klyngen (eks andre klynger eller relevante aktører/miljø)",
+            "Beskriver klyngens prosessmetodikk for å identifisere og etablere prosjekter/tjenester for klyngens medlemmer"
+        ]
+    }
+}
+
+@dataclass(frozen=True)
+class Rubric:
+    """One evaluation regime: its questions per category and the score scale."""
+    key: str  # command-line name, e.g. "oppstart2"
+    label: str  # oppstartstype shown in reports and the web form, e.g. "Oppstart 2"
+    questions: Dict[str, List[str]]  # category -> questions, in report order
+    max_score: int
+    weights: Optional[Dict[str, int]] = None  # category -> weight in percent (NIC only)
+
+    @property
+    def is_nic(self) -> bool:
+        return self.label == "NIC"
+
+RUBRICS: Dict[str, Rubric] = {rubric.key: rubric for rubric in (
+    Rubric("oppstart1", "Oppstart 1", EVALUATION_QUESTIONS_OPPSTART_1, 3),
+    Rubric("oppstart2", "Oppstart 2", EVALUATION_QUESTIONS, 3),
+    Rubric("oppstart3", "Oppstart 3", EVALUATION_QUESTIONS, 3),
+    Rubric("nic", "NIC", {category: criteria["questions"] for category, criteria in NIC_EVALUATION_CRITERIA.items()}, 4,
+           {category: criteria["weight"] for category, criteria in NIC_EVALUATION_CRITERIA.items()}),
+)}
+
+def rubric_key(name: str) -> str:
+    """Command-line name of the rubric with key or label `name`, or "egendefinert" (for metric labels)."""
+    return next((rubric.key for rubric in RUBRICS.values() if name in (rubric.key, rubric.label)), "egendefinert")
+
+def rubric_name(questions: Dict[str, List[str]]) -> str:
+    """Command-line names of the rubrics that ask exactly `questions` ("oppstart2/oppstart3"), or "egendefinert"."""
+    return "/".join(rubric.key for rubric in RUBRICS.values() if rubric.questions is questions) or "egendefinert"
+
+def get_rubric(name: str) -> Rubric:
+    """The rubric with command-line name or label `name` ("oppstart2" or "Oppstart 2")."""
+    for rubric in RUBRICS.values():
+        if name in (rubric.key, rubric.label):
+            return rubric
+    raise ValueError(f"❌ FEIL: Ukjent evalueringstype '{name}'. Gyldige valg: {', '.join(RUBRICS)}")
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+import threading
+from dotenv import load_dotenv
+from typing import Mapping, Optional, Tuple
+
+from disk_cache import DiskLRUCache
+from llm_usage import count_usage
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Persistent cache of LLM scores so re-running an unchanged PDF costs no API calls
+SCORE_CACHE_PATH = os.getenv("SCORE_CACHE_PATH", os.path.join(".cache", "scores.sqlite3"))
+SCORE_CACHE_MAX_MB = float(os.getenv("SCORE_CACHE_MAX_MB", "64"))
+SCORE_CACHE_ENABLED = os.getenv("SCORE_CACHE_DISABLED", "").lower() not in {"1", "true", "ja"}
+
+_cache: Optional[DiskLRUCache] = None
+_cache_lock = threading.Lock()
+
+def get_score_cache() -> Optional[DiskLRUCache]:
+    """Open the shared score cache on first use, or return None when caching is disabled."""
+    global _cache
+    if not SCORE_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskLRUCache(SCORE_CACHE_PATH, int(SCORE_CACHE_MAX_MB * 1024 * 1024))
+        return _cache
+
+def text_fingerprint(application_text: str) -> str:
+    """SHA-256 of the extracted application text."""
+    return hashlib.sha256(application_text.encode("utf-8")).hexdigest()
+
+def score_cache_key(document: str, question: str, category: str, model: str, temperature: float, prompt_version: str) -> str:
+    """Content-addressed key for one scored question; `document` is the text_fingerprint of the application."""
+    fields = [document, question, category, model, temperature, prompt_version]
+    return hashlib.sha256(json.dumps(fields, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def lookup_answer(key: str) -> Optional[Tuple[int, str, Optional[str]]]:
+    """Return the cached (score, comment, model) for `key`, if any; model is None for entries stored without it."""
+    cache = get_score_cache()
+    if cache is None:
+        return None
+    value = cache.get(key)
+    count_usage(cache_hits=int(value is not None), cache_misses=int(value is None))
+    if value is None:
+        return None
+    score, comment, *model = json.loads(value)
+    return int(score), comment, model[0] if model else None
+
+def lookup_score(key: str) -> Optional[Tuple[int, str]]:
+    """Return the cached (score, comment) for `key`, if any."""
+    answer = lookup_answer(key)
+    return None if answer is None else answer[:2]
+
+def store_score(key: str, score: int, comment: str, model: Optional[str] = None) -> None:
+    """Save a successfully parsed score, with the model that gave it when known; errors are never cached."""
+    cache = get_score_cache()
+    if cache is not None:
+        value = [score, comment] if model is None else [score, comment, model]
+        cache.set(key, json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+def print_cache_stats(usage: Mapping[str, float]) -> None:
+    """Print an evaluation's score cache hits and misses, from its meter (see llm_usage.metered_calls)."""
+    cache = get_score_cache()
+    if cache is not None:
+        stats = cache.stats()
+        print(f"💾 Score-cache: {int(usage.get('cache_hits', 0))} treff, {int(usage.get('cache_misses', 0))} bom ({stats['entries']} lagrede svar)")
@@ -0,0 +1,168 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from dotenv import load_dotenv
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from error_policy import question_deadline
+from llm_usage import metered_calls
+from metrics import QUESTION_SECONDS
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Maximum number of questions scored at the same time (can be overridden in .env)
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("EVAL_MAX_CONCURRENCY", "8"))
+
+ScoreOutcome = Union[Tuple[int, str], Exception]
+ProgressCallback = Callable[[int, int], None]  # (questions done, total questions)
+EventCallback = Callable[[dict], None]  # one question event, see emit_event
+
+def emit_event(event_callback: Optional[EventCallback], event: str, index: int, category: str, question: str, done: int, total: int, **fields) -> None:
+    """Send a question event ("started", "finished", "failed" or "skipped") to `event_callback`, if any.
+
+    Every event has the question's position in the rubric (`index`), its category
+    and text, and `done`/`total` at that moment. "finished" adds `score`,
+    `max_score`, `comment` and `seconds`; "failed" adds `error` and `seconds`.
+    Both carry `prompt_tokens`/`completion_tokens` when the scorer metered them.
+    "skipped" means the question was never asked (see score_questions_concurrently's `stop_when`).
+    """
+    if event_callback is not None:
+        event_callback({"event": event, "index": index, "category": category, "question": question, "done": done, "total": total, **fields})
+
+def emit_outcome(event_callback: Optional[EventCallback], outcome: ScoreOutcome, index: int, category: str, question: str, done: int, total: int, max_score: int, seconds: float, tokens: Optional[Dict[str, int]] = None) -> None:
+    """Emit "finished" for a (score, comment) outcome or "failed" for an exception."""
+    usage = {} if tokens is None else {"prompt_tokens": tokens["prompt_tokens"], "completion_tokens": tokens["completion_tokens"]}
+    if isinstance(outcome, Exception):
+        emit_event(event_callback, "failed", index, category, question, done, total, error=str(outcome), seconds=round(seconds, 3), **usage)
+    else:
+        emit_event(event_callback, "finished", index, category, question, done, total,
+                   score=outcome[0], max_score=max_score, comment=outcome[1], seconds=round(seconds, 3), **usage)
+
+QUESTION_STAT_FIELDS = ("seconds", "prompt_tokens", "completion_tokens")
+
+class QuestionStats:
+    """Event callback that remembers each question's seconds and tokens and forwards every event.
+
+    The evaluators put it in front of the caller's `event_callback` so the
+    results can carry per-question latency and token use (see results_store).
+    Questions that used the model are also timed in the eval_question_seconds
+    metric, labelled with `rubric` and the category.
+    """
+
+    def __init__(self, event_callback: Optional[EventCallback] = None, rubric: str = ""):
+        self.event_callback = event_callback
+        self.rubric = rubric
+        self._stats: Dict[int, dict] = {}
+
+    def __call__(self, event: dict) -> None:
+        if event["event"] in ("finished", "failed"):
+            self._stats[event["index"]] = {name: event.get(name, 0) for name in QUESTION_STAT_FIELDS}
+            # Cached and pre-checked answers come without tokens
+            if event["event"] == "failed" or event.get("prompt_tokens") or event.get("completion_tokens"):
+                QUESTION_SECONDS.observe(event["seconds"], rubric=self.rubric, category=event["category"])
+        if self.event_callback is not None:
+            self.event_callback(event)
+
+    def columns(self, total: int) -> Dict[str, list]:
+        """One list per stat with a value for each of the `total` questions in rubric order (0 if unknown)."""
+        return {name: [self._stats.get(index, {}).get(name, 0) for index in range(total)] for name in QUESTION_STAT_FIELDS}
+
+def rubric_jobs(evaluation_questions: Dict[str, List[str]]) -> List[Tuple[str, str]]:
+    """Flatten a rubric into (category, question) pairs in rubric order."""
+    return [
+        (category, question)
+        for category, questions in evaluation_questions.items()
+        for question in questions
+    ]
+
+def score_questions_concurrently(
+    jobs: List[Tuple[str, str]],
+    score_fn: Callable[[str, str], Tuple[int, str]],
+    max_in_flight: int = DEFAULT_MAX_CONCURRENCY,
+    max_score: int = 3,
+    progress_callback: Optional[ProgressCallback] = None,
+    event_callback: Optional[EventCallback] = None,
+    answered: Optional[Dict[int, Tuple[int, str]]] = None,
+    order: Optional[List[int]] = None,
+    stop_when: Optional[Callable[[List[Optional[ScoreOutcome]]], bool]] = None,
+) -> List[Optional[ScoreOutcome]]:
+    """Score all (category, question) jobs with at most `max_in_flight` calls running at once.
+
+    Returns one outcome per job in the same order as `jobs`: either the
+    (score, comment) tuple from `score_fn` or the exception it raised.
+    `progress_callback(done, total)` is called after every finished question, and
+    `event_callback` gets a started and a finished/failed event per question.
+    `answered` holds outcomes already known by job index (they are reported, not
+    asked), and the rest are asked in `order` (job indexes; default job order).
+    `stop_when(outcomes)` is checked as answers come in; once it returns True the
+    questions not yet started are dropped, get a "skipped" event and stay None.
+    """
+    total = len(jobs)
+    outcomes: List[Optional[ScoreOutcome]] = [None] * total
+    if total == 0:
+        return outcomes
+
+    answered = answered or {}
+    pending = [index for index in (range(total) if order is None else order) if index not in answered]
+    done = 0
+    for index, outcome in sorted(answered.items()):
+        outcomes[index] = outcome
+        done += 1
+        emit_outcome(event_callback, outcome, index, *jobs[index], done, total, max_score, 0.0)
+    if answered and progress_callback is not None:
+        progress_callback(done, total)
+    if pending and stop_when is not None and stop_when(outcomes):
+        print(f"  🛑 Utfallet kan ikke lenger endres – hopper over {len(pending)} spørsmål")
+        pending = []
+
+    workers = max(1, min(max_in_flight, len(pending)))
+    if pending:
+        print(f"\n⚡ Evaluerer {len(pending)} spørsmål med opptil {workers} samtidige kall...")
+
+    started_at: Dict[int, float] = {}
+    tokens: Dict[int, Dict[str, int]] = {}
+    stopped = not pending and stop_when is not None
+
+    def run(index: int, category: str, question: str) -> Tuple[int, str]:
+        started_at[index] = time.perf_counter()
+        emit_event(event_callback, "started", index, category, question, done, total)
+        with metered_calls() as meter, question_deadline():
+            tokens[index] = meter
+            return score_fn(category, question)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scoring") as executor:
+        # The pool starts queued work in submission order, so this is the priority order;
+        # each question runs in a copy of this context so it records into the current trace
+        futures = {executor.submit(copy_context().run, run, index, *jobs[index]): index for index in pending}
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            index = futures[future]
+            category, question = jobs[index]
+            done += 1
+            try:
+                outcomes[index] = future.result()
+                print(f"  ✅ [{done}/{total}] Score: {outcomes[index][0]}/{max_score} – {category}: {question[:50]}...")
+            except Exception as e:
+                outcomes[index] = e
+                print(f"  ❌ [{done}/{total}] Feil ved evaluering av spørsmål ({category}: {question[:50]}...): {e}")
+            emit_outcome(event_callback, outcomes[index], index, category, question, done, total, max_score,
+                         time.perf_counter() - started_at.get(index, time.perf_counter()), tokens.get(index))
+            if progress_callback is not None:
+                progress_callback(done, total)
+            if not stopped and stop_when is not None and stop_when(outcomes):
+                stopped = True
+                cancelled = sum(future.cancel() for future in futures)
+                if cancelled:
+                    print(f"  🛑 Utfallet kan ikke lenger endres – hopper over {cancelled} spørsmål")
+
+    if stopped:
+        for index in range(total):
+            if outcomes[index] is None:
+                done += 1
+                emit_event(event_callback, "skipped", index, *jobs[index], done, total)
+        if progress_callback is not None:
+            progress_callback(done, total)
+    return outcomes
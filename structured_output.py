@@ -0,0 +1,138 @@
+import json
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from llm_usage import record_parse_result
+from tracing import traced
+
+# complete(messages, max_tokens, response_format) -> reply text; supplied by each evaluator
+CompleteFn = Callable[[List[Dict[str, str]], int, Optional[dict]], str]
+
+REPAIR_MAX_TOKENS = 200
+
+# Self-reported confidence asked for by routing: 1 (guess) to 5 (certain)
+CONFIDENCE_LEVELS = list(range(1, 6))
+
+def score_response_format(max_score: int, confidence: bool = False) -> dict:
+    """JSON schema for one answer: {"score": 0..max_score, "kommentar": "..."}, plus "sikkerhet" 1-5 with `confidence`."""
+    properties = {
+        "score": {"type": "integer", "enum": list(range(max_score + 1))},
+        "kommentar": {"type": "string"},
+    }
+    if confidence:
+        properties["sikkerhet"] = {"type": "integer", "enum": CONFIDENCE_LEVELS}
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "score",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": properties,
+                "required": list(properties),
+                "additionalProperties": False,
+            },
+        },
+    }
+
+def batch_response_format(max_score: int) -> dict:
+    """JSON schema for batched answers: {"svar": [{"nr", "score", "kommentar"}, ...]}."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "batch",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "svar": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "nr": {"type": "integer"},
+                                "score": {"type": "integer", "enum": list(range(max_score + 1))},
+                                "kommentar": {"type": "string"},
+                            },
+                            "required": ["nr", "score", "kommentar"],
+                            "additionalProperties": False,
+                        },
+                    },
+                },
+                "required": ["svar"],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+def parse_score_json(text: str, max_score: int) -> Tuple[int, str]:
+    """Read {"score", "kommentar"} from a reply and check the score is within 0..max_score.
+
+    Tolerates code fences and text around the JSON object; raises ValueError otherwise.
+    """
+    match = re.search(r"\{.*\}", text or "", re.DOTALL)
+    if match is None:
+        raise ValueError(f"Fant ikke JSON i svaret: {text!r}")
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Ugyldig JSON i svaret ({e}): {text!r}")
+    if not isinstance(data, dict):
+        raise ValueError(f"Forventet et JSON-objekt: {text!r}")
+
+    score = data.get("score")
+    if isinstance(score, str) and score.strip().isdigit():
+        score = int(score.strip())
+    if isinstance(score, bool) or not isinstance(score, int):
+        raise ValueError(f"Score mangler eller er ikke et heltall: {score!r}")
+    if not 0 <= score <= max_score:
+        raise ValueError(f"Score må være mellom 0-{max_score}, fikk: {score}")
+    comment = data.get("kommentar")
+    if not isinstance(comment, str) or not comment.strip():
+        raise ValueError(f"Kommentar mangler: {text!r}")
+    return score, comment.strip()
+
+def parse_confidence(text: str) -> Optional[int]:
+    """The "sikkerhet" (1-5) of a reply, or None when it is missing or invalid."""
+    match = re.search(r"\{.*\}", text or "", re.DOTALL)
+    try:
+        data = json.loads(match.group(0)) if match else None
+    except json.JSONDecodeError:
+        return None
+    confidence = data.get("sikkerhet") if isinstance(data, dict) else None
+    if isinstance(confidence, str) and confidence.strip().isdigit():
+        confidence = int(confidence.strip())
+    if isinstance(confidence, bool) or confidence not in CONFIDENCE_LEVELS:
+        return None
+    return confidence
+
+def repair_messages(reply: str, max_score: int) -> List[Dict[str, str]]:
+    """A short request that only asks to reformat a reply; the application text is not sent again."""
+    return [
+        {"role": "system", "content": "Du gjør om vurderinger til gyldig JSON uten å endre innholdet."},
+        {"role": "user", "content": (
+            f"Gjør om svaret under til JSON med feltene \"score\" (heltall 0-{max_score}) og "
+            f"\"kommentar\" (kort tekst). Svar kun med JSON.\n\nSvar:\n{reply}"
+        )},
+    ]
+
+@traced("parse")
+def parse_score_with_repair(reply: str, max_score: int, model: str, complete: CompleteFn) -> Tuple[int, str]:
+    """Parse a structured score reply; on a malformed reply ask once for the format only.
+
+    Parse failures and repair outcomes are counted per model in llm_usage.
+    Raises ValueError when the repaired reply is still unusable.
+    """
+    try:
+        result = parse_score_json(reply, max_score)
+    except ValueError as first_error:
+        repaired_reply = complete(repair_messages(reply, max_score), REPAIR_MAX_TOKENS, score_response_format(max_score))
+        try:
+            result = parse_score_json(repaired_reply, max_score)
+        except ValueError:
+            record_parse_result(model, failed=True, repaired=False)
+            raise ValueError(f"{first_error} (også etter ny formatering)")
+        record_parse_result(model, failed=True, repaired=True)
+        return result
+    record_parse_result(model, failed=False, repaired=False)
+    return result
@@ -0,0 +1,11 @@
+import os
+import sys
+
+# The modules live at the top of the repository, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings are read at import time: keep tests off the network and out of the local caches
+os.environ.setdefault("EVAL_BACKEND", "fake")
+os.environ.setdefault("SCORE_CACHE_DISABLED", "1")
+os.environ.setdefault("TEXT_STORE_DISABLED", "1")
+os.environ.setdefault("RESULTS_STORE_DISABLED", "1")
@@ -0,0 +1,54 @@
+import pytest
+
+from adaptive_scoring import precheck_answers
+
+def jobs_for(*questions):
+    return [("Krav fra IN", question) for question in questions]
+
+ACCOUNTS = "Krav fra IN: Siste års regnskap"
+INTERIM = "Krav fra IN: Perioderegnskab, ikke eldre enn 3 mnd"
+OPERATING_BUDGET = "Krav fra IN: Driftsbudsjett for bedriftens virksomhet de neste 3 årene"
+BUDGETS = "Krav fra IN: Eventuelle budsjetter/lønnsomhetsberegninger"
+
+def test_listed_attachment_gives_full_score():
+    text = "Søknaden beskriver prosjektet.\nVedlegg 3: Årsregnskap 2023 med noter\n"
+    assert precheck_answers(jobs_for(ACCOUNTS), text, 3)[0][0] == 3
+
+@pytest.mark.parametrize("line", [
+    "Regnskap for 2023 er ikke vedlagt, det ettersendes",
+    "Vedlegg: årsregnskap 2023 mangler",
+    "Årsregnskapet vil bli vedlagt senere",
+])
+def test_missing_or_deferred_attachment_is_left_to_the_model(line):
+    # The subject is mentioned, so it is not 0 either
+    assert precheck_answers(jobs_for(ACCOUNTS), f"Om selskapet.\n{line}\n", 3) == {}
+
+def test_deferred_budget_and_interim_accounts_are_not_scored():
+    text = "Om prosjektet.\nBudsjett og perioderegnskap vil bli levert senere; de er ikke vedlagt\n"
+    assert precheck_answers(jobs_for(INTERIM, OPERATING_BUDGET, BUDGETS), text, 3) == {}
+
+def test_any_budget_is_not_an_operating_budget():
+    text = "Vedlegg 4: Budsjett for prosjektet\n"
+    answers = precheck_answers(jobs_for(OPERATING_BUDGET, BUDGETS), text, 3)
+    assert 0 not in answers  # left to the model
+    assert answers[1][0] == 3
+
+def test_balance_sheet_wording_alone_is_not_accounts():
+    text = "Vedlegg 2: Balanse mellom arbeid og fritid i teamet\n"
+    assert precheck_answers(jobs_for(ACCOUNTS), text, 3) == {}
+
+def test_no_mention_at_all_gives_zero():
+    text = "Vi lager en app for fiskehelse.\n"
+    answers = precheck_answers(jobs_for(ACCOUNTS, "Hvor godt er dagens konkurrenter og konkurransebilde beskrevet?"), text, 3)
+    assert [score for score, _ in answers.values()] == [0, 0]
+
+def test_precheck_is_opt_in(monkeypatch):
+    import importlib
+    import adaptive_scoring
+
+    monkeypatch.delenv("EVAL_PRECHECK", raising=False)
+    assert importlib.reload(adaptive_scoring).PRECHECK_ENABLED is False
+    monkeypatch.setenv("EVAL_PRECHECK", "1")
+    assert importlib.reload(adaptive_scoring).PRECHECK_ENABLED is True
+    monkeypatch.delenv("EVAL_PRECHECK")
+    importlib.reload(adaptive_scoring)
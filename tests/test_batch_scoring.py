@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from batch_scoring import parse_batch_response, score_questions_batched
+
+JOBS = [("Marked", "Hvor stort er markedet?"), ("Marked", "Hvem er kundene?"), ("Team", "Har teamet erfaring?")]
+
+def reply(*answers):
+    return json.dumps({"svar": [{"nr": nr, "score": score, "kommentar": comment} for nr, score, comment in answers]})
+
+def test_parse_keeps_only_valid_answers():
+    text = "```json\n" + json.dumps({"svar": [
+        {"nr": 1, "score": 2, "kommentar": " Greit "},
+        {"nr": 2, "score": 7, "kommentar": "utenfor skalaen"},
+        {"nr": 3, "score": "1", "kommentar": ""},
+        {"nr": 9, "score": 1, "kommentar": "finnes ikke"},
+        {"nr": 1, "score": 0, "kommentar": "dobbelt svar"},
+    ]}) + "\n```"
+    assert parse_batch_response(text, 3, 3) == {1: (2, "Greit")}
+    assert parse_batch_response("ikke JSON", 3, 3) == {}
+
+def test_missing_answers_are_reasked_then_scored_one_by_one():
+    asked, fallback = [], []
+
+    def batch_fn(items):
+        asked.append([question for _, question in items])
+        # The first call answers the first question only, later calls nothing usable
+        return reply((1, 2, "Stort marked")) if len(asked) == 1 else "Beklager, jeg kan ikke svare."
+
+    def question_fn(category, question):
+        fallback.append(question)
+        if question == "Har teamet erfaring?":
+            raise ValueError("ugyldig svar")
+        return 1, "Enkeltvis"
+
+    outcomes = score_questions_batched(JOBS, batch_fn, question_fn, scoring_mode="rubric", max_score=3, max_reasks=2)
+
+    assert asked == [
+        ["Hvor stort er markedet?", "Hvem er kundene?", "Har teamet erfaring?"],
+        ["Hvem er kundene?", "Har teamet erfaring?"],
+        ["Hvem er kundene?", "Har teamet erfaring?"],
+    ]
+    assert fallback == ["Hvem er kundene?", "Har teamet erfaring?"]
+    assert outcomes[:2] == [(2, "Stort marked"), (1, "Enkeltvis")]
+    assert isinstance(outcomes[2], ValueError)
+
+def test_a_reask_only_numbers_the_questions_still_missing():
+    def batch_fn(items):
+        if len(items) == 3:
+            return reply((1, 3, "A"), (3, 1, "C"))
+        assert items == [JOBS[1]]
+        return reply((1, 2, "B"))  # "nr" 1 of the re-ask is job 2
+
+    def question_fn(category, question):
+        raise AssertionError("no fallback expected")
+
+    outcomes = score_questions_batched(JOBS, batch_fn, question_fn, scoring_mode="rubric", max_score=3)
+    assert outcomes == [(3, "A"), (2, "B"), (1, "C")]
+
+def test_a_failed_batch_call_falls_back_per_question():
+    def batch_fn(items):
+        raise TimeoutError("batch tok for lang tid")
+
+    outcomes = score_questions_batched(JOBS, batch_fn, lambda category, question: (0, category), scoring_mode="category", max_score=3, max_reasks=1)
+    assert outcomes == [(0, "Marked"), (0, "Marked"), (0, "Team")]
+
+def test_answered_questions_are_not_asked():
+    asked = []
+
+    def batch_fn(items):
+        asked.extend(items)
+        return reply(*((nr, 1, "ok") for nr in range(1, len(items) + 1)))
+
+    outcomes = score_questions_batched(JOBS, batch_fn, None, scoring_mode="rubric", answered={0: (3, "Forhåndssjekk")})
+    assert asked == JOBS[1:]
+    assert outcomes == [(3, "Forhåndssjekk"), (1, "ok"), (1, "ok")]
+
+def test_question_mode_is_not_a_batch_mode():
+    with pytest.raises(ValueError):
+        score_questions_batched(JOBS, None, None, scoring_mode="question")
@@ -0,0 +1,27 @@
+import pandas as pd
+from openpyxl import load_workbook
+
+from comparison_report import create_comparison_report
+
+def results(scores):
+    return pd.DataFrame([
+        {"Kategori": category, "Spørsmål": f"Hvordan er {category.lower()}?", "Score": score, "Kommentar": "OK"}
+        for category, score in scores.items()
+    ])
+
+def test_ranking_and_matrix_come_before_the_detail_sheets(tmp_path):
+    path = tmp_path / "sammenligning.xlsx"
+    applications = (
+        ("svak.pdf", results({"Marked": 1, "Team": 1})),
+        ("sterk.pdf", results({"Marked": 3, "Team": 2, "Risiko": 3})),
+    )
+    assert create_comparison_report(iter(applications), str(path), "Oppstart 2") == 2
+
+    wb = load_workbook(path)
+    assert wb.sheetnames == ["Rangering", "Kategorimatrise", "0001 svak", "0002 sterk"]
+    ranking = wb["Rangering"]
+    assert [ranking.cell(row, 2).value for row in (4, 5)] == ["sterk.pdf", "svak.pdf"]
+    matrix = wb["Kategorimatrise"]
+    assert [cell.value for cell in matrix[1]] == ["Søknad", "Marked", "Team", "Risiko"]
+    assert matrix.column_dimensions["D"].width == 18
+    assert matrix["D2"].value == 3 and matrix["D3"].value is None  # "svak" has no Risiko questions
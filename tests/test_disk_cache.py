@@ -0,0 +1,41 @@
+from disk_cache import DiskLRUCache
+
+def test_running_total_follows_sets_and_replacements(tmp_path):
+    cache = DiskLRUCache(str(tmp_path / "cache.sqlite3"), max_bytes=1000)
+    cache.set("a", b"x" * 100)
+    cache.set("b", b"x" * 200)
+    cache.set("a", b"x" * 50)
+    assert cache._total == cache.stats()["bytes"] == 250
+    cache.clear()
+    assert cache._total == 0
+
+def test_evicts_least_recently_read_first(tmp_path):
+    cache = DiskLRUCache(str(tmp_path / "cache.sqlite3"), max_bytes=300)
+    for key in "abc":
+        cache.set(key, b"x" * 100)
+    assert cache.get("a") is not None  # "b" is now the oldest
+    cache.set("d", b"x" * 100)
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in "acd")
+    assert cache.stats()["bytes"] <= 300
+
+def test_total_is_read_from_an_existing_file(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = DiskLRUCache(path, max_bytes=1000)
+    first.set("a", b"x" * 120)
+    first.get("a")
+    first.close()
+    second = DiskLRUCache(path, max_bytes=1000)
+    assert second._total == 120
+    assert second.get("a") == b"x" * 120
+
+def test_score_cache_keeps_the_answering_model(monkeypatch, tmp_path):
+    import score_cache
+
+    cache = DiskLRUCache(str(tmp_path / "scores.sqlite3"), max_bytes=10_000)
+    monkeypatch.setattr(score_cache, "get_score_cache", lambda: cache)
+    score_cache.store_score("ny", 2, "Delvis.", "gpt-4o-mini")
+    score_cache.store_score("gammel", 3, "Godt.")  # as stored before the model was recorded
+    assert score_cache.lookup_answer("ny") == (2, "Delvis.", "gpt-4o-mini")
+    assert score_cache.lookup_answer("gammel") == (3, "Godt.", None)
+    assert score_cache.lookup_score("ny") == (2, "Delvis.")
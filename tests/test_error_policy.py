@@ -0,0 +1,49 @@
+import time
+
+import pytest
+
+from error_policy import RetryPolicy, question_deadline, retry_call
+
+class Transient(Exception):
+    pass
+
+def failing(calls):
+    def fn():
+        calls.append(time.monotonic())
+        raise Transient()
+    return fn
+
+POLICY = RetryPolicy(max_attempts=100, base_delay=0.01, max_delay=0.01, deadline=0.1)
+
+def test_retries_stop_at_the_deadline():
+    calls = []
+    start = time.monotonic()
+    with pytest.raises(Transient):
+        retry_call(failing(calls), (Transient,), POLICY)
+    assert len(calls) > 1
+    assert time.monotonic() - start < 0.2
+
+def test_calls_within_one_question_share_its_deadline():
+    calls = []
+    with question_deadline(POLICY):
+        time.sleep(POLICY.deadline)  # the question's first call used up the time
+        # A later call for the same question (e.g. the format repair) is not retried
+        with pytest.raises(Transient):
+            retry_call(failing(calls), (Transient,), POLICY)
+    assert len(calls) == 1
+
+def test_each_question_gets_its_own_deadline():
+    for _ in range(2):
+        calls = []
+        with question_deadline(POLICY), pytest.raises(Transient):
+            retry_call(failing(calls), (Transient,), POLICY)
+        assert len(calls) > 1
+
+def test_other_errors_are_not_retried():
+    calls = []
+    def fn():
+        calls.append(1)
+        raise KeyError("x")
+    with pytest.raises(KeyError):
+        retry_call(fn, (Transient,), POLICY)
+    assert calls == [1]
@@ -0,0 +1,35 @@
+import threading
+
+from jobs import JobManager
+
+def test_cleanup_runs_for_finished_failed_and_cancelled_jobs():
+    manager = JobManager(max_workers=1)
+    release, cleaned = threading.Event(), []
+    running = manager.submit("a.pdf", "Oppstart 1", lambda job: release.wait(5), cleanup=lambda: cleaned.append("a"))
+
+    def fail(job):
+        raise ValueError("❌ FEIL: ødelagt PDF")
+
+    queued = manager.submit("b.pdf", "Oppstart 1", fail, cleanup=lambda: cleaned.append("b"))
+    manager.shutdown()  # "b" is still waiting for the only worker
+    release.set()
+    manager._executor.shutdown(wait=True)
+
+    assert sorted(cleaned) == ["a", "b"]
+    assert running.status == "done"
+    assert queued.status == "failed"
+    assert "avbrutt" in queued.error
+    assert queued.events[-1]["event"] == "job_failed"
+
+def test_cleanup_runs_after_a_failed_job():
+    manager = JobManager(max_workers=1)
+    cleaned = []
+
+    def fail(job):
+        raise ValueError("❌ FEIL: ødelagt PDF")
+
+    # The job may finish before submit returns, so look it up instead of closing over it
+    job = manager.submit("a.pdf", "Oppstart 1", fail, cleanup=lambda: cleaned.append([known.status for known in manager._jobs.values()]))
+    manager._executor.shutdown(wait=True)
+    assert cleaned == [["failed"]]
+    assert job.status == "failed"
@@ -0,0 +1,51 @@
+import threading
+
+from batch_scoring import score_questions_batched
+from llm_usage import count_usage, metered_calls
+from scoring_engine import score_questions_concurrently
+
+JOBS = [("Kategori", f"Spørsmål {number}") for number in range(12)]
+
+def test_inner_meters_count_for_the_enclosing_one():
+    with metered_calls() as outer:
+        count_usage(requests=1)
+        with metered_calls() as inner:
+            count_usage(requests=2, prompt_tokens=10)
+    assert inner["requests"] == 2
+    assert outer["requests"] == 3 and outer["prompt_tokens"] == 10
+    count_usage(requests=1)  # outside any meter: ignored
+    assert outer["requests"] == 3
+
+def score(category, question):
+    count_usage(requests=1, prompt_tokens=100)
+    return 1, "ok"
+
+def batch(items):
+    count_usage(requests=1)
+    return '{"svar": [' + ",".join(f'{{"nr": {nr}, "score": 1, "kommentar": "ok"}}' for nr in range(1, len(items) + 1)) + "]}"
+
+def test_concurrent_evaluations_are_metered_separately():
+    meters = {}
+
+    def evaluation(name, run):
+        with metered_calls() as usage:
+            run()
+        meters[name] = usage
+
+    threads = [
+        threading.Thread(target=evaluation, args=(f"question-{n}", lambda: score_questions_concurrently(JOBS, score, max_in_flight=4)))
+        for n in range(3)
+    ] + [
+        threading.Thread(target=evaluation, args=("rubric", lambda: score_questions_batched(JOBS, batch, score, scoring_mode="rubric"))),
+        threading.Thread(target=evaluation, args=("category", lambda: score_questions_batched(JOBS * 2, batch, score, scoring_mode="category"))),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for n in range(3):
+        assert meters[f"question-{n}"]["requests"] == len(JOBS)
+        assert meters[f"question-{n}"]["prompt_tokens"] == 100 * len(JOBS)
+    assert meters["rubric"]["requests"] == 1
+    assert meters["category"]["requests"] == 1  # one category, so one call
@@ -0,0 +1,111 @@
+import rate_limiter
+from rate_limiter import RateLimiter, get_rate_limiter, reset_rate_limiters, set_rate_limiter
+
+class VirtualClock:
+    """Simulated time: sleeping advances the clock instead of waiting."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        # A real sleep always lets some time pass, even for a rounding-sized shortfall
+        self.now += max(seconds, 1e-6)
+
+class SimulatedServer:
+    """An API with a per-minute request limit that replenishes continuously, answering with OpenAI's headers."""
+
+    def __init__(self, clock: VirtualClock, rpm: int):
+        self.clock = clock
+        self.rpm = rpm
+        self.remaining = float(rpm)
+        self.updated = clock()
+        self.accepted = 0
+        self.rejected = 0
+
+    def request(self):
+        now = self.clock()
+        self.remaining = min(self.rpm, self.remaining + (now - self.updated) * self.rpm / 60)
+        self.updated = now
+        if self.remaining < 1:
+            self.rejected += 1
+            return False, {"retry-after": str((1 - self.remaining) * 60 / self.rpm)}
+        self.remaining -= 1
+        self.accepted += 1
+        return True, {"x-ratelimit-limit-requests": str(self.rpm), "x-ratelimit-remaining-requests": str(int(self.remaining))}
+
+def run(server: SimulatedServer, limiter: RateLimiter, requests: int) -> None:
+    clock = server.clock
+    done = 0
+    while done < requests:
+        if limiter.paused_until > clock():
+            clock.sleep(limiter.paused_until - clock())
+        limiter.acquire(0)
+        ok, headers = server.request()
+        limiter.release()
+        if ok:
+            limiter.on_success(headers, 0, 0)
+            done += 1
+        else:
+            limiter.on_rate_limit(headers)
+        clock.sleep(0.01)
+
+def test_limiter_learned_from_headers_stays_under_the_server_limit():
+    clock = VirtualClock()
+    server = SimulatedServer(clock, rpm=30)
+    limiter = RateLimiter(clock=clock, sleep=clock.sleep)
+    run(server, limiter, 120)
+    assert server.accepted == 120
+    assert server.rejected == 0
+    # The first 30 go at once, the remaining 90 at 30 per minute
+    assert 170 <= clock.now <= 190
+
+def test_rate_limit_response_halves_concurrency_and_pauses():
+    clock = VirtualClock()
+    limiter = RateLimiter(max_concurrency=16, clock=clock, sleep=clock.sleep)
+    limiter.on_rate_limit({"retry-after": "2"})
+    assert limiter.limit == 8
+    assert limiter.paused_until == 2
+    limiter.on_rate_limit({"retry-after": "1"})
+    assert limiter.limit == 8  # at most one decrease per second
+    clock.sleep(1.5)
+    limiter.on_rate_limit(None)
+    assert limiter.limit == 4
+    assert limiter.stats()["rate_limited"] == 3
+
+def test_fixed_rpm_is_not_overridden_by_headers():
+    clock = VirtualClock()
+    limiter = RateLimiter(rpm=10, clock=clock, sleep=clock.sleep)
+    limiter.on_success({"x-ratelimit-limit-requests": "10000"}, 0, 0)
+    assert limiter.requests.capacity == 10
+
+def test_limiters_are_kept_per_model():
+    reset_rate_limiters()
+    try:
+        mini, large = get_rate_limiter("openai", "gpt-4o-mini"), get_rate_limiter("openai", "gpt-4o")
+        assert mini is not large
+        assert get_rate_limiter("openai", "gpt-4o-mini") is mini
+        mini.on_success({"x-ratelimit-limit-tokens": "200000", "x-ratelimit-remaining-tokens": "150000"}, 100, 100)
+        large.on_success({"x-ratelimit-limit-tokens": "30000", "x-ratelimit-remaining-tokens": "1000"}, 100, 100)
+        assert mini.tokens.capacity == 200000
+        assert large.tokens.capacity == 30000
+        assert mini.tokens.level >= 149000
+    finally:
+        reset_rate_limiters()
+
+def test_local_and_fake_backends_are_not_limited():
+    assert get_rate_limiter("fake", "fake-scorer") is None
+    assert get_rate_limiter("local", "llama3.1") is None
+    assert "openai" in rate_limiter.REMOTE_BACKENDS
+
+def test_override_applies_to_every_remote_model():
+    shared = RateLimiter(rpm=5)
+    set_rate_limiter(shared)
+    try:
+        assert get_rate_limiter("openai", "gpt-4o") is shared
+        assert get_rate_limiter("openai", "gpt-4o-mini") is shared
+        assert get_rate_limiter("fake", "fake-scorer") is None
+    finally:
+        set_rate_limiter(None)
@@ -0,0 +1,75 @@
+import report_writer
+from report_writer import use_performance_sheet
+from tracing import profiling
+
+def test_performance_sheet_is_opt_in(monkeypatch, tmp_path):
+    assert not use_performance_sheet()
+    assert use_performance_sheet(True)
+    with profiling(str(tmp_path / "evaluering.prof")):
+        assert use_performance_sheet()
+        assert not use_performance_sheet(False)
+    assert not use_performance_sheet()
+    monkeypatch.setattr(report_writer, "REPORT_PERFORMANCE_SHEET", True)
+    assert use_performance_sheet()
+
+def test_cells_get_the_registered_named_styles(tmp_path):
+    from openpyxl import load_workbook
+
+    for write_only in (False, True):
+        wb = report_writer.new_report_workbook(write_only=write_only)
+        sheet = report_writer.ReportSheet(wb, "Rapport", {'A': 30, 'B': 12})
+        sheet.append([("TITTEL", "title")], merge="A:B")
+        sheet.append([("Markedet", "cell"), (3, "score_green")], height=40)
+        sheet.close()
+        path = tmp_path / f"rapport_{write_only}.xlsx"
+        wb.save(path)
+        ws = load_workbook(path).active
+        assert ws["A1"].style == report_writer.STYLE_PREFIX + "title"
+        assert ws["B2"].style == report_writer.STYLE_PREFIX + "score_green"
+        assert ws["B2"].fill.start_color.rgb.endswith(report_writer.GREEN)
+        assert "A1:B1" in {str(r) for r in ws.merged_cells.ranges}
+        assert ws.row_dimensions[2].height == 40
+
+def test_report_assessment_follows_the_assessment_thresholds(monkeypatch, tmp_path):
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    import evaluate_application
+
+    results_df = pd.DataFrame([{"Kategori": "Marked", "Spørsmål": "Hvor stort er markedet?", "Score": 2, "Kommentar": "OK"}])
+
+    def assessment(thresholds):
+        monkeypatch.setattr(evaluate_application, "ASSESSMENT_THRESHOLDS", thresholds)
+        path = tmp_path / "rapport.xlsx"
+        evaluate_application.create_excel_report(results_df, "soknad.pdf", str(path), "Oppstart 2", performance_sheet=False)
+        values = [cell.value for row in load_workbook(path).active.iter_rows() for cell in row if isinstance(cell.value, str)]
+        return next(value for value in values if "øknad" in value and value[0] in "🎉👍⚠🔴")
+
+    assert assessment((2.5, 2.0, 1.5)).startswith("👍")
+    assert assessment((1.5, 1.0, 0.5)).startswith("🎉")
+    assert assessment((3.0, 2.5, 2.2)).startswith("🔴")
+
+def test_questions_skipped_by_early_stopping_are_left_out_of_the_means(tmp_path):
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    import evaluate_application
+    from comparison_report import read_report_results
+
+    results_df = pd.DataFrame([
+        {"Kategori": "Marked", "Spørsmål": "Hvor stort er markedet?", "Score": 3, "Kommentar": "Godt."},
+        {"Kategori": "Marked", "Spørsmål": "Hvem er kundene?", "Score": 0, "Kommentar": "Ikke vurdert: tidlig stopp."},
+        {"Kategori": "Team", "Spørsmål": "Har teamet erfaring?", "Score": 0, "Kommentar": "Ikke vurdert: tidlig stopp."},
+    ])
+    results_df.attrs["skipped"] = [False, True, True]
+    path = tmp_path / "rapport.xlsx"
+    evaluate_application.create_excel_report(results_df, "soknad.pdf", str(path), "Oppstart 2", performance_sheet=False)
+
+    rows = list(load_workbook(path).active.iter_rows())
+    second_cell = {row[0].value: row[1].value for row in rows if len(row) > 1}
+    assert second_cell["TOTAL GJENNOMSNITTSSCORE:"] == "3.00/3.0"
+    assert second_cell["🟢 Marked"] == "3.0/3.0"
+    assert second_cell["⚪ Team"] == "Ikke vurdert"
+    skipped = next(row[2] for row in rows if len(row) > 2 and row[1].value == "Hvem er kundene?")
+    assert skipped.value is None and skipped.style == report_writer.STYLE_PREFIX + "score_skipped"
+    assert read_report_results(str(path))["Score"].isna().tolist() == [False, True, True]
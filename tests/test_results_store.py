@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+import results_store
+
+def evaluation(scores, model="gpt-4o", failed=(), skipped=()):
+    """A results DataFrame as the evaluators return it, for questions "q1", "q2", ... in category "Marked"."""
+    results_df = pd.DataFrame([
+        {"Kategori": "Marked", "Spørsmål": f"q{number}", "Score": score, "Kommentar": "OK"}
+        for number, score in enumerate(scores, 1)
+    ])
+    results_df.attrs["run"] = {"model": model, "backend": "openai", "scoring_mode": "question", "prompt_version": "in-v3", "max_score": 3}
+    results_df.attrs["answered_by"] = [model] * len(scores)
+    results_df.attrs["errors"] = [{"Kategori": "Marked", "Spørsmål": f"q{number}"} for number in failed]
+    results_df.attrs["skipped"] = [number in skipped for number in range(1, len(scores) + 1)]
+    return results_df
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    monkeypatch.setattr(results_store, "RESULTS_STORE_ENABLED", True)
+    return str(tmp_path / "results")
+
+def test_failed_and_skipped_questions_are_left_out_of_the_aggregates(store):
+    pytest.importorskip("pyarrow")
+    results_store.append_evaluation(evaluation([3, 0, 0], failed=[2], skipped=[3]), "Oppstart 2", document_sha256="a", path=store)
+    results_store.append_evaluation(evaluation([1, 2, 0], model="gpt-4o-mini", skipped=[3]), "Oppstart 2", document_sha256="a", path=store)
+
+    categories = results_store.mean_score_by_category("Oppstart 2", path=store)
+    assert categories[["rubric", "category", "answers"]].values.tolist() == [["oppstart2", "Marked", 3]]
+    assert categories["mean_score"][0] == pytest.approx(2.0)
+
+    # Only q1 was scored by both models: q2 failed for gpt-4o and q3 was skipped by both
+    drift = results_store.score_drift("gpt-4o", "gpt-4o-mini", path=store)
+    assert drift[["from_score", "to_score", "pairs"]].values.tolist() == [[3.0, 1.0, 1]]
+
+def test_store_is_skipped_without_pyarrow(monkeypatch, store, capsys):
+    monkeypatch.setattr(results_store, "_pyarrow", lambda: None)
+    monkeypatch.setattr(results_store, "_warned", False)
+    assert results_store.append_evaluation(evaluation([3]), "NIC", path=store) is None
+    assert results_store.append_evaluation(evaluation([3]), "NIC", path=store) is None
+    assert capsys.readouterr().out.count("pyarrow er ikke installert") == 1
+    with pytest.raises(Exception, match="trenger pyarrow"):
+        results_store.mean_score_by_category(path=store)
@@ -0,0 +1,47 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import routing
+
+CHEAP, LARGE = routing.EVAL_CHEAP_MODEL, "gpt-4o"
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Replies per model instead of API calls; records which models were asked."""
+    api = SimpleNamespace(asked=[], replies={CHEAP: "Scoren er nok rundt to, usikkert.", LARGE: json.dumps({"score": 3, "kommentar": "Godt beskrevet."})})
+
+    def complete(model, messages, temperature, max_tokens, response_format=None, backend=None):
+        api.asked.append(model)
+        return api.replies[model]
+
+    monkeypatch.setattr(routing, "complete", complete)
+    monkeypatch.setattr(routing, "backend_model", lambda model, backend=None: model)
+    return api
+
+MESSAGES = [{"role": "system", "content": "Vurder."}, {"role": "user", "content": "Spørsmål"}]
+
+@pytest.mark.parametrize("policy", ["cheap", "borderline", "confidence+agreement"])
+def test_unparsable_cheap_reply_is_escalated(monkeypatch, calls, policy):
+    monkeypatch.setattr(routing, "routing_policy", lambda category: routing.parse_policy(policy))
+    assert routing.score_with_routing("Kategori", MESSAGES, 3, LARGE, 0.0, "openai") == (3, "Godt beskrevet.", LARGE)
+    # The cheap reply and its format repair both failed, then the large model answered once
+    assert calls.asked == [CHEAP, CHEAP, LARGE]
+
+def test_parsable_cheap_reply_is_kept(monkeypatch, calls):
+    monkeypatch.setattr(routing, "routing_policy", lambda category: routing.parse_policy("borderline"))
+    calls.replies[CHEAP] = json.dumps({"score": 0, "kommentar": "Ikke beskrevet."})
+    assert routing.score_with_routing("Kategori", MESSAGES, 3, LARGE, 0.0, "openai") == (0, "Ikke beskrevet.", CHEAP)
+    assert calls.asked == [CHEAP]
+
+def test_borderline_cheap_reply_is_escalated(monkeypatch, calls):
+    monkeypatch.setattr(routing, "routing_policy", lambda category: routing.parse_policy("borderline"))
+    calls.replies[CHEAP] = json.dumps({"score": 2, "kommentar": "Delvis."})
+    assert routing.score_with_routing("Kategori", MESSAGES, 3, LARGE, 0.0, "openai")[0] == 3
+    assert calls.asked == [CHEAP, LARGE]
+
+def test_routing_is_off_for_backends_with_one_model(monkeypatch):
+    monkeypatch.setattr(routing, "routing_policy", lambda category: routing.parse_policy("borderline"))
+    assert not routing.uses_routing("Kategori", "fake")
+    assert routing.routed_model("Kategori", LARGE, "fake") == routing.backend_model(LARGE, "fake")
@@ -0,0 +1,76 @@
+import pytest
+
+import rubric_evaluation
+from error_policy import ScoringError
+from rubric_evaluation import Evaluator, run_evaluation, scoring_error
+from rubric_evaluation import score_question as real_score_question  # before fake_scoring replaces it
+
+QUESTIONS = {"Marked": ["Hvor stort er markedet?", "Hvem er kundene?"], "Team": ["Har teamet erfaring?"]}
+SCORES = {"Hvor stort er markedet?": 3, "Har teamet erfaring?": 2}
+MODELS = {"Marked": "gpt-4o", "Team": "gpt-4o-mini"}  # as if routing sent Team to the cheap model
+
+@pytest.fixture(autouse=True)
+def fake_scoring(monkeypatch):
+    def score_question(evaluator, question, application_text, category, backend, document):
+        if question == "Hvem er kundene?":
+            raise scoring_error(ValueError("ingen score i svaret"))
+        return SCORES[question], f"{category}: ok", MODELS[category]
+
+    monkeypatch.setattr(rubric_evaluation, "score_question", score_question)
+    monkeypatch.setattr(rubric_evaluation, "score_batch", lambda evaluator, items, application_text, backend: "{}")
+
+def evaluator(**overrides):
+    settings = dict(
+        rubric="test", max_score=3, model="gpt-4o", temperature=0.3, prompt_version="t-v1", batch_prompt_version="t-batch-v1",
+        system_prompt="Du vurderer søknader.", question_task="Score 0-3: {question}", batch_task="Score 0-3:\n{questions}",
+    )
+    return Evaluator(**{**settings, **overrides})
+
+@pytest.mark.parametrize("max_concurrency", [1, 4])
+def test_sequential_and_parallel_give_the_same_rows(max_concurrency):
+    results_df = run_evaluation(evaluator(), "Søknadstekst", QUESTIONS, max_concurrency=max_concurrency, scoring_mode="question", backend="fake", early_stop=False)
+    assert list(results_df["Spørsmål"]) == ["Hvor stort er markedet?", "Hvem er kundene?", "Har teamet erfaring?"]
+    assert list(results_df["Score"]) == [3, 0, 2]
+    assert results_df.attrs["errors"] == [{
+        "Kategori": "Marked", "Spørsmål": "Hvem er kundene?", "Feiltype": "parse",
+        "Feilmelding": "❌ FEIL: Problem med å tolke OpenAI-respons: ingen score i svaret",
+    }]
+    assert results_df.attrs["answered_by"] == ["gpt-4o", None, "gpt-4o-mini"]
+    assert results_df.attrs["skipped"] == [False, False, False]
+    assert results_df.attrs["run"] == {"model": "gpt-4o (1), gpt-4o-mini (1)", "backend": "fake", "scoring_mode": "question", "prompt_version": "t-v1", "max_score": 3}
+
+def test_category_columns_follow_the_category():
+    weights = {"Marked": 60, "Team": 40}
+    results_df = run_evaluation(evaluator(category_columns=lambda category: {"Vekt (%)": weights[category]}), "Søknadstekst", QUESTIONS, max_concurrency=1, scoring_mode="question", backend="fake")
+    assert list(results_df.columns) == ["Kategori", "Vekt (%)", "Spørsmål", "Score", "Kommentar"]
+    assert list(results_df["Vekt (%)"]) == [60, 60, 40]
+
+def test_early_stop_needs_assessment_thresholds():
+    # Without thresholds early_stop is ignored, so every question is scored
+    results_df = run_evaluation(evaluator(), "Søknadstekst", QUESTIONS, max_concurrency=4, scoring_mode="question", backend="fake", early_stop=True)
+    assert not results_df["Kommentar"].str.startswith("Ikke vurdert").any()
+
+def test_scoring_errors_are_mapped_by_kind():
+    from openai import APIConnectionError
+    import httpx
+
+    assert scoring_error(ValueError("tom")).kind == "parse"
+    assert scoring_error(APIConnectionError(request=httpx.Request("POST", "http://api.invalid"))).kind == "connection"
+    already = ScoringError("❌ FEIL: allerede tolket", kind="timeout")
+    assert scoring_error(already) is already
+    unexpected = scoring_error(KeyError("score"))
+    assert unexpected.kind == "unknown" and "KeyError" in str(unexpected)
+
+def test_score_question_fills_in_the_evaluators_prompt(monkeypatch):
+    calls = []
+
+    def complete(model, messages, temperature, max_tokens, response_format=None, backend=None):
+        calls.append((model, temperature, messages))
+        return '{"score": 2, "kommentar": "ok"}'
+
+    monkeypatch.setattr(rubric_evaluation, "complete", complete)
+    assert real_score_question(evaluator(text_label="Søknadstekst"), "Har teamet erfaring?", "Teamet har bygget to selskaper.", "Team", backend="fake") == (2, "ok", "fake-scorer")
+    [(model, temperature, messages)] = calls
+    assert (model, temperature) == ("gpt-4o", 0.3)
+    assert messages[0]["content"] == "Du vurderer søknader."
+    assert "Søknadstekst" in messages[-1]["content"] and messages[-1]["content"].endswith("Score 0-3: Har teamet erfaring?")
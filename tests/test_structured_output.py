@@ -0,0 +1,48 @@
+import pytest
+
+from llm_usage import metered_calls
+from structured_output import parse_score_json, parse_score_with_repair, score_response_format
+
+class Repairer:
+    """Stands in for the evaluator's complete(); records the repair requests."""
+
+    def __init__(self, reply: str):
+        self.reply = reply
+        self.requests = []
+
+    def __call__(self, messages, max_tokens, response_format):
+        self.requests.append((messages, max_tokens, response_format))
+        return self.reply
+
+def test_score_json_tolerates_fences_and_string_scores():
+    assert parse_score_json('```json\n{"score": "2", "kommentar": " Godt beskrevet "}\n```', 3) == (2, "Godt beskrevet")
+
+@pytest.mark.parametrize("reply", ['{"score": 4, "kommentar": "for høy"}', '{"score": true, "kommentar": "x"}', '{"score": 1}', "Score: 2 av 3", '{"score": 1,'])
+def test_score_json_rejects_invalid_replies(reply):
+    with pytest.raises(ValueError):
+        parse_score_json(reply, 3)
+
+def test_valid_reply_needs_no_repair():
+    repair = Repairer("")
+    with metered_calls() as meter:
+        assert parse_score_with_repair('{"score": 3, "kommentar": "Bra"}', 3, "gpt-4o", repair) == (3, "Bra")
+    assert repair.requests == []
+    assert (meter["parsed"], meter["parse_failures"], meter["repaired"]) == (1, 0, 0)
+
+def test_malformed_reply_is_reformatted_once_without_the_application():
+    repair = Repairer('{"score": 2, "kommentar": "Markedet er beskrevet"}')
+    with metered_calls() as meter:
+        result = parse_score_with_repair("Score: 2 av 3. Markedet er beskrevet.", 3, "gpt-4o", repair)
+    assert result == (2, "Markedet er beskrevet")
+    [(messages, max_tokens, response_format)] = repair.requests
+    assert "Score: 2 av 3. Markedet er beskrevet." in messages[-1]["content"]
+    assert response_format == score_response_format(3)
+    assert max_tokens <= 200
+    assert (meter["parsed"], meter["parse_failures"], meter["repaired"]) == (1, 1, 1)
+
+def test_unrepairable_reply_raises_value_error():
+    repair = Repairer("Beklager, det kan jeg ikke.")
+    with metered_calls() as meter, pytest.raises(ValueError, match="også etter ny formatering"):
+        parse_score_with_repair('{"score": 9, "kommentar": "utenfor"}', 3, "gpt-4o", repair)
+    assert len(repair.requests) == 1
+    assert (meter["parsed"], meter["parse_failures"], meter["repaired"]) == (1, 1, 0)
@@ -0,0 +1,42 @@
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+
+from upload_store import UploadTooLarge, receive_upload, release_upload
+
+class FakeUpload:
+    """The part of Starlette's UploadFile that receive_upload uses."""
+
+    def __init__(self, data: bytes, filename: str = "soknad.pdf"):
+        self.filename = filename
+        self._file = io.BytesIO(data)
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+DATA = os.urandom(3 * 1024 * 1024 + 17)
+
+def test_small_upload_stays_in_memory(tmp_path):
+    upload = asyncio.run(receive_upload(FakeUpload(DATA), memory_max_bytes=len(DATA), directory=str(tmp_path)))
+    assert upload.data == DATA
+    assert upload.sha256 == hashlib.sha256(DATA).hexdigest()
+    assert upload.path is None and not os.listdir(tmp_path)
+
+def test_large_upload_is_spilled_and_deleted_by_the_last_release(tmp_path):
+    first = asyncio.run(receive_upload(FakeUpload(DATA), memory_max_bytes=1024, directory=str(tmp_path)))
+    second = asyncio.run(receive_upload(FakeUpload(DATA), memory_max_bytes=1024, directory=str(tmp_path)))
+    assert first.path == second.path == str(tmp_path / f"{first.sha256}.pdf")
+    with open(first.path, "rb") as f:
+        assert f.read() == DATA
+    release_upload(first)
+    assert os.path.exists(second.path)
+    release_upload(second)
+    assert not os.listdir(tmp_path)
+
+def test_too_large_upload_leaves_no_file(tmp_path):
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(receive_upload(FakeUpload(DATA), max_bytes=2 * 1024 * 1024, memory_max_bytes=1024, directory=str(tmp_path)))
+    assert not os.listdir(tmp_path)
@@ -0,0 +1,75 @@
+import hashlib
+import os
+import struct
+import threading
+import zlib
+from dotenv import load_dotenv
+from typing import List, Optional, Tuple
+
+from disk_cache import DiskLRUCache
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Extracted PDF text keyed by the SHA-256 of the PDF bytes, so the same file is parsed only once
+TEXT_STORE_PATH = os.getenv("TEXT_STORE_PATH", os.path.join(".cache", "texts.sqlite3"))
+TEXT_STORE_MAX_MB = float(os.getenv("TEXT_STORE_MAX_MB", "256"))
+TEXT_STORE_ENABLED = os.getenv("TEXT_STORE_DISABLED", "").lower() not in {"1", "true", "ja"}
+
+# Record layout: magic, page count, one uint32 start offset per page, zlib-compressed UTF-8 text
+_MAGIC = b"TXT1"
+_HEADER = struct.Struct("<4sI")
+
+_store: Optional[DiskLRUCache] = None
+_store_lock = threading.Lock()
+
+def get_text_store() -> Optional[DiskLRUCache]:
+    """Open the shared text store on first use, or return None when it is disabled."""
+    global _store
+    if not TEXT_STORE_ENABLED:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = DiskLRUCache(TEXT_STORE_PATH, int(TEXT_STORE_MAX_MB * 1024 * 1024))
+        return _store
+
+def file_sha256(filename: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's bytes, read in chunks."""
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def encode_text(text: str, page_offsets: List[int]) -> bytes:
+    return (
+        _HEADER.pack(_MAGIC, len(page_offsets))
+        + struct.pack(f"<{len(page_offsets)}I", *page_offsets)
+        + zlib.compress(text.encode("utf-8"), 6)
+    )
+
+def decode_text(record: bytes) -> Tuple[str, List[int]]:
+    magic, page_count = _HEADER.unpack_from(record)
+    if magic != _MAGIC:
+        raise ValueError("Ukjent format i tekstlageret")
+    offsets_end = _HEADER.size + 4 * page_count
+    page_offsets = list(struct.unpack_from(f"<{page_count}I", record, _HEADER.size))
+    return zlib.decompress(record[offsets_end:]).decode("utf-8"), page_offsets
+
+def lookup_text(pdf_sha256: str) -> Optional[Tuple[str, List[int]]]:
+    """Return (text, page_offsets) previously extracted from a PDF with this hash."""
+    store = get_text_store()
+    if store is None:
+        return None
+    record = store.get(pdf_sha256)
+    if record is None:
+        return None
+    try:
+        return decode_text(record)
+    except (ValueError, struct.error, zlib.error):
+        return None
+
+def store_text(pdf_sha256: str, text: str, page_offsets: List[int]) -> None:
+    store = get_text_store()
+    if store is not None:
+        store.set(pdf_sha256, encode_text(text, page_offsets))
@@ -0,0 +1,219 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+# Stage names used in the spans, as shown in the "Ytelse" sheet
+STAGES = {
+    "extract": "PDF-lesing",
+    "evaluate": "Vurdering av alle spørsmål",
+    "score": "Ett spørsmål",
+    "llm": "AI-kall",
+    "parse": "Tolking av svar",
+    "report": "Excel-rapport",
+}
+
+F = TypeVar("F", bound=Callable)
+
+@dataclass
+class Span:
+    """One timed stage; times are nanoseconds on the perf_counter clock."""
+    name: str
+    start_ns: int
+    duration_ns: int
+    thread_id: int
+    thread_name: str
+    args: Dict[str, object] = field(default_factory=dict)
+
+class Trace:
+    """Spans recorded while the trace is current, from this thread and the worker threads it hands work to.
+
+    A trace started inside another one (one PDF inside a whole batch run)
+    passes its spans on to the outer trace as well.
+    """
+
+    def __init__(self, parent: Optional["Trace"] = None):
+        self.parent = parent
+        self.origin_ns = time.perf_counter_ns() if parent is None else parent.origin_ns
+        self.spans: List[Span] = []
+        self._open: Dict[object, Tuple[str, int]] = {}  # spans not finished yet, by a token per span
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, args: Optional[Dict[str, object]] = None) -> Iterator[None]:
+        thread = threading.current_thread()
+        start = time.perf_counter_ns()
+        key = object()
+        with self._lock:
+            self._open[key] = (name, start)
+        try:
+            yield
+        finally:
+            record = Span(name, start, time.perf_counter_ns() - start, thread.ident or 0, thread.name, args or {})
+            with self._lock:
+                del self._open[key]
+            self._add(record)
+
+    def _add(self, record: Span) -> None:
+        with self._lock:
+            self.spans.append(record)
+        if self.parent is not None:
+            self.parent._add(record)
+
+    def stage_totals(self) -> Dict[str, Tuple[int, float, float]]:
+        """(count, total seconds, longest seconds) per span name in first-seen order; unfinished spans count up to now."""
+        now = time.perf_counter_ns()
+        with self._lock:
+            durations = [(span.name, span.duration_ns) for span in sorted(self.spans, key=lambda span: span.start_ns)]
+            durations += [(name, now - start) for name, start in self._open.values()]
+        totals: Dict[str, Tuple[int, float, float]] = {}
+        for name, duration_ns in durations:
+            count, total, longest = totals.get(name, (0, 0.0, 0.0))
+            seconds = duration_ns / 1e9
+            totals[name] = (count + 1, total + seconds, max(longest, seconds))
+        return totals
+
+    def chrome_trace(self) -> dict:
+        """The spans in Chrome's trace event format (open in chrome://tracing or ui.perfetto.dev)."""
+        with self._lock:
+            spans = list(self.spans)
+        pid = os.getpid()
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                  for tid, name in sorted({(span.thread_id, span.thread_name) for span in spans})]
+        events += [
+            {"name": span.name, "cat": "evaluering", "ph": "X", "pid": pid, "tid": span.thread_id,
+             "ts": (span.start_ns - self.origin_ns) / 1000, "dur": span.duration_ns / 1000, "args": span.args}
+            for span in spans
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, filename: str) -> None:
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+
+_current: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+# True inside a run started with --profile (see profiling)
+_profiling: ContextVar[bool] = ContextVar("profiling", default=False)
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+def profiling_requested() -> bool:
+    """Whether the current run was started with --profile (reports then add their "Ytelse" sheet)."""
+    return _profiling.get()
+
+@contextmanager
+def tracing() -> Iterator[Trace]:
+    """Record spans into a new trace for the duration of the block.
+
+    Worker threads see the trace when their work is submitted with
+    `contextvars.copy_context().run`, as scoring_engine and batch_scoring do.
+    """
+    token = _current.set(Trace(parent=_current.get()))
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
+
+@contextmanager
+def span(name: str, **args) -> Iterator[None]:
+    """Time the block as stage `name` in the current trace (nothing is recorded without one)."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    with trace.span(name, args):
+        yield
+
+def traced(name: str, *arg_names: str) -> Callable[[F], F]:
+    """Decorator: time each call as stage `name`, with the named arguments (shortened) as span args."""
+    def decorate(fn: F) -> F:
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = _current.get()
+            if trace is None:
+                return fn(*args, **kwargs)
+            bound = signature.bind_partial(*args, **kwargs).arguments if arg_names else {}
+            with trace.span(name, {arg: str(bound.get(arg, ""))[:80] for arg in arg_names}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+@contextmanager
+def profiled(filename: str, top: int = 25) -> Iterator[None]:
+    """cProfile the block and the threads started during it, save the stats to `filename` and print the top functions.
+
+    cProfile only sees the thread that enables it, so each new thread gets its own
+    profiler; those are merged in once their thread has finished (threads still
+    running at the end, such as the AI client's event loop, are left out).
+    """
+    import cProfile
+    import pstats
+
+    thread_profiles: List[Tuple[threading.Thread, "cProfile.Profile"]] = []
+    lock = threading.Lock()
+
+    def start_in_thread(frame, event, arg):
+        profile = cProfile.Profile()
+        with lock:
+            thread_profiles.append((threading.current_thread(), profile))
+        profile.enable()  # replaces this hook for the rest of the thread
+
+    main = cProfile.Profile()
+    threading.setprofile(start_in_thread)
+    main.enable()
+    try:
+        yield
+    finally:
+        main.disable()
+        threading.setprofile(None)
+        stats = pstats.Stats(main)
+        with lock:
+            finished = [profile for thread, profile in thread_profiles if not thread.is_alive()]
+            running = len(thread_profiles) - len(finished)
+        for profile in finished:
+            stats.add(profile)
+        stats.dump_stats(filename)
+        print(f"\n🔬 Profil lagret i {filename} ({len(finished) + 1} tråder"
+              + (f", {running} som fortsatt kjører er utelatt" if running else "") + f"). De {top} tyngste funksjonene:")
+        stats.sort_stats("cumulative").print_stats(top)
+
+def add_profiling_arguments(parser) -> None:
+    """The --profile and --trace options shared by the command-line tools."""
+    parser.add_argument("--profile", nargs="?", const="evaluering.prof", metavar="FIL",
+                        help="Run under cProfile and save the stats (default evaluering.prof; view with python -m pstats or snakeviz)")
+    parser.add_argument("--trace", metavar="FIL.json", help="Save the timeline of the run as Chrome trace JSON (open in chrome://tracing or ui.perfetto.dev)")
+
+@contextmanager
+def profiling(profile: Optional[str] = None, trace: Optional[str] = None) -> Iterator[Trace]:
+    """Trace the block, saving the trace to `trace` and profiling it into `profile` when given."""
+    token = _profiling.set(bool(profile))
+    with tracing() as current:
+        try:
+            if profile:
+                with profiled(profile):
+                    yield current
+            else:
+                yield current
+        finally:
+            _profiling.reset(token)
+            if trace:
+                current.save_chrome_trace(trace)
+                print(f"🧭 Tidslinje lagret i {trace} ({len(current.spans)} trinn)")
+
+def run_cli(main: Callable[[], None], description: str) -> None:
+    """Run an interactive command-line `main` with the --profile and --trace options."""
+    import argparse
+    parser = argparse.ArgumentParser(description=description)
+    add_profiling_arguments(parser)
+    args = parser.parse_args()
+    with profiling(args.profile, args.trace):
+        main()
@@ -0,0 +1,117 @@
+import hashlib
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from dotenv import load_dotenv
+from typing import Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Uploads larger than this are rejected
+UPLOAD_MAX_MB = float(os.getenv("UPLOAD_MAX_MB", "50"))
+# Uploads up to this size are kept in memory and read from there; larger ones are
+# written to UPLOAD_DIR as <sha256>.pdf, so identical uploads share one file
+UPLOAD_MEMORY_MAX_MB = float(os.getenv("UPLOAD_MEMORY_MAX_MB", "8"))
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+class UploadTooLarge(ValueError):
+    """The upload is over UPLOAD_MAX_MB."""
+
+@dataclass
+class StoredUpload:
+    """One received PDF: its bytes in memory, or the content-addressed file they were spilled to."""
+    filename: str  # the name it was uploaded with (no directory)
+    sha256: str
+    size: int
+    data: Optional[bytes] = None
+    path: Optional[str] = None
+
+# Spilled files in use, by path; a file is deleted when the last job using it releases it
+_holds: Dict[str, int] = {}
+_holds_lock = threading.Lock()
+
+def too_large_message(max_bytes: int) -> str:
+    return f"❌ FEIL: Filen er for stor. Maks størrelse er {max_bytes / (1024 * 1024):g} MB."
+
+def _open_spill(directory: str, chunks: List[bytes]):
+    os.makedirs(directory, exist_ok=True)
+    spill = tempfile.NamedTemporaryFile(dir=directory, suffix=".part", delete=False)
+    spill.writelines(chunks)
+    return spill
+
+def _discard_spill(spill) -> None:
+    spill.close()
+    os.unlink(spill.name)
+
+async def receive_upload(upload, max_bytes: Optional[int] = None, memory_max_bytes: Optional[int] = None, directory: str = UPLOAD_DIR) -> StoredUpload:
+    """Read an UploadFile once in chunks, hashing it and enforcing the size limit on the way.
+
+    Small files are returned with their bytes in `data` (a single chunk is kept
+    as is, without copying); once a file passes `memory_max_bytes` the rest is
+    written to a temporary file that is renamed to `<sha256>.pdf` at the end.
+    File writes run in the thread pool, so the event loop is never blocked on disk.
+    Raises UploadTooLarge when the file passes `max_bytes`.
+    """
+    max_bytes = int(UPLOAD_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+    memory_max_bytes = int(UPLOAD_MEMORY_MAX_MB * 1024 * 1024) if memory_max_bytes is None else memory_max_bytes
+    filename = os.path.basename(upload.filename or "") or "soknad.pdf"
+    digest = hashlib.sha256()
+    chunks: List[bytes] = []
+    size = 0
+    spill = None
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(too_large_message(max_bytes))
+            digest.update(chunk)
+            if spill is None and size > memory_max_bytes:
+                spill = await run_in_threadpool(_open_spill, directory, chunks)
+                chunks = []
+            if spill is None:
+                chunks.append(chunk)
+            else:
+                await run_in_threadpool(spill.write, chunk)
+    except BaseException:
+        if spill is not None:
+            await run_in_threadpool(_discard_spill, spill)
+        raise
+
+    sha256 = digest.hexdigest()
+    if spill is None:
+        data = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+        return StoredUpload(filename, sha256, size, data=data)
+
+    await run_in_threadpool(spill.close)
+    path = os.path.join(directory, f"{sha256}.pdf")
+    with _holds_lock:
+        if path in _holds:
+            os.unlink(spill.name)  # the same bytes are already there for another job
+        else:
+            os.replace(spill.name, path)
+        _holds[path] = _holds.get(path, 0) + 1
+    return StoredUpload(filename, sha256, size, path=path)
+
+def release_upload(upload: StoredUpload) -> None:
+    """Forget an upload once its evaluation is done; a spilled file is deleted when no other job uses it."""
+    upload.data = None
+    if upload.path is None:
+        return
+    with _holds_lock:
+        remaining = _holds.get(upload.path, 0) - 1
+        if remaining > 0:
+            _holds[upload.path] = remaining
+            return
+        _holds.pop(upload.path, None)
+        try:
+            os.unlink(upload.path)
+        except FileNotFoundError:
+            pass